@@ -0,0 +1,228 @@
+# Application/idempotency.py
+"""
+Idempotency-Key support for retried writes (apply_job, save_job).
+
+A client on a flaky connection sends the same Idempotency-Key header with each
+retry of one action. The first request runs and its response is stored for
+settings.IDEMPOTENCY_TTL seconds; retries get that response back
+(Idempotent-Replayed: true) without running the view. Keys are per user. A key
+reused for a different request is refused with 422, and a retry that arrives
+while the first request is still running gets 409.
+
+Two stores, chosen by settings.IDEMPOTENCY_STORE:
+  "database"  the Application.IdempotencyKey table, shared by every worker
+  "cache"     the default Django cache (no database work at all on a replay
+              when the cache is shared, e.g. Redis or Memcached)
+Server errors (5xx) are not stored, so a retry runs the view again.
+"""
+import functools
+import hashlib
+import json
+import random
+import threading
+from collections import namedtuple
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+# a reservation whose request never finished (worker killed) can be taken over after this
+LEASE_SECONDS = 60
+# share of reservations that also purge expired rows of the database store
+PURGE_RATE = 0.01
+
+# status_code and data are None while the first request is still running
+StoredResponse = namedtuple("StoredResponse", ["fingerprint", "status_code", "data"])
+
+
+def request_fingerprint(request):
+    """sha256 of the method, path and body fields (uploaded files by name), so retries match exactly."""
+    body = []
+    for name in sorted(request.data.keys()) if hasattr(request.data, "keys") else ():
+        value = request.data.get(name)
+        body.append([name, getattr(value, "name", None) or str(value)])
+    payload = json.dumps([request.method, request.path, body], ensure_ascii=False)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class IdempotencyStore:
+    def reserve(self, scope, key, fingerprint):
+        """
+        Claim key for a request about to run: None when claimed, otherwise the
+        StoredResponse already held under it (finished, or still running).
+        """
+        raise NotImplementedError
+
+    def complete(self, scope, key, fingerprint, status_code, data):
+        raise NotImplementedError
+
+    def release(self, scope, key):
+        """Forget a reservation whose request failed, so a retry runs again."""
+        raise NotImplementedError
+
+
+class DatabaseIdempotencyStore(IdempotencyStore):
+    name = "database"
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+
+    def reserve(self, scope, key, fingerprint):
+        from .models import IdempotencyKey
+
+        now = timezone.now()
+        if random.random() < PURGE_RATE:
+            self.purge_expired(now)
+        reservation = IdempotencyKey(
+            scope=scope, key=key, fingerprint=fingerprint, expires_at=now + timedelta(seconds=self.ttl),
+        )
+        # INSERT ... ON CONFLICT DO NOTHING against the unique (scope, key) constraint
+        IdempotencyKey.objects.bulk_create([reservation], ignore_conflicts=True)
+        record = IdempotencyKey.objects.filter(scope=scope, key=key).first()
+        if record is None:
+            return self.reserve(scope, key, fingerprint)     # released meanwhile
+        # bulk_create() stamped created_at on the reservation: an equal row is ours
+        if record.created_at == reservation.created_at and record.fingerprint == fingerprint:
+            return None
+        abandoned = record.status_code is None and record.created_at < now - timedelta(seconds=LEASE_SECONDS)
+        if record.expires_at <= now or abandoned:
+            # take it over; the conditional update lets exactly one contender win
+            taken = IdempotencyKey.objects.filter(pk=record.pk, created_at=record.created_at).update(
+                fingerprint=fingerprint, status_code=None, response=None,
+                created_at=now, expires_at=now + timedelta(seconds=self.ttl),
+            )
+            if taken:
+                return None
+            record.refresh_from_db()
+        return StoredResponse(record.fingerprint, record.status_code, record.response)
+
+    def complete(self, scope, key, fingerprint, status_code, data):
+        from .models import IdempotencyKey
+
+        IdempotencyKey.objects.filter(scope=scope, key=key, fingerprint=fingerprint).update(
+            status_code=status_code, response=data,
+        )
+
+    def release(self, scope, key):
+        from .models import IdempotencyKey
+
+        IdempotencyKey.objects.filter(scope=scope, key=key, status_code__isnull=True).delete()
+
+    def purge_expired(self, now=None):
+        """Delete expired keys; returns how many."""
+        from .models import IdempotencyKey
+
+        return IdempotencyKey.objects.filter(expires_at__lte=now or timezone.now()).delete()[0]
+
+
+class CacheIdempotencyStore(IdempotencyStore):
+    """Entries expire with the cache timeout; the reservation is an atomic cache.add()."""
+
+    name = "cache"
+    PREFIX = "idempotency:"
+
+    def __init__(self, ttl, cache_backend=None):
+        self.ttl = ttl
+        self.cache = cache_backend or cache
+
+    def _key(self, scope, key):
+        # hashed: client keys may hold characters memcached does not allow
+        return self.PREFIX + hashlib.sha256(f"{scope}:{key}".encode()).hexdigest()
+
+    def reserve(self, scope, key, fingerprint):
+        cache_key = self._key(scope, key)
+        for _ in range(2):
+            if self.cache.add(cache_key, (fingerprint, None, None), timeout=LEASE_SECONDS):
+                return None
+            stored = self.cache.get(cache_key)
+            if stored is not None:
+                return StoredResponse(*stored)
+        # the key keeps being taken and released by other requests: answer as still running (409)
+        return StoredResponse(fingerprint, None, None)
+
+    def complete(self, scope, key, fingerprint, status_code, data):
+        self.cache.set(self._key(scope, key), (fingerprint, status_code, data), timeout=self.ttl)
+
+    def release(self, scope, key):
+        self.cache.delete(self._key(scope, key))
+
+
+STORES = {"database": DatabaseIdempotencyStore, "cache": CacheIdempotencyStore}
+
+# ---------- process-wide store ----------
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_idempotency_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                name = getattr(settings, "IDEMPOTENCY_STORE", "database")
+                if name not in STORES:
+                    raise ValueError(f"Unknown IDEMPOTENCY_STORE {name!r}; expected one of {sorted(STORES)}")
+                _store = STORES[name](getattr(settings, "IDEMPOTENCY_TTL", 86400))
+    return _store
+
+
+def reset_idempotency_store():
+    global _store
+    with _store_lock:
+        _store = None
+
+
+def idempotent(view):
+    """
+    Decorator for DRF function views, placed under @api_view and
+    @permission_classes so it runs after authentication. Requests without the
+    header, or from anonymous users, run as before.
+    """
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key or not request.user.is_authenticated:
+            return view(request, *args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return Response(
+                {"detail": f"{HEADER} must be at most {MAX_KEY_LENGTH} characters."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        store = get_idempotency_store()
+        scope = str(request.user.pk)
+        fingerprint = request_fingerprint(request)
+        stored = store.reserve(scope, key, fingerprint)
+        if stored is not None:
+            if stored.fingerprint != fingerprint:
+                return Response(
+                    {"detail": f"This {HEADER} was already used for a different request."},
+                    status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                )
+            if stored.status_code is None:
+                response = Response(
+                    {"detail": "The original request with this key is still being processed."},
+                    status=status.HTTP_409_CONFLICT,
+                )
+                response["Retry-After"] = "1"
+                return response
+            response = Response(stored.data, status=stored.status_code)
+            response["Idempotent-Replayed"] = "true"
+            return response
+
+        try:
+            response = view(request, *args, **kwargs)
+        except BaseException:
+            store.release(scope, key)
+            raise
+        if response.status_code >= 500 or not hasattr(response, "data"):
+            store.release(scope, key)
+        else:
+            store.complete(scope, key, fingerprint, response.status_code, response.data)
+        return response
+
+    return wrapper
@@ -0,0 +1,158 @@
+# Application/management/commands/load_test_apply.py
+"""
+Hammer apply_job on one job from many threads (and optionally processes) at
+once and check that exactly max_applicants applications get in: the
+Application rows, the job's counters and is_active must all agree.
+
+The seeded employer, job and applicants are real committed rows (the workers
+use their own database connections) and are deleted afterwards unless --keep.
+--processes forks worker processes (POSIX only), each running --threads threads.
+"""
+import multiprocessing
+import threading
+import time
+import uuid
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from Accounts.models import CustomUser
+from Application.models import Application
+from Application.views import apply_job
+from EmployerProfile.models import EmployerProfile
+from Jobs.models import JobCategory, Jobs
+from JobSeekerProfile.models import JobseekerProfile
+
+
+def _apply_all(job_id, user_ids, threads, start_at=None):
+    """Apply as each user from `threads` threads released together; [(status code or error, ms)]."""
+    users = list(CustomUser.objects.filter(id__in=user_ids))
+    connection.close()
+    results = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(threads)
+
+    def worker(chunk):
+        factory = APIRequestFactory()
+        out = []
+        try:
+            barrier.wait()
+            if start_at:
+                time.sleep(max(0.0, start_at - time.time()))
+            for user in chunk:
+                request = factory.post(f"/application/application/{job_id}/apply/", {}, format="json")
+                force_authenticate(request, user=user)
+                started = time.perf_counter()
+                try:
+                    outcome = apply_job(request, job_id=job_id).status_code
+                except Exception as e:       # e.g. "database is locked"
+                    outcome = type(e).__name__
+                out.append((outcome, (time.perf_counter() - started) * 1000))
+        finally:
+            connection.close()
+            with lock:
+                results.extend(out)
+
+    workers = [threading.Thread(target=worker, args=(users[i::threads],)) for i in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    return results
+
+
+def _process_main(args):
+    return _apply_all(*args)
+
+
+class Command(BaseCommand):
+    help = "Concurrent apply_job load test on one job: asserts exact max_applicants capacity and reports throughput."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--capacity", type=int, default=50, help="max_applicants of the job (default 50)")
+        parser.add_argument("--applicants", type=int, default=300, help="distinct job seekers applying (default 300)")
+        parser.add_argument("--threads", type=int, default=16, help="threads per process (default 16)")
+        parser.add_argument("--processes", type=int, default=1, help="worker processes, forked (default 1: this one)")
+        parser.add_argument("--keep", action="store_true", help="keep the seeded rows")
+
+    def handle(self, *args, **options):
+        if options["capacity"] < 1 or options["applicants"] < 1 or options["threads"] < 1 or options["processes"] < 1:
+            raise CommandError("--capacity, --applicants, --threads and --processes must be positive.")
+        run = uuid.uuid4().hex[:8]
+        employer_user, job, user_ids = self._seed(run, options)
+        try:
+            started = time.perf_counter()
+            results = self._hammer(job.id, user_ids, options)
+            elapsed = time.perf_counter() - started
+            self._report(job, results, elapsed, options)
+        finally:
+            if not options["keep"]:
+                CustomUser.objects.filter(id__in=[employer_user.id, *user_ids]).delete()
+
+    def _seed(self, run, options):
+        employer_user = CustomUser.objects.create_user(email=f"load-{run}-employer@example.invalid", role="employer")
+        employer = EmployerProfile.objects.create(
+            user=employer_user, first_name="Load", last_name="Test", business_name=f"Load Test {run}", city="Sittwe",
+        )
+        category = JobCategory.objects.create(name=f"Load Test {run}", user=employer_user)
+        job = Jobs.objects.create(
+            employer=employer, category=category, title=f"Load test {run}", description="load test",
+            max_applicants=options["capacity"],
+        )
+        users = []
+        for i in range(options["applicants"]):
+            user = CustomUser(email=f"load-{run}-{i}@example.invalid")
+            user.set_unusable_password()
+            users.append(user)
+        CustomUser.objects.bulk_create(users, batch_size=500)
+        JobseekerProfile.objects.bulk_create(
+            [JobseekerProfile(user=user, full_name=f"Applicant {i}") for i, user in enumerate(users)], batch_size=500,
+        )
+        return employer_user, job, [user.id for user in users]
+
+    def _hammer(self, job_id, user_ids, options):
+        processes, threads = options["processes"], options["threads"]
+        if processes == 1:
+            return _apply_all(job_id, user_ids, threads)
+        # children must not share the parent's connection; start them all at the same instant
+        connections.close_all()
+        start_at = time.time() + 1.0
+        chunks = [(job_id, user_ids[i::processes], threads, start_at) for i in range(processes)]
+        with multiprocessing.get_context("fork").Pool(processes) as pool:
+            return [row for rows in pool.map(_process_main, chunks) for row in rows]
+
+    def _report(self, job, results, elapsed, options):
+        capacity, applicants = options["capacity"], options["applicants"]
+        outcomes = {}
+        for outcome, _ in results:
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+        latencies = [ms for _, ms in results]
+        expected = min(capacity, applicants)
+
+        job.refresh_from_db()
+        rows = Application.objects.filter(job=job).count()
+        self.stdout.write(
+            f"{len(results)} applies by {options['processes']}x{options['threads']} workers in {elapsed:.2f}s "
+            f"({len(results) / elapsed:.0f}/s); p50 {np.percentile(latencies, 50):.1f} ms, "
+            f"p95 {np.percentile(latencies, 95):.1f} ms, p99 {np.percentile(latencies, 99):.1f} ms"
+        )
+        self.stdout.write("outcomes: " + ", ".join(f"{k}={v}" for k, v in sorted(outcomes.items(), key=str)))
+        self.stdout.write(
+            f"capacity {capacity}: applications={rows} application_count={job.application_count} "
+            f"pending_count={job.pending_count} is_active={job.is_active}"
+        )
+        problems = []
+        if outcomes.get(201, 0) != expected:
+            problems.append(f"{outcomes.get(201, 0)} applies accepted, expected {expected}")
+        if not rows == job.application_count == job.pending_count == expected:
+            problems.append("application rows and counters disagree with the capacity")
+        if job.is_active != (applicants < capacity):
+            problems.append(f"job is_active={job.is_active} after {rows}/{capacity} applications")
+        errors = {k: v for k, v in outcomes.items() if k not in (201, 400)}
+        if errors:
+            problems.append(f"failed requests: {errors}")
+        if problems:
+            raise CommandError("; ".join(problems))
+        self.stdout.write(self.style.SUCCESS("capacity held exactly"))
@@ -0,0 +1,15 @@
+# Application/management/commands/purge_idempotency_keys.py
+from django.core.management.base import BaseCommand
+
+from Application.idempotency import DatabaseIdempotencyStore
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired Idempotency-Key responses from the database store "
+        "(the store also purges a few on its own as keys are written)."
+    )
+
+    def handle(self, *args, **options):
+        removed = DatabaseIdempotencyStore(ttl=0).purge_expired()
+        self.stdout.write(f"{removed} expired key(s) removed")
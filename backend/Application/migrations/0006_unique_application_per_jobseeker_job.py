@@ -0,0 +1,93 @@
+# Generated by Django 5.2.6 on 2026-10-18 13:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+# of duplicate applications, the one furthest along the workflow is kept, then the earliest
+STATUS_RANK = {"H": 5, "SL": 4, "RJ": 3, "R": 2, "P": 1}
+STATUS_COUNTERS = {
+    "P": "pending_count",
+    "R": "review_count",
+    "SL": "shortlist_count",
+    "RJ": "rejected_count",
+    "H": "hired_count",
+}
+
+
+def remove_duplicate_applications(apps, schema_editor):
+    Application = apps.get_model("Application", "Application")
+    ContentType = apps.get_model("contenttypes", "ContentType")
+    Jobs = apps.get_model("Jobs", "Jobs")
+    Notification = apps.get_model("Notification", "Notification")
+
+    groups = (
+        Application.objects.filter(job_seeker_profile__isnull=False)
+        .order_by()
+        .values("job_id", "job_seeker_profile_id")
+        .annotate(n=Count("id"))
+        .filter(n__gt=1)
+    )
+    kept_for, job_ids = {}, set()
+    for group in groups:
+        rows = list(
+            Application.objects.filter(job_id=group["job_id"], job_seeker_profile_id=group["job_seeker_profile_id"])
+            .values_list("id", "status", "applied_at")
+        )
+        rows.sort(key=lambda r: (-STATUS_RANK.get(r[1], 0), r[2] is None, r[2].timestamp() if r[2] else 0, str(r[0])))
+        for duplicate_id, _, _ in rows[1:]:
+            kept_for[duplicate_id] = rows[0][0]
+        job_ids.add(group["job_id"])
+    if not kept_for:
+        return
+
+    # notifications about a removed duplicate point at the application that was kept
+    content_type = ContentType.objects.filter(app_label="Application", model="application").first()
+    if content_type:
+        for duplicate_id, kept_id in kept_for.items():
+            Notification.objects.filter(content_type=content_type, object_id=duplicate_id).update(object_id=kept_id)
+    duplicate_ids = list(kept_for)
+    for start in range(0, len(duplicate_ids), 500):
+        Application.objects.filter(id__in=duplicate_ids[start:start + 500]).delete()
+
+    # the counters of Jobs (Jobs migration 0021) counted the duplicates
+    def count(**filters):
+        rows = Application.objects.filter(job=OuterRef("pk"), **filters).order_by().values("job")
+        return Coalesce(Subquery(rows.annotate(n=Count("pk")).values("n")), 0)
+
+    Jobs.objects.filter(id__in=job_ids).update(
+        application_count=count(),
+        **{field: count(status=status) for status, field in STATUS_COUNTERS.items()},
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("Application", "0005_idempotency_key"),
+        ("JobSeekerProfile", "0006_merge_20251023_0952"),
+        ("Jobs", "0021_application_counters"),
+        ("Notification", "0001_initial"),
+        ("contenttypes", "0002_remove_content_type_name"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="application",
+            name="job",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="applications",
+                to="Jobs.jobs",
+            ),
+        ),
+        migrations.RunPython(remove_duplicate_applications, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="application",
+            constraint=models.UniqueConstraint(
+                fields=("job_seeker_profile", "job"),
+                name="unique_application_per_jobseeker_job",
+            ),
+        ),
+    ]
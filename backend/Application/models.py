@@ -1,10 +1,38 @@
-from django.db import models
+from django.db import models, router
+from django.db.models.signals import post_save, pre_save
 from JobSeekerProfile.models import JobseekerProfile,Resume
 from Jobs.models import Jobs
 from django.db.models import Q
 from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
 import uuid
 
+
+def insert_or_ignore(instance):
+    """
+    Insert one new instance with INSERT ... ON CONFLICT DO NOTHING (INSERT OR
+    IGNORE on SQLite, through bulk_create(ignore_conflicts=True)): a duplicate
+    costs no IntegrityError round trip. Returns True if the row went in, False if
+    a unique constraint already held an equal row. bulk_create() cannot tell
+    which of the two happened, so the instance needs its primary key before the
+    insert (the UUID default) and a lookup by it answers. Sends pre_save, and
+    post_save when the row went in, like save().
+    """
+    model = type(instance)
+    if instance.pk is None:
+        raise ValueError(f"insert_or_ignore() needs the primary key of the {model.__name__} before the insert.")
+    using = router.db_for_write(model, instance=instance)
+    pre_save.send(sender=model, instance=instance, raw=False, using=using, update_fields=None)
+    model._default_manager.using(using).bulk_create([instance], ignore_conflicts=True)
+    inserted = model._default_manager.using(using).filter(pk=instance.pk).exists()
+    if inserted:
+        post_save.send(sender=model, instance=instance, created=True, update_fields=None, raw=False, using=using)
+    else:
+        # bulk_create() marks every instance as saved
+        instance._state.adding, instance._state.db = True, None
+    return inserted
+
+
 class SaveJob(models.Model):
     id = models.UUIDField(
         primary_key=True,      # ဒီ field ကို primary key လုပ်မယ်
@@ -70,6 +98,15 @@ class Application(models.Model):
 
     objects = ApplicationManager()
 
+    class Meta:
+        constraints = [
+            # restored by migration 0006 after removing the duplicates
+            models.UniqueConstraint(
+                fields=["job_seeker_profile", "job"],
+                name="unique_application_per_jobseeker_job",
+            ),
+        ]
+
     def __str__(self):
         return f"{self.job_seeker_profile} applied for {self.job}"
         
@@ -77,3 +114,23 @@ class Application(models.Model):
 
 
 
+
+
+# replayable responses of apply / save requests sent with an Idempotency-Key header
+# (Application/idempotency.py); status_code is null while the first request is running
+class IdempotencyKey(models.Model):
+    scope = models.CharField(max_length=64)          # the requesting user's id
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64)    # sha256 of method, path and body
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    response = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["scope", "key"], name="unique_idempotency_key_per_scope"),
+        ]
+
+    def __str__(self):
+        return f"{self.scope}:{self.key}"
@@ -3,7 +3,9 @@ import json
 from uuid import UUID
 from datetime import date, datetime
 from .models import *
+from django.db.models import Exists, OuterRef
 from Jobs.serializers import JobsSerializer
+from JobSeeker.listing import SparseFieldsMixin
 from Application.models import Resume
 from JobSeekerProfile.models import Education, Experience, Skill, Language
 
@@ -13,7 +15,7 @@ class ResumeSerializer(serializers.ModelSerializer):
         model = Resume
         fields = "__all__"
 
-class ApplicationListSerializer(serializers.ModelSerializer):
+class ApplicationListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     job = JobsSerializer(read_only=True)
     status_display = serializers.CharField(source="get_status_display", read_only=True)
     jobseeker_name = serializers.CharField(source="job_seeker_profile.full_name", read_only=True)
@@ -22,6 +24,8 @@ class ApplicationListSerializer(serializers.ModelSerializer):
     class Meta:
         model=Application
         fields = ["id", "job_seeker_profile","jobseeker_email","jobseeker_name", "job","status_display", "status", "applied_at","cover_letter_text"]
+        expandable = {"job": "Jobs.serializers.JobsSerializer"}
+        expanded_by_default = ["job"]
 
 class ApplicationDetailSerializer(serializers.ModelSerializer):
     job = JobsSerializer(read_only=True)
@@ -32,15 +36,25 @@ class ApplicationDetailSerializer(serializers.ModelSerializer):
         model = Application
         fields = "__all__"
 
-class SaveJobsSerializer(serializers.ModelSerializer):
+class SaveJobsSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     job=JobsSerializer(read_only=True)
     job_id=serializers.UUIDField(write_only=True)
     is_applied = serializers.SerializerMethodField()
     class Meta:
         model=SaveJob
         fields='__all__'
+        expandable = {"job": "Jobs.serializers.JobsSerializer"}
+        expanded_by_default = ["job"]
+        # lists answer is_applied in the same query
+        annotations = {
+            "is_applied": Exists(
+                Application.objects.filter(job=OuterRef("job"), job_seeker_profile=OuterRef("profile"))
+            ),
+        }
 
     def get_is_applied(self, obj):
+        if hasattr(obj, "is_applied"):
+            return obj.is_applied
         user_profile = obj.profile
         if not user_profile:
             return False
@@ -1,3 +1,157 @@
+from unittest import mock
+
+from django.core.cache.backends.locmem import LocMemCache
+from django.db.models.signals import post_save, pre_save
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from Accounts.models import CustomUser
+from Application.idempotency import (
+    HEADER, CacheIdempotencyStore, DatabaseIdempotencyStore, StoredResponse, get_idempotency_store,
+    reset_idempotency_store,
+)
+from Application.models import Application, IdempotencyKey, SaveJob, insert_or_ignore
+from EmployerProfile.models import EmployerProfile
+from Jobs.models import JobCategory, Jobs
+from JobSeekerProfile.models import JobseekerProfile
+
+
+class ApplicationTestCase(TestCase):
+    """A job seeker with a profile, and an employer with one open job."""
+
+    def setUp(self):
+        user = CustomUser.objects.create_user(email="e@example.com", password="pw", role="employer")
+        employer = EmployerProfile.objects.create(
+            user=user, first_name="A", last_name="B", business_name="Arakan Tech", city="Sittwe",
+        )
+        category = JobCategory.objects.create(name="Software Engineering", user=user)
+        self.job = Jobs.objects.create(
+            employer=employer, category=category, title="Python Developer", description="Django", location="SIT",
+        )
+        self.seeker = CustomUser.objects.create_user(email="s@example.com", password="pw")
+        self.profile = JobseekerProfile.objects.create(user=self.seeker, full_name="Mg Mg")
+        self.client = APIClient()
+        self.client.force_authenticate(self.seeker)
+
+    def apply(self, key=None, **data):
+        headers = {HEADER: key} if key else {}
+        return self.client.post(
+            f"/application/application/{self.job.id}/apply/", data, format="json", headers=headers,
+        )
+
+
+# ---------- idempotency keys ----------
+class IdempotentApplyTests(ApplicationTestCase):
+    def setUp(self):
+        super().setUp()
+        reset_idempotency_store()
+        self.addCleanup(reset_idempotency_store)
+
+    def test_retry_replays_the_response(self):
+        first = self.apply("key-1", cover_letter_text="Hello")
+        self.assertEqual(first.status_code, 201)
+        retry = self.apply("key-1", cover_letter_text="Hello")
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(Application.objects.count(), 1)
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.application_count, 1)
+
+    def test_key_reused_for_another_request(self):
+        self.assertEqual(self.apply("key-1", cover_letter_text="Hello").status_code, 201)
+        response = self.apply("key-1", cover_letter_text="Something else")
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(Application.objects.count(), 1)
+
+    def test_retry_while_running(self):
+        with mock.patch("Application.idempotency.request_fingerprint", return_value="f"):
+            get_idempotency_store().reserve(str(self.seeker.pk), "key-1", "f")
+            response = self.apply("key-1")
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response["Retry-After"], "1")
+        self.assertEqual(Application.objects.count(), 0)
+
+    def test_without_key(self):
+        self.assertEqual(self.apply().status_code, 201)
+        self.assertEqual(self.apply().status_code, 400)
+        self.assertEqual(IdempotencyKey.objects.count(), 0)
+
+    def test_keys_are_per_user(self):
+        self.assertEqual(self.apply("key-1").status_code, 201)
+        other = CustomUser.objects.create_user(email="t@example.com", password="pw")
+        JobseekerProfile.objects.create(user=other, full_name="Ma Ma")
+        self.client.force_authenticate(other)
+        response = self.apply("key-1")
+        self.assertEqual(response.status_code, 201)
+        self.assertNotIn("Idempotent-Replayed", response)
+        self.assertEqual(Application.objects.count(), 2)
+
+
+class IdempotencyStoreTests(TestCase):
+    def stores(self):
+        return [DatabaseIdempotencyStore(60), CacheIdempotencyStore(60, LocMemCache("idempotency-tests", {}))]
+
+    def test_reserve_release_complete(self):
+        for store in self.stores():
+            with self.subTest(store=store.name):
+                self.assertIsNone(store.reserve("1", "k", "f"))
+                self.assertEqual(store.reserve("1", "k", "f"), StoredResponse("f", None, None))
+                self.assertEqual(store.reserve("1", "k", "g"), StoredResponse("f", None, None))
+                store.release("1", "k")
+                self.assertIsNone(store.reserve("1", "k", "f"))
+                store.complete("1", "k", "f", 201, {"ok": True})
+                self.assertEqual(store.reserve("1", "k", "f"), StoredResponse("f", 201, {"ok": True}))
+                self.assertIsNone(store.reserve("2", "k", "f"))
+
+    def test_cache_store_racing_keys_are_in_progress(self):
+        class Racing:
+            """Every add() loses and every get() finds the key released again."""
+
+            def add(self, *args, **kwargs):
+                return False
+
+            def get(self, *args, **kwargs):
+                return None
+
+        self.assertEqual(
+            CacheIdempotencyStore(60, Racing()).reserve("1", "k", "f"), StoredResponse("f", None, None),
+        )
+
+
+# ---------- insert or ignore ----------
+class InsertOrIgnoreTests(ApplicationTestCase):
+    def test_duplicate_save_job(self):
+        first = SaveJob(profile=self.profile, job=self.job)
+        self.assertTrue(insert_or_ignore(first))
+        self.assertFalse(first._state.adding)
+        duplicate = SaveJob(profile=self.profile, job=self.job)
+        self.assertFalse(insert_or_ignore(duplicate))
+        self.assertTrue(duplicate._state.adding)
+        self.assertEqual(list(SaveJob.objects.values_list("pk", flat=True)), [first.pk])
+
+    def test_signals_like_save(self):
+        sent = []
+        for signal in (pre_save, post_save):
+            signal.connect(lambda signal, **kwargs: sent.append(signal), sender=Application, weak=False, dispatch_uid="test")
+            self.addCleanup(signal.disconnect, sender=Application, dispatch_uid="test")
+        self.assertTrue(insert_or_ignore(Application(job_seeker_profile=self.profile, job=self.job)))
+        self.assertEqual(sent, [pre_save, post_save])
+        self.assertFalse(insert_or_ignore(Application(job_seeker_profile=self.profile, job=self.job)))
+        self.assertEqual(sent, [pre_save, post_save, pre_save])
+        # counted by the post_save receiver of Jobs/signals.py
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.application_count, 1)
+
+    def test_needs_a_primary_key(self):
+        with self.assertRaises(ValueError):
+            insert_or_ignore(IdempotencyKey(scope="1", key="k", fingerprint="f"))
 
-# Create your tests here.
+    def test_duplicate_apply_and_save_endpoints(self):
+        self.assertEqual(self.apply().status_code, 201)
+        self.assertEqual(self.apply().status_code, 400)
+        self.assertEqual(Application.objects.count(), 1)
+        for expected in (201, 400):
+            response = self.client.post(f"/application/save/job/{self.job.id}/")
+            self.assertEqual(response.status_code, expected)
+        self.assertEqual(SaveJob.objects.count(), 1)
@@ -1,15 +1,15 @@
 # applications/views.py
 from django.core.mail import send_mail
-from django.template.loader import render_to_string
 from django.core.mail import EmailMultiAlternatives
 from django.conf import settings
+from django.utils import timezone
 from rest_framework.decorators import api_view, permission_classes, parser_classes
 from rest_framework.permissions import IsAuthenticated,AllowAny
 from rest_framework.response import Response
 import datetime
 from rest_framework import status
 from django.shortcuts import get_object_or_404  # see below
-from django.db import IntegrityError, transaction
+from django.db import transaction
 from .models import Jobs,JobseekerProfile
 from rest_framework.parsers import JSONParser, MultiPartParser, FormParser
 from .models import *
@@ -17,80 +17,96 @@ from Application.models import *
 from Notification.models import *
 from Jobs.models import *
 from .serializers import *
+from Jobs.signals import reindex_after_update
+from .idempotency import idempotent
+from Notification.emails import render_email
+from JobSeeker.listing import InvalidCursor, ListParamError, keyset_page, list_params, list_queryset
 #hello wrold
 
+
+def _list_page(request, queryset, name, serializer_class=ApplicationListSerializer, ordering=("-applied_at", "-id")):
+    """
+    One keyset page (?limit, ?cursor) of queryset, newest first, reading and
+    rendering only ?fields / ?expand: (data, next cursor, None) or (None, None, error).
+    """
+    try:
+        fields, expand, limit = list_params(request)
+        rows, next_cursor = keyset_page(
+            list_queryset(queryset, serializer_class, fields, expand),
+            ordering, request.GET.get("cursor"), name, limit,
+        )
+    except (ListParamError, InvalidCursor) as e:
+        return None, None, str(e)
+    return serializer_class(rows, many=True, fields=fields, expand=expand).data, next_cursor, None
+
+
+def _status_applications(request, apps, key, name):
+    s_apps, next_cursor, error = _list_page(request, apps, name)
+    if error:
+        return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+    return Response({
+        key: s_apps,
+        "count": apps.count(),
+        "next": next_cursor,
+        })
+
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 @parser_classes([JSONParser, MultiPartParser, FormParser])
+@idempotent
 def apply_job(request, job_id):
     #Get job seeker profile & job
     profile = get_object_or_404(JobseekerProfile, user=request.user)
-    job = get_object_or_404(Jobs, id=job_id)
-    print(job.id)
-    print("Max applicants:", job.max_applicants, type(job.max_applicants))
-    
-    # Duplicate application check
-    if Application.objects.filter(job=job, job_seeker_profile=profile).exists():
-        return Response(
-            {"message": "You have already applied for this job."},
-            status=status.HTTP_400_BAD_REQUEST
-        )
-
-    #Max applicants null-safe check
-    max_limit = getattr(job, "max_applicants", None)
-    total = Application.objects.filter(job=job).count()
-
-    # Treat 0 or None as unlimited
-    if max_limit is None or max_limit <= 0:
-        max_limit = None
-
-    if max_limit is not None and total >= max_limit:
-        if job.is_active:
-            job.is_active = False
-            job.save(update_fields=["is_active"])
-        
-        return Response(
-        {"message": "The maximum number of applicants for this job has been reached."},
-        status=status.HTTP_400_BAD_REQUEST
-    )
-
-    
+    job = get_object_or_404(Jobs.objects.select_related("category", "employer__user"), id=job_id)
 
     #Serialize incoming data
     serializer = ApplicationCreateSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
-    #Create application inside a transaction
-    try:
-        with transaction.atomic():
-            application = Application.objects.create(
-                job_seeker_profile=profile,
-                job=job,
-                status=serializer.validated_data.get("status", "P"),
-                cover_letter_text=serializer.validated_data.get("cover_letter_text", "")
+    application_status = serializer.validated_data.get("status", "P")
+
+    #Insert and claim a slot in one transaction. The insert is INSERT ... ON CONFLICT DO NOTHING
+    #against the unique (job, job seeker) constraint, so a duplicate is one statement and no error.
+    #The capacity check, the counters and closing the job on the last slot are a single conditional
+    #UPDATE (Jobs.objects.claim_application_slot), so bursts of applies never overshoot max_applicants
+    with transaction.atomic():
+        application = Application(
+            job_seeker_profile=profile,
+            job=job,
+            status=application_status,
+            cover_letter_text=serializer.validated_data.get("cover_letter_text", "")
+        )
+        application._slot_claimed = True       # counted by claim_application_slot below
+        if not insert_or_ignore(application):
+            return Response(
+                {"message": "You have already applied for this job."},
+                status=status.HTTP_400_BAD_REQUEST
             )
 
-            #Re-count AFTER creating; close job if hitting limit
-            total_after = Application.objects.filter(job=job).count()
-            if max_limit is not None and total_after >= max_limit and job.is_active:
-                job.is_active = False
-                job.save(update_fields=["is_active"])
+        if not Jobs.objects.claim_application_slot(job.id, application_status):
+            transaction.set_rollback(True)
+            expired = job.deadline is not None and job.deadline < timezone.localdate()
+            message = (
+                "The maximum number of applicants for this job has been reached."
+                if job.is_active and not expired else "This job is no longer accepting applications."
+            )
+            return Response({"message": message}, status=status.HTTP_400_BAD_REQUEST)
 
-            s_application = ApplicationDetailSerializer(application).data
-            return Response({
-                "success": True,
-                "message": f"You have successfully applied for the job '{job.title}'.",
-                "data": s_application
-            }, status=status.HTTP_201_CREATED)
+        #The last slot closes the job; search and the list columns must drop it
+        job.refresh_from_db(fields=["is_active", "application_count", *Jobs.STATUS_COUNTERS.values()])
+        if not job.is_active:
+            reindex_after_update([job.id])
 
-    except IntegrityError:
-        return Response(
-            {"message": "You have already applied for this job."},
-            status=status.HTTP_400_BAD_REQUEST
-        )
+        s_application = ApplicationDetailSerializer(application).data
+        return Response({
+            "success": True,
+            "message": f"You have successfully applied for the job '{job.title}'.",
+            "data": s_application
+        }, status=status.HTTP_201_CREATED)
 
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@idempotent
 def save_job(request,job_id):
     try:
         profile=JobseekerProfile.objects.get(user=request.user)
@@ -101,16 +117,16 @@ def save_job(request,job_id):
         job=Jobs.objects.get(id=job_id)
     except Jobs.DoesNotExist:
         return Response({"detail": "This job does not exist"}, status=status.HTTP_404_NOT_FOUND)
-    try:
-        save_job=SaveJob.objects.create(profile=profile,job=job)
-        s_save_job=SaveJobsSerializer(save_job).data
-        return Response({
-            "success": True,
-            "message": f"Job '{job.title}' has been saved successfully.",
-            "data": s_save_job
-        }, status=status.HTTP_201_CREATED)
-    except IntegrityError:
+    # one INSERT ... ON CONFLICT DO NOTHING against the unique (profile, job) constraint
+    save_job=SaveJob(profile=profile,job=job)
+    if not insert_or_ignore(save_job):
         return Response({"detail": "You have already saved this job"}, status=status.HTTP_400_BAD_REQUEST)
+    s_save_job=SaveJobsSerializer(save_job).data
+    return Response({
+        "success": True,
+        "message": f"Job '{job.title}' has been saved successfully.",
+        "data": s_save_job
+    }, status=status.HTTP_201_CREATED)
 
 
 @api_view(['GET',])
@@ -122,8 +138,11 @@ def saved_jobs(request):
         return Response({"detail": "Ah! You have to create profile before save job"}, status=status.HTTP_404_NOT_FOUND)
     
     savejobs=SaveJob.objects.filter(profile=profile)
-    s_savejobs=SaveJobsSerializer(savejobs,many=True).data
-    return Response({"s_savejobs":s_savejobs})
+    # SaveJob has no timestamp; the id is a stable order for the cursor
+    s_savejobs,next_cursor,error=_list_page(request,savejobs,"saved-jobs",SaveJobsSerializer,("-id",))
+    if error:
+        return Response({"error":error},status=status.HTTP_400_BAD_REQUEST)
+    return Response({"s_savejobs":s_savejobs,"next":next_cursor})
 
     
 @api_view(['GET'])
@@ -160,8 +179,10 @@ def saved_job_remove(request,sj_id):
 @api_view(['GET'])
 def applied_jobs(request):
     applications = Application.objects.filter(job_seeker_profile__user=request.user)
-    app_job=ApplicationListSerializer(applications,many=True).data
-    return Response({"apply_jobs": app_job})
+    app_job,next_cursor,error=_list_page(request,applications,"applied-jobs")
+    if error:
+        return Response({"error":error},status=status.HTTP_400_BAD_REQUEST)
+    return Response({"apply_jobs": app_job,"next":next_cursor})
 
 @api_view(['GET'])
 def applied_job_detail(request,app_id):
@@ -184,8 +205,10 @@ def applied_job_remove(request,app_id):
 def applications(request):
     employer=get_object_or_404(EmployerProfile,user=request.user)
     query=Application.objects.applications_for_employer(employer)
-    applications=ApplicationListSerializer(query,many=True).data
-    return Response({"applications":applications})
+    applications,next_cursor,error=_list_page(request,query,"applications")
+    if error:
+        return Response({"error":error},status=status.HTTP_400_BAD_REQUEST)
+    return Response({"applications":applications,"next":next_cursor})
 
 
 @api_view(["GET"])
@@ -210,62 +233,44 @@ def application_delete(request,app_id):
 @permission_classes([IsAuthenticated])
 def pending_applications(request):
     apps = Application.objects.submitted_applications(request.user)
-    s_apps=ApplicationListSerializer(apps,many=True).data
-    return Response({
-        "pending_apps":s_apps,
-        "count": len(s_apps)
-        })
+    return _status_applications(request, apps, "pending_apps", "pending-applications")
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def reviewed_applications(request):
     apps = Application.objects.reviewed_applications(request.user)
-    s_apps=ApplicationListSerializer(apps,many=True).data
-    return Response({
-        "reviewed_apps":s_apps,
-        "count": len(s_apps)
-        })
+    return _status_applications(request, apps, "reviewed_apps", "reviewed-applications")
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def rejected_applications(request):
     apps = Application.objects.rejected_applications(request.user)
-    s_apps=ApplicationListSerializer(apps,many=True).data
-    return Response({
-        "rejected_apps":s_apps,
-        "count": len(s_apps)
-        })
+    return _status_applications(request, apps, "rejected_apps", "rejected-applications")
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def shortlist_applications(request):
     apps = Application.objects.shortlist_applications(request.user)
-    s_apps=ApplicationListSerializer(apps,many=True).data
-    return Response({
-        "shorlist_apps":s_apps,
-        "count": len(s_apps)
-        })
+    return _status_applications(request, apps, "shorlist_apps", "shortlist-applications")
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def hired_applications(request):
     apps = Application.objects.hired_applications(request.user)
-    s_apps=ApplicationListSerializer(apps,many=True).data
-    return Response({
-        "hired_apps":s_apps,
-        "count": len(s_apps)
-        })
+    return _status_applications(request, apps, "hired_apps", "hired-applications")
 
 
 
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
+@transaction.atomic
 def update_application_status(request, app_id):
     """
     Employer updates application status.
-    Sends notification + HTML email to jobseeker
+    Sends notification + HTML email (through the outbox) to jobseeker,
+    in one transaction with the status change
     """
     employer = getattr(request.user, "employerprofile", None)
     if not employer:
@@ -353,29 +358,21 @@ def update_application_status(request, app_id):
 
         subject = f"Your application status updated to '{status_label}' for {job_title}"
 
-        # Plain-text version
-        text_content = (
-            f"Hello {username},\n\n"
-            f"Your application for the position '{job_title}' has been updated.\n"
-            f"New status: {status_label}\n\n"
-            f"View your application here:\n{application_link}\n\n"
-            f"Thank you for using Arakkha Job Connect."
+        # HTML and plain-text versions, from the precompiled template
+        # (status_label picks the wording, so each status is compiled separately)
+        html_content, text_content = render_email(
+            "emails/application_status_update.html",
+            {
+                "username": username,
+                "job_title": job_title,
+                "status_label": status_label,
+                "status_class": status_class,
+                "application_link": application_link,
+                "year": timezone.localdate().year,
+            },
+            keyed=("status_label",),
         )
 
-        # Render HTML from template file
-        html_content = render_to_string(
-        "emails/application_status_update.html",
-        {
-            "username": username,
-            "job_title": job_title,
-            "status_label": status_label,
-            "status_class": status_class, 
-            "application_link": application_link,
-            "year":datetime.now().year,
-            
-        },
-    )
-
         email = EmailMultiAlternatives(
             subject=subject,
             body=text_content,
@@ -383,7 +380,8 @@ def update_application_status(request, app_id):
             to=[recipient],
         )
         email.attach_alternative(html_content, "text/html")
-        email.send(fail_silently=True)
+        # queued in the request's transaction; `manage.py run_mail_worker` sends it (with retries)
+        EmailOutbox.objects.enqueue(email, kind="application_status")
 
     return Response(
         {
@@ -396,8 +394,12 @@ def update_application_status(request, app_id):
 
 @api_view(['GET'])
 def recent_applications(request):
-    recent_apps=Application.objects.recent_applications()
-    s_recent_apps=ApplicationListSerializer(recent_apps,many=True).data
+    try:
+        fields, expand, _ = list_params(request)
+    except ListParamError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    recent_apps=list_queryset(Application.objects.recent_applications(),ApplicationListSerializer,fields,expand)
+    s_recent_apps=ApplicationListSerializer(recent_apps,many=True,fields=fields,expand=expand).data
     return Response({
         "s_recent_apps":s_recent_apps
     })
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.6 on 2026-10-18 12:43
+
+from django.db import migrations, models
+
+from Jobs.search.zawgyi import to_unicode
+
+
+def backfill_business_name(apps, schema_editor):
+    EmployerProfile = apps.get_model("EmployerProfile", "EmployerProfile")
+    profiles = list(EmployerProfile.objects.only("id", "business_name"))
+    for profile in profiles:
+        profile.business_name_normalized = to_unicode(profile.business_name)
+    EmployerProfile.objects.bulk_update(profiles, ["business_name_normalized"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("EmployerProfile", "0002_employerprofile_created_at_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="employerprofile",
+            name="business_name_normalized",
+            field=models.CharField(
+                blank=True, default="", editable=False, max_length=255
+            ),
+        ),
+        migrations.RunPython(backfill_business_name, migrations.RunPython.noop),
+    ]
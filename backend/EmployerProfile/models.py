@@ -20,6 +20,8 @@ class EmployerProfile(models.Model):
     first_name = models.CharField(max_length=100)
     last_name = models.CharField(max_length=100)
     business_name = models.CharField(max_length=255)
+    # Unicode-normalized copy of business_name (Zawgyi converted), filled on save
+    business_name_normalized = models.CharField(max_length=255, blank=True, default="", editable=False)
     city = models.CharField(max_length=100)
     phone = models.CharField(max_length=50, blank=True,null=True)
     #  size = models.CharField(max_length=20, choices=COMPANY_SIZE_CHOICES)
@@ -2,6 +2,8 @@ from rest_framework import serializers
 from Accounts.models import *
 from .models import EmployerProfile
 from Jobs.models import Jobs
+from django.db.models import Count
+from JobSeeker.listing import SparseFieldsMixin
 
 
 class EmployerPreRegisterSerializer(serializers.Serializer):
@@ -34,13 +36,14 @@ class EmployerUpdateProfileSerializer(serializers.ModelSerializer):
         fields=["first_name", "last_name", "business_name", "city","logo","phone", "size", "website", "industry", "founded_year", "contact_email", "description",]
         read_only_fields = ["user"]
 
-class CompanySerializer(serializers.ModelSerializer):
+class CompanySerializer(SparseFieldsMixin, serializers.ModelSerializer):
     job_count = serializers.IntegerField(read_only=True)
     class Meta:
         model=EmployerProfile
         fields=['id','first_name','last_name','business_name','city','phone','size','website','industry','logo','founded_year','contact_email','job_count', 'description',]
+        annotations = {"job_count": Count("jobs")}
 
-class JobcompanySerializer(serializers.ModelSerializer):
+class JobcompanySerializer(SparseFieldsMixin, serializers.ModelSerializer):
     
     class Meta:
         model=Jobs
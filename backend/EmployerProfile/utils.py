@@ -3,9 +3,10 @@ from django.utils.encoding import force_bytes
 from django.contrib.auth.tokens import default_token_generator
 from django.urls import reverse
 from django.core.mail import EmailMultiAlternatives
-from django.template.loader import render_to_string
 from django.conf import settings
 from email.utils import formataddr
+from Notification.emails import render_email
+from Notification.models import EmailOutbox
 import datetime
 
 def send_verification_email(request, user):
@@ -20,16 +21,8 @@ def send_verification_email(request, user):
         )
     )
     subject = "Verify Your Employer Account"
-    # Plain text fallback
-    text_content = (
-        f"Hello {user.email},\n\n"
-        f"Please verify your employer account using the link below:\n"
-        f"{verify_url}\n\n"
-        f"If you didn't request this, you can ignore this email."
-    )
-
-    # HTML Email Content
-    html_content = render_to_string(
+    # HTML and plain-text versions, from the precompiled template
+    html_content, text_content = render_email(
         "emails/employer_email_verify.html",
         {
             "email": user.email,
@@ -45,5 +38,6 @@ def send_verification_email(request, user):
         [user.email],
     )
     email.attach_alternative(html_content, "text/html")
-    email.send()
+    # delivered by `manage.py run_mail_worker`
+    EmailOutbox.objects.enqueue(email, kind="employer_verification")
 
@@ -9,21 +9,24 @@ from .utils import send_verification_email
 from django.utils.http import urlsafe_base64_decode
 from django.contrib.auth.tokens import default_token_generator
 from django.contrib.auth import login,logout,authenticate
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
 from django_ratelimit.decorators import ratelimit
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.parsers import JSONParser,MultiPartParser, FormParser
 from django.utils import timezone
-from django.db.models import Q,F
+from django.db.models import Q,F,Sum
 import json
 from .serializers import *
 from Jobs.serializers import *
 from Application.serializers import ApplicationListSerializer
 #models
 from Jobs.models import Jobs
+from Jobs.search import get_backend
+from Jobs.search.zawgyi import to_unicode
 from Application.models import Application
 from .models import EmployerProfile
 from django.db.models import Count
+from JobSeeker.listing import InvalidCursor, ListParamError, keyset_page, list_params, list_queryset
 User = get_user_model()
 
 # Pre-register employer (collect email & password)
@@ -98,26 +101,28 @@ def register_employer(request, role):
             status=409
         )
 
-    #Create User safely
-    user = User.objects.create(
-        email=email,
-        role=role,
-        is_active=False,
-        is_verified=False,
-    )
-    user.set_password(raw_password)
-    user.save()
-
-    #Create Employer Profile
-    profile_data = serializer.validated_data["profile"]
-    logo = serializer.validated_data.get("logo")
-    employer_profile = EmployerProfile.objects.create(
-        user=user, logo=logo, **profile_data
-    )
+    # user, profile and queued verification email: all of them or none
+    with transaction.atomic():
+        #Create User safely
+        user = User.objects.create(
+            email=email,
+            role=role,
+            is_active=False,
+            is_verified=False,
+        )
+        user.set_password(raw_password)
+        user.save()
+
+        #Create Employer Profile
+        profile_data = serializer.validated_data["profile"]
+        logo = serializer.validated_data.get("logo")
+        employer_profile = EmployerProfile.objects.create(
+            user=user, logo=logo, **profile_data
+        )
+        send_verification_email(request, user)
 
-    # Login + send email
+    # Login
     login(request, user)
-    send_verification_email(request, user)
     request.session["pending_activation"] = True
     return Response(
         {
@@ -222,7 +227,7 @@ def dashboard(request):
     today=timezone.localdate()
     user=request.user
     total_jobs=Jobs.objects.filter(employer__user=user).count()
-    total_applications=Application.objects.filter(job__employer__user=user).count()
+    total_applications=Jobs.objects.filter(employer__user=user).aggregate(n=Sum("application_count"))["n"] or 0
     active_jobs=Jobs.objects.filter(Q(employer__user=user)&Q(deadline__gte=today) | Q(deadline__isnull=True)).count()
     expired_jobs=Jobs.objects.filter(Q(employer__user=user)&Q(deadline__lt=today)).count()
     
@@ -286,31 +291,53 @@ def update_employer_profile(request, pk):
 #start company list
 @api_view(['GET'])
 def company_list(request):
-    companies_q = EmployerProfile.objects.annotate(job_count=Count("jobs"))
-    companies_s=CompanySerializer(companies_q,many=True).data
+    # job_count comes from CompanySerializer.Meta.annotations when it is rendered
+    try:
+        fields, expand, limit = list_params(request)
+        companies_q, next_cursor = keyset_page(
+            list_queryset(EmployerProfile.objects.all(), CompanySerializer, fields, expand),
+            ("-created_at", "-id"), request.GET.get("cursor"), "companies", limit,
+        )
+    except (ListParamError, InvalidCursor) as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    companies_s=CompanySerializer(companies_q,many=True,fields=fields,expand=expand).data
     return Response({
-        "companies":companies_s
+        "companies":companies_s,
+        "next":next_cursor,
     })
 #end
 
 #start jobs in company
 @api_view(['GET'])
 def jobs_in_company(request,com_id):
-    company=EmployerProfile.objects.filter(id=com_id)
-    if not company:
-        return Response({"error":"Company not found"},status=status.HTTP_404_NOT_FOUND)
-    jobs_in_com=Jobs.objects.filter(employer__id=com_id)
-    jobs_in_com_s=JobcompanySerializer(jobs_in_com,many=True).data
+    try:
+        fields, expand, limit = list_params(request)
+        company=list(list_queryset(EmployerProfile.objects.filter(id=com_id), CompanySerializer))
+        if not company:
+            return Response({"error":"Company not found"},status=status.HTTP_404_NOT_FOUND)
+        jobs_in_com, next_cursor = keyset_page(
+            list_queryset(Jobs.objects.filter(employer__id=com_id), JobcompanySerializer, fields, expand),
+            ("-created_at", "-id"), request.GET.get("cursor"), "company-jobs", limit,
+        )
+    except (ListParamError, InvalidCursor) as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    jobs_in_com_s=JobcompanySerializer(jobs_in_com,many=True,fields=fields,expand=expand).data
     company_s=CompanySerializer(company,many=True).data
-    return Response({"company_s":company_s,"jobs_in_com_s":jobs_in_com_s})
+    return Response({"company_s":company_s,"jobs_in_com_s":jobs_in_com_s,"next":next_cursor})
 #end
 
 #company serach
 @api_view(['GET'])
 def company_search(request):
-    query=request.GET.get('q','')
-    companies=EmployerProfile.objects.filter(business_name__icontains=query)
-    companies_s=CompanySerializer(companies,many=True).data
+    query=to_unicode(request.GET.get('q','')).strip()
+    try:
+        fields, expand, _ = list_params(request)
+    except ListParamError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    company_ids=get_backend().search_companies(query)
+    companies=list_queryset(EmployerProfile.objects.all(), CompanySerializer, fields, expand).in_bulk(company_ids)
+    companies=[companies[pk] for pk in company_ids if pk in companies]
+    companies_s=CompanySerializer(companies,many=True,fields=fields,expand=expand).data
     return Response({
         "companies":companies_s
     })
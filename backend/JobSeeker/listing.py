@@ -0,0 +1,177 @@
+# JobSeeker/listing.py
+"""
+Shared plumbing for the list endpoints (jobs, applications, companies):
+
+?fields=id,title,job.title   sparse fieldsets; dotted names reach into expanded objects
+?expand=job,job.category     which related objects are nested; the others render
+                             as their primary key. Without ?expand an endpoint
+                             nests what it always has.
+?limit=30&cursor=...         keyset pagination: the cursor wraps the sort key of the
+                             last row, so every page costs the same (no OFFSET).
+                             With neither, the whole list comes back in one page,
+                             as it did before pagination (the frontend relies on it)
+
+Serializers opt in with SparseFieldsMixin, and list_queryset() turns the fields
+a serializer will actually render into .only() / select_related() so list
+queries read just those columns.
+"""
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.utils.module_loading import import_string
+from rest_framework import serializers
+
+from Jobs.search.backends import keyset_q
+from Jobs.search.pagination import InvalidCursor, decode_cursor, encode_cursor
+
+DEFAULT_LIMIT = 30
+MAX_LIMIT = 100
+
+
+class ListParamError(ValueError):
+    pass
+
+
+def parse_fieldset(value):
+    """"id,job.title,job.location" -> {"id": {}, "job": {"title": {}, "location": {}}}; None if not given."""
+    if value is None:
+        return None
+    spec = {}
+    for path in value.split(","):
+        node = spec
+        for name in filter(None, (part.strip() for part in path.split("."))):
+            node = node.setdefault(name, {})
+    return spec
+
+
+def list_params(request):
+    """
+    (fields, expand, limit) from the query string; raises ListParamError.
+    limit is None (no paging) when neither ?limit nor ?cursor is given.
+    """
+    if not request.GET.get("limit") and not request.GET.get("cursor"):
+        limit = None
+    else:
+        try:
+            limit = min(max(int(request.GET.get("limit") or DEFAULT_LIMIT), 1), MAX_LIMIT)
+        except ValueError:
+            raise ListParamError("limit must be a number")
+    return parse_fieldset(request.GET.get("fields")), parse_fieldset(request.GET.get("expand")), limit
+
+
+class SparseFieldsMixin:
+    """
+    ModelSerializer mixin taking fields= / expand= specs (parse_fieldset()).
+
+    Meta.expandable maps a field name to the dotted path of the serializer it
+    nests as, and Meta.expanded_by_default lists the ones nested when no
+    expand spec is given. Naming sub-fields in fields= ("job.title") expands
+    too. A collapsed nested object renders as its primary key.
+    Meta.field_columns names the model columns a computed field reads and
+    Meta.annotations the expression list_queryset() annotates a field with.
+    """
+
+    def __init__(self, *args, fields=None, expand=None, **kwargs):
+        self._fieldset = fields
+        self._expand = expand
+        super().__init__(*args, **kwargs)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        fieldset = self._fieldset or {}
+        expand = self._expand
+        if expand is None:
+            expand = {name: {} for name in getattr(self.Meta, "expanded_by_default", ())}
+        for name, path in getattr(self.Meta, "expandable", {}).items():
+            if name in expand or fieldset.get(name):
+                fields[name] = import_string(path)(
+                    read_only=True, fields=fieldset.get(name) or None, expand=expand.get(name) or None,
+                )
+            elif isinstance(fields.get(name), serializers.BaseSerializer):
+                fields[name] = serializers.PrimaryKeyRelatedField(read_only=True)
+        if fieldset:
+            fields = {name: field for name, field in fields.items() if name in fieldset}
+        return fields
+
+
+def _columns(serializer, model, prefix, only, related, annotations):
+    meta = getattr(serializer, "Meta", None)
+    field_columns = getattr(meta, "field_columns", {})
+    only.add(prefix + model._meta.pk.name)
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        if isinstance(field, serializers.BaseSerializer):
+            # expanded object: joined in, with its own columns
+            relation = model._meta.get_field(field.source)
+            only.add(prefix + field.source)
+            related.add(prefix + field.source)
+            _columns(field, relation.related_model, f"{prefix}{field.source}__", only, related, annotations)
+            continue
+        if not prefix and name in getattr(meta, "annotations", {}):
+            annotations[name] = meta.annotations[name]
+            continue
+        for source in field_columns.get(name, [field.source]):
+            if source == "*":
+                continue
+            parts = source.split(".")
+            if parts[0].startswith("get_") and parts[0].endswith("_display"):
+                parts[0] = parts[0][len("get_"):-len("_display")]
+            current = model
+            for i, part in enumerate(parts):
+                try:
+                    model_field = current._meta.get_field(part)
+                except FieldDoesNotExist:
+                    break          # property or method: nothing to load
+                path = prefix + "__".join(parts[:i + 1])
+                if not model_field.concrete or model_field.many_to_many:
+                    break          # reverse or many-to-many relation
+                only.add(path)
+                if not (model_field.is_relation and i < len(parts) - 1):
+                    break
+                related.add(path)
+                current = model_field.related_model
+
+
+def list_queryset(queryset, serializer_class, fields=None, expand=None):
+    """
+    queryset restricted to what serializer_class(fields=, expand=) renders:
+    .only() its columns, select_related() the to-one relations it follows and
+    the Meta.annotations of the fields it keeps.
+    """
+    only, related, annotations = set(), set(), {}
+    _columns(serializer_class(fields=fields, expand=expand), queryset.model, "", only, related, annotations)
+    if annotations:
+        queryset = queryset.annotate(**annotations)
+    if related:
+        queryset = queryset.select_related(*sorted(related))
+    return queryset.only(*sorted(only))
+
+
+def keyset_page(queryset, ordering, cursor, name, limit):
+    """
+    (rows, next cursor or None) of one page of queryset in ordering (a total
+    order, e.g. ("-created_at", "-id")), after the row the cursor points at.
+    name scopes the cursor to one endpoint; raises InvalidCursor. The
+    ordering columns must be non-null. limit None returns every row.
+    """
+    if cursor:
+        values = decode_cursor(cursor, name)["k"]
+        if not (isinstance(values, list) and len(values) == len(ordering)):
+            raise InvalidCursor("Malformed cursor.")
+        try:
+            queryset = queryset.filter(keyset_q(ordering, values))
+        except (ValidationError, ValueError, TypeError):
+            # values the ordering columns cannot hold: a tampered cursor
+            raise InvalidCursor("Malformed cursor.")
+    if limit is None:
+        return list(queryset.order_by(*ordering)), None
+    rows = list(queryset.order_by(*ordering)[:limit + 1])
+    if len(rows) <= limit:
+        return rows, None
+    last = rows[limit - 1]
+    return rows[:limit], encode_cursor(name, {"k": [getattr(last, column.lstrip("-")) for column in ordering]})
+
+
+__all__ = [
+    "DEFAULT_LIMIT", "MAX_LIMIT", "InvalidCursor", "ListParamError", "SparseFieldsMixin",
+    "keyset_page", "list_params", "list_queryset", "parse_fieldset",
+]
@@ -1,5 +1,6 @@
 import os
 from pathlib import Path
+from corsheaders.defaults import default_headers
 from decouple import config
 
 
@@ -192,7 +193,13 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+# pooled SMTP sessions, sent concurrently (Notification/smtp_pool.py); the plain
+# 'django.core.mail.backends.smtp.EmailBackend' opens a session per send
+EMAIL_BACKEND = config('EMAIL_BACKEND', default='Notification.smtp_pool.PooledEmailBackend')
+# SMTP sessions kept open per process by the pooled backend
+EMAIL_POOL_SIZE = config('EMAIL_POOL_SIZE', default=4, cast=int)
+# messages sent over one session before it is replaced (providers cap messages per session)
+EMAIL_POOL_MAX_MESSAGES = config('EMAIL_POOL_MAX_MESSAGES', default=100, cast=int)
 EMAIL_HOST = config('EMAIL_HOST', default='smtp.gmail.com')
 EMAIL_PORT = config('EMAIL_PORT', default=587, cast=int)
 EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=True, cast=bool)
@@ -254,6 +261,47 @@ CSRF_TRUSTED_ORIGINS = [
     "https://*.railway.app",
 ]
 CORS_ALLOW_CREDENTIALS = True
+# browsers must be allowed to send the retry header of apply / save (Application/idempotency.py)
+CORS_ALLOW_HEADERS = (*default_headers, "idempotency-key")
+CORS_EXPOSE_HEADERS = ["Idempotent-Replayed"]
+
+# Job search backend (Jobs/search/backends.py): "memory" in-process index,
+# "database" indexed LIKE, "fulltext" SQLite FTS5 / Postgres tsvector (its tables are only
+# kept in sync while it is selected: run `manage.py rebuild_fulltext_index` when switching to it)
+JOB_SEARCH_BACKEND = config('JOB_SEARCH_BACKEND', default='memory')
+# snapshot of the memory backend's index written by `manage.py build_search_index`
+# and memory-mapped by every worker (Jobs/search/snapshot.py); built in-process when missing
+JOB_SEARCH_SNAPSHOT = config('JOB_SEARCH_SNAPSHOT', default=os.path.join(BASE_DIR, 'search_index.snapshot'))
+# seconds between polls of the job change log (Jobs/search/changes.py) by every process
+# holding in-memory search structures: how soon one worker sees another's writes
+JOB_SEARCH_SYNC_INTERVAL = config('JOB_SEARCH_SYNC_INTERVAL', default=1.0, cast=float)
+# seconds the change log is kept (purged by the job sweeper); a process that has not
+# polled for longer rebuilds its search structures from the tables
+JOB_CHANGE_RETENTION = config('JOB_CHANGE_RETENTION', default=86400, cast=int)
+# seconds between in-process job lifecycle sweeps (Jobs/lifecycle.py); 0 = off,
+# e.g. when `manage.py run_job_sweeper` runs as its own process
+JOB_SWEEPER_INTERVAL = config('JOB_SWEEPER_INTERVAL', default=0, cast=int)
+# share of first-page searches recorded in Jobs.SearchLog (0 disables), for `manage.py bench_search`;
+# each recorded search is an INSERT inside the request, so keep the sample small
+JOB_SEARCH_LOG_RATE = config('JOB_SEARCH_LOG_RATE', default=0.01, cast=float)
+# Idempotency-Key replays of apply / save (Application/idempotency.py): "database" table
+# or "cache" (the default cache; use a shared one such as Redis with several workers)
+IDEMPOTENCY_STORE = config('IDEMPOTENCY_STORE', default='database')
+# seconds a stored response is replayed for
+IDEMPOTENCY_TTL = config('IDEMPOTENCY_TTL', default=86400, cast=int)
+
+# Transactional mail is queued in Notification.EmailOutbox and delivered by
+# `manage.py run_mail_worker` (Notification/outbox.py):
+# failed attempts before a message is parked as dead
+EMAIL_OUTBOX_MAX_ATTEMPTS = config('EMAIL_OUTBOX_MAX_ATTEMPTS', default=8, cast=int)
+# seconds before the first retry; doubled per attempt, up to EMAIL_OUTBOX_BACKOFF_MAX
+EMAIL_OUTBOX_BACKOFF = config('EMAIL_OUTBOX_BACKOFF', default=30, cast=int)
+EMAIL_OUTBOX_BACKOFF_MAX = config('EMAIL_OUTBOX_BACKOFF_MAX', default=3600, cast=int)
+# seconds sent and dead messages are kept (envelope and error only: sent bodies are blanked)
+EMAIL_OUTBOX_RETENTION = config('EMAIL_OUTBOX_RETENTION', default=7 * 86400, cast=int)
+# seconds between in-process outbox deliveries (a thread in every web worker); 0 = off,
+# when run_mail_worker runs as its own process
+EMAIL_OUTBOX_WORKER_INTERVAL = config('EMAIL_OUTBOX_WORKER_INTERVAL', default=0, cast=int)
 
 EMAIL_SENDER_NAME = "Arakkha Job Connect"
 DEFAULT_FROM_EMAIL = "no-reply@yourdomain.com"
@@ -1,32 +1,25 @@
 import random
 from django.core.mail import EmailMultiAlternatives
 from django.conf import settings
-from django.template.loader import render_to_string
 import datetime
 from .models import JobseekerProfile
+from Notification.emails import render_email
+from Notification.models import EmailOutbox
 
 
 
 def send_verification_code(user):
     """
-    Sends OTP to the user's email using a clean HTML email template.
-    Returns the OTP code as string.
+    Queues the OTP email (clean HTML template) in the email outbox; the mail
+    worker sends it. Returns the OTP code as string.
     """
     otp_code = str(random.randint(100000,999999))  # always 6 digits
     subject = "Your Email Verification Code"
     jobseeker = user.email.split('@')[0] #user.email.split('@')[0]
     
 
-    # Plain text fallback
-    text_content = (
-        f"Hello {jobseeker},\n\n"
-        f"Your OTP verification code is: {otp_code}\n"
-        f"This code expires in 5 minutes.\n\n"
-        f"If you did not request this, please ignore this email."
-    )
-
-    # HTML Version
-    html_content = render_to_string(
+    # HTML and plain-text versions, from the precompiled template
+    html_content, text_content = render_email(
         "emails/otp_verification.html",
         {
             "username": jobseeker,
@@ -35,7 +28,7 @@ def send_verification_code(user):
         },
     )
 
-    # Send email
+    # Queue email (delivered by `manage.py run_mail_worker`)
     email = EmailMultiAlternatives(
         subject=subject,
         body=text_content,
@@ -43,6 +36,6 @@ def send_verification_code(user):
         to=[user.email],
     )
     email.attach_alternative(html_content, "text/html")
-    email.send(fail_silently=False)
+    EmailOutbox.objects.enqueue(email, kind="otp_verification")
 
     return otp_code
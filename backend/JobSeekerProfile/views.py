@@ -185,7 +185,7 @@ def otp_resend_jobseeker(request):
 
     # 3) (re)generate + send code
     try:
-        code = send_verification_code(email)   # your existing util
+        code = send_verification_code(user)   # your existing util
     except Exception:
         return Response({"error": "Failed to send verification code."},
                         status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -1,7 +1,7 @@
 # Register your models here.
 from django.contrib import admin
-from .models import JobCategory, Jobs
+from .models import JobCategory, Jobs, SearchLog
 
 admin.site.register(Jobs)
 admin.site.register(JobCategory )
-
+admin.site.register(SearchLog)
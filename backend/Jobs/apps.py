@@ -8,3 +8,8 @@ class JobsConfig(AppConfig):
 
     def ready(self):
         from . import signals   # <-- safer than hard-coding 'jobs.signals'
+        from django.conf import settings
+
+        if getattr(settings, "JOB_SWEEPER_INTERVAL", 0) > 0:
+            from .lifecycle import start_sweeper
+            start_sweeper(settings.JOB_SWEEPER_INTERVAL)
@@ -0,0 +1,86 @@
+# Jobs/lifecycle.py
+"""
+Job lifecycle sweeps: deactivate jobs past their deadline, close jobs that
+reached max_applicants and purge the job change log. Run periodically by `manage.py run_job_sweeper` or by
+the in-process sweeper thread (settings.JOB_SWEEPER_INTERVAL), so read paths
+like jobs_list never write.
+
+Each sweep is one indexed SELECT of the affected ids plus one conditional
+UPDATE, so it is safe to run from several processes at once.
+"""
+import logging
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import JobChange, Jobs
+from .signals import reindex_after_update
+
+logger = logging.getLogger(__name__)
+
+
+def _deactivate(queryset):
+    """Set is_active=False on the jobs of queryset that are still active; returns their ids."""
+    with transaction.atomic():
+        job_ids = list(queryset.filter(is_active=True).values_list("id", flat=True))
+        if job_ids:
+            Jobs.objects.filter(id__in=job_ids, is_active=True).update(is_active=False)
+            reindex_after_update(job_ids)
+    return job_ids
+
+
+def expire_jobs(today=None):
+    """Active jobs whose deadline has passed (uses the (is_active, deadline) index)."""
+    return _deactivate(Jobs.objects.filter(deadline__lt=today or timezone.localdate()))
+
+
+def close_full_jobs():
+    """Active jobs with a max_applicants limit that has been reached."""
+    return _deactivate(
+        Jobs.objects.filter(max_applicants__gt=0, application_count__gte=F("max_applicants"))
+    )
+
+
+def purge_job_changes():
+    """Drop JobChange rows older than settings.JOB_CHANGE_RETENTION (search/changes.py)."""
+    return JobChange.objects.purge(timezone.now() - timedelta(seconds=settings.JOB_CHANGE_RETENTION))
+
+
+def sweep(today=None):
+    """One pass of every lifecycle rule: {"expired": n, "closed": n}."""
+    result = {"expired": len(expire_jobs(today)), "closed": len(close_full_jobs())}
+    purge_job_changes()
+    if any(result.values()):
+        logger.info("Job sweep: %(expired)d expired, %(closed)d closed", result)
+    return result
+
+
+# ---------- in-process periodic sweeper ----------
+_sweeper = None
+_sweeper_lock = threading.Lock()
+
+
+def _run_forever(interval, stop):
+    while not stop.wait(interval):
+        try:
+            sweep()
+        except Exception:
+            logger.exception("Job sweep failed")
+        finally:
+            close_old_connections()
+
+
+def start_sweeper(interval):
+    """Start the daemon sweeper thread of this process (once); returns its stop event."""
+    global _sweeper
+    with _sweeper_lock:
+        if _sweeper is None:
+            stop = threading.Event()
+            thread = threading.Thread(target=_run_forever, args=(interval, stop), name="job-sweeper", daemon=True)
+            thread.start()
+            _sweeper = (thread, stop)
+        return _sweeper[1]
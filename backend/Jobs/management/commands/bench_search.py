@@ -0,0 +1,286 @@
+# Jobs/management/commands/bench_search.py
+"""
+Replay a query set against Jobs.views.search on each search backend and report
+latency percentiles, SQL queries per request and, against a judged set,
+recall@k and NDCG@k. Every backend answers the same queries through the same
+view, so the numbers are comparable across backends and across commits.
+
+Query sets (JSON lines of search parameters, e.g. {"q": "teacher", "loc": "SIT"}):
+  --queries FILE     a recorded or hand-written set
+  --from-log N       the last N rows of Jobs.SearchLog
+  (default)          synthetic queries drawn from the job titles
+Judged set (JSON lines: {"q": ..., "loc": ..., "relevant": {"<job id>": grade}}):
+  --judged FILE
+With --seed-jobs N, N synthetic jobs are added first and the queries are drawn
+from their vocabulary and judged from their known titles and descriptions.
+Everything runs in a transaction that is rolled back, so nothing is kept.
+"""
+import json
+import math
+import random
+import time
+from datetime import timedelta
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from Accounts.models import CustomUser
+from EmployerProfile.models import EmployerProfile
+from Jobs.models import JobCategory, Jobs, SearchLog
+from Jobs.search import fulltext_backend, get_backend, reset_index, reset_suggester, reset_vocabulary
+from Jobs.search.query_parser import reset_query_dictionary
+from Jobs.search.tokenizer import words
+from Jobs.signals import normalize_job_text
+from Jobs.views import search as search_view
+
+BACKENDS = ("memory", "database", "fulltext")
+
+SEED_TITLES = [
+    "Accountant", "Cashier", "Developer", "Driver", "Engineer", "Nurse", "Teacher", "Translator",
+    "Sales Executive", "Web Designer", "ဆရာမ", "စာရင်းကိုင်", "ယာဉ်မောင်း",
+]
+SEED_WORDS = [
+    "python", "english", "myanmar", "excel", "customer", "delivery", "hospital", "school",
+    "senior", "junior", "office", "marketing",
+]
+
+
+def percentile(values, p):
+    return float(np.percentile(values, p)) if values else None
+
+
+def recall_at(ranked, grades, k):
+    relevant = {job_id for job_id, grade in grades.items() if grade > 0}
+    if not relevant:
+        return None
+    return len(relevant & set(ranked[:k])) / min(len(relevant), k)
+
+
+def ndcg_at(ranked, grades, k):
+    dcg = sum((2 ** grades.get(job_id, 0) - 1) / math.log2(i + 2) for i, job_id in enumerate(ranked[:k]))
+    ideal = sorted(grades.values(), reverse=True)[:k]
+    idcg = sum((2 ** grade - 1) / math.log2(i + 2) for i, grade in enumerate(ideal))
+    return dcg / idcg if idcg else None
+
+
+def query_key(params):
+    return (" ".join((params.get("q") or "").lower().split()), (params.get("loc") or "").upper())
+
+
+def read_jsonl(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+    except (OSError, ValueError) as e:
+        raise CommandError(f"{path}: {e}")
+
+
+class Command(BaseCommand):
+    help = "Benchmark Jobs.views.search per backend: latency p50/p95/p99, queries per request, recall/NDCG."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--backend", action="append", choices=BACKENDS, help="repeatable; default: all")
+        parser.add_argument("--queries", help="JSON lines of search parameters")
+        parser.add_argument("--from-log", type=int, metavar="N", help="replay the last N SearchLog rows")
+        parser.add_argument("--synthetic", type=int, default=200, metavar="N", help="synthetic query count (default 200)")
+        parser.add_argument("--judged", help="JSON lines of {q, loc, relevant: {job id: grade}}")
+        parser.add_argument("--seed-jobs", type=int, default=0, metavar="N", help="add N synthetic jobs first")
+        parser.add_argument("--repeat", type=int, default=3, help="timed passes over the query set (default 3)")
+        parser.add_argument("--k", type=int, default=10, help="cutoff for recall and NDCG (default 10)")
+        parser.add_argument("--rng-seed", type=int, default=1)
+        parser.add_argument("--json", action="store_true", help="print the report as JSON")
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["rng_seed"])
+        self._reset_caches()
+        try:
+            with transaction.atomic():
+                report = self._run(options, rng)
+                transaction.set_rollback(True)
+        finally:
+            # the in-process indexes may have been built from rows that were rolled back
+            self._reset_caches()
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            self._print(report, options["k"])
+
+    def _reset_caches(self):
+        reset_index()
+        reset_suggester()
+        reset_vocabulary()
+        reset_query_dictionary()
+
+    # ---------- query sets ----------
+    def _run(self, options, rng):
+        judged = {}
+        if options["seed_jobs"]:
+            jobs = self._seed_jobs(options["seed_jobs"], rng)
+            queries, judged = self._seeded_queries(jobs, options["synthetic"], rng)
+        else:
+            queries = None
+        if options["queries"]:
+            queries = read_jsonl(options["queries"])
+        elif options["from_log"]:
+            logs = SearchLog.objects.order_by("-created_at")[:options["from_log"]]
+            queries = [{"q": log.q, "loc": log.loc, **log.params} for log in logs]
+        elif queries is None:
+            queries = self._synthetic_queries(options["synthetic"], rng)
+        if options["judged"]:
+            judged = {query_key(row): row["relevant"] for row in read_jsonl(options["judged"])}
+        if not queries:
+            raise CommandError("The query set is empty.")
+
+        user = CustomUser.objects.create_user(email="bench-search@example.invalid")
+        report = {"queries": len(queries), "judged": sum(query_key(q) in judged for q in queries), "backends": []}
+        with override_settings(JOB_SEARCH_LOG_RATE=0):
+            for name in options["backend"] or BACKENDS:
+                report["backends"].append(self._bench(name, queries, judged, user, options))
+        return report
+
+    def _synthetic_queries(self, n, rng):
+        titles = list(Jobs.objects.filter(is_active=True).values_list("title", flat=True)[:5000])
+        vocab = sorted({w for title in titles for w in words(title) if len(w) > 2})
+        if not vocab:
+            raise CommandError("No job titles to draw synthetic queries from; use --seed-jobs or --queries.")
+        return [self._random_query(vocab, rng) for _ in range(n)]
+
+    def _random_query(self, vocab, rng):
+        codes = [code for code, _ in Jobs.LOCATION_CHOICES]
+        roll = rng.random()
+        word = rng.choice(vocab)
+        if roll < 0.45:
+            return {"q": word}
+        if roll < 0.65:
+            return {"q": word[:max(3, len(word) // 2)]}     # typed prefix
+        if roll < 0.8:
+            return {"q": f"{word} {rng.choice(vocab)}"}
+        if roll < 0.95:
+            return {"q": word, "loc": rng.choice(codes)}
+        return {"q": "", "loc": rng.choice(codes)}
+
+    def _seed_jobs(self, n, rng):
+        employer_user = CustomUser.objects.create_user(email="bench-employer@example.invalid", role="employer")
+        employer = EmployerProfile.objects.create(
+            user=employer_user, first_name="Bench", last_name="Employer", business_name="Bench Co", city="Sittwe",
+        )
+        categories = [
+            JobCategory.objects.create(name=f"Bench {name}", user=employer_user)
+            for name in ("IT", "Education", "Health", "Finance")
+        ]
+        codes = [code for code, _ in Jobs.LOCATION_CHOICES]
+        job_types = [value for value, _ in Jobs.JOB_TYPE_CHOICES]
+        today = timezone.localdate()
+        jobs = []
+        for _ in range(n):
+            job = Jobs(
+                employer=employer,
+                category=rng.choice(categories),
+                title=f"{rng.choice(SEED_TITLES)} {rng.choice(SEED_WORDS)}",
+                description=" ".join(rng.sample(SEED_WORDS, 4)),
+                location=rng.choice(codes),
+                job_type=rng.choice(job_types),
+                salary=rng.choice([None, 200000, 350000, 500000, 800000, 1200000]),
+                priority=rng.choice(["NORMAL"] * 8 + ["FEATURED", "URGENT"]),
+                deadline=today + timedelta(days=rng.randint(-10, 60)),
+            )
+            # bulk_create sends no signals: fill the search columns the way pre_save would
+            normalize_job_text(Jobs, job)
+            jobs.append(job)
+        Jobs.objects.bulk_create(jobs, batch_size=1000)
+        backend = fulltext_backend()
+        if backend:
+            backend.index_jobs(jobs)
+        return jobs
+
+    def _seeded_queries(self, jobs, n, rng):
+        """Queries over the seeded vocabulary, judged 2 for a title match and 1 for a description match."""
+        today = timezone.localdate()
+        live = [job for job in jobs if job.deadline is None or job.deadline >= today]
+        vocab = sorted({w for title in SEED_TITLES for w in words(title)} | set(SEED_WORDS))
+        queries, judged = [], {}
+        for _ in range(n):
+            params = self._random_query(vocab, rng)
+            key = query_key(params)
+            if key in judged:
+                queries.append(params)
+                continue
+            terms = words(params.get("q") or "")
+            grades = {}
+            for job in live:
+                if params.get("loc") and job.location != params["loc"]:
+                    continue
+                title, text = words(job.title), words(f"{job.title} {job.description}")
+                if all(any(t.startswith(term) for t in title) for term in terms):
+                    grades[str(job.id)] = 2
+                elif all(any(t.startswith(term) for t in text) for term in terms):
+                    grades[str(job.id)] = 1
+            judged[key] = grades
+            queries.append(params)
+        return queries, judged
+
+    # ---------- measuring ----------
+    def _request(self, params, user):
+        request = APIRequestFactory().get("/job/search/", params)
+        force_authenticate(request, user=user)
+        return request
+
+    def _bench(self, name, queries, judged, user, options):
+        k = options["k"]
+        with override_settings(JOB_SEARCH_BACKEND=name):
+            # warm-up: builds the in-process indexes and fills caches outside the timings
+            first = [search_view(self._request(params, user)) for params in queries]
+            counts = []
+            for params in queries:
+                with CaptureQueriesContext(connection) as ctx:
+                    search_view(self._request(params, user))
+                counts.append(len(ctx.captured_queries))
+            latencies, errors = [], 0
+            for _ in range(options["repeat"]):
+                for params in queries:
+                    request = self._request(params, user)
+                    started = time.perf_counter()
+                    response = search_view(request)
+                    latencies.append((time.perf_counter() - started) * 1000)
+                    errors += response.status_code != 200
+            served_by = get_backend().name
+
+        recalls, ndcgs = [], []
+        for params, response in zip(queries, first):
+            grades = judged.get(query_key(params))
+            if grades is None or response.status_code != 200:
+                continue
+            ranked = [str(row["id"]) for row in response.data["results"]]
+            recall, ndcg = recall_at(ranked, grades, k), ndcg_at(ranked, grades, k)
+            if recall is not None:
+                recalls.append(recall)
+            if ndcg is not None:
+                ndcgs.append(ndcg)
+        return {
+            "backend": name,
+            "served_by": served_by,
+            "requests": len(latencies),
+            "errors": errors,
+            "p50_ms": percentile(latencies, 50),
+            "p95_ms": percentile(latencies, 95),
+            "p99_ms": percentile(latencies, 99),
+            "queries_per_request": sum(counts) / len(counts),
+            f"recall@{k}": sum(recalls) / len(recalls) if recalls else None,
+            f"ndcg@{k}": sum(ndcgs) / len(ndcgs) if ndcgs else None,
+        }
+
+    def _print(self, report, k):
+        self.stdout.write(f"{report['queries']} queries, {report['judged']} judged")
+        columns = ["backend", "served_by", "requests", "errors", "p50_ms", "p95_ms", "p99_ms",
+                   "queries_per_request", f"recall@{k}", f"ndcg@{k}"]
+        self.stdout.write("  ".join(f"{c:>19}" for c in columns))
+        for row in report["backends"]:
+            cells = []
+            for c in columns:
+                value = row[c]
+                cells.append(f"{value:>19.3f}" if isinstance(value, float) else f"{'-' if value is None else value:>19}")
+            self.stdout.write("  ".join(cells))
@@ -0,0 +1,48 @@
+# Jobs/management/commands/rebuild_fulltext_index.py
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from EmployerProfile.models import EmployerProfile
+from Jobs.models import Jobs
+from Jobs.search import fulltext_backend
+
+
+class Command(BaseCommand):
+    help = (
+        "Refill the full-text tables (SQLite FTS5 / Postgres tsvector) from the Jobs and "
+        "EmployerProfile tables. They are only kept in sync while JOB_SEARCH_BACKEND is "
+        "\"fulltext\": run this before switching to it."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=2000, help="rows per insert batch (default 2000)")
+
+    def handle(self, *args, **options):
+        backend = fulltext_backend()
+        if backend is None:
+            raise CommandError("This database has no full-text backend.")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive.")
+        size = options["batch_size"]
+        with transaction.atomic():
+            backend.clear()
+            jobs = Jobs.objects.select_related("employer", "category").order_by("pk")
+            job_count = _in_batches(jobs, size, backend.index_jobs)
+            company_count = _in_batches(EmployerProfile.objects.order_by("pk"), size, backend.index_companies)
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {job_count} job(s) and {company_count} company(ies) in {backend.name}"
+        ))
+
+
+def _in_batches(queryset, size, write):
+    batch, count = [], 0
+    for row in queryset.iterator(chunk_size=size):
+        batch.append(row)
+        if len(batch) == size:
+            write(batch)
+            count += len(batch)
+            batch = []
+    if batch:
+        write(batch)
+        count += len(batch)
+    return count
@@ -0,0 +1,24 @@
+# Jobs/management/commands/reconcile_application_counts.py
+from django.core.management.base import BaseCommand
+
+from Jobs.models import Jobs
+
+
+class Command(BaseCommand):
+    help = (
+        "Check the per-job application counters against the Application table and recount "
+        "the jobs that drifted (e.g. after raw SQL or bulk writes that skip signals)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="report drift without fixing it")
+        parser.add_argument("--verbose-drift", action="store_true", help="list every drifted job")
+
+    def handle(self, *args, **options):
+        drift = Jobs.objects.reconcile_application_counts(fix=not options["dry_run"])
+        if options["verbose_drift"]:
+            for job_id, wrong in drift.items():
+                changes = ", ".join(f"{field} {stored}->{actual}" for field, (stored, actual) in wrong.items())
+                self.stdout.write(f"{job_id}: {changes}")
+        verb = "drifted" if options["dry_run"] else "recounted"
+        self.stdout.write(f"{len(drift)} job(s) {verb}")
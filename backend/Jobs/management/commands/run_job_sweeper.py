@@ -0,0 +1,28 @@
+# Jobs/management/commands/run_job_sweeper.py
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+
+from Jobs.lifecycle import sweep
+
+
+class Command(BaseCommand):
+    help = (
+        "Deactivate jobs past their deadline and close jobs that reached max_applicants, "
+        "once (--once) or every --interval seconds."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--interval", type=int, default=300, help="seconds between sweeps (default 300)")
+        parser.add_argument("--once", action="store_true", help="run one sweep and exit")
+
+    def handle(self, *args, **options):
+        while True:
+            result = sweep()
+            self.stdout.write(f"{timezone.now():%Y-%m-%d %H:%M:%S} expired={result['expired']} closed={result['closed']}")
+            if options["once"]:
+                return
+            close_old_connections()
+            time.sleep(options["interval"])
@@ -0,0 +1,70 @@
+# Generated by Django 5.2.6 on 2026-10-18 12:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from Jobs.search.tokenizer import grams
+
+
+def backfill_search_grams(apps, schema_editor):
+    Jobs = apps.get_model("Jobs", "Jobs")
+    JobSearchGram = apps.get_model("Jobs", "JobSearchGram")
+    locations = dict(Jobs._meta.get_field("location").choices)
+    batch = []
+    for job in Jobs.objects.select_related("employer", "category").iterator(chunk_size=500):
+        texts = (
+            job.title,
+            job.category.name if job.category else "",
+            job.employer.business_name if job.employer else "",
+            f"{job.location or ''} {locations.get(job.location, '')}",
+            job.description,
+        )
+        job_grams = set()
+        for text in texts:
+            job_grams |= grams(text)
+        batch.extend(JobSearchGram(job_id=job.id, gram=gram) for gram in job_grams)
+        if len(batch) >= 5000:
+            JobSearchGram.objects.bulk_create(batch)
+            batch = []
+    JobSearchGram.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("Jobs", "0012_remove_jobcategory_unique_category_per_employer_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="JobSearchGram",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("gram", models.CharField(max_length=64)),
+                (
+                    "job",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="search_grams",
+                        to="Jobs.jobs",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("gram", "job"), name="unique_search_gram_per_job"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_search_grams, migrations.RunPython.noop),
+    ]
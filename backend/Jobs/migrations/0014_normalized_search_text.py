@@ -0,0 +1,49 @@
+# Generated by Django 5.2.6 on 2026-10-18 12:43
+
+from django.db import migrations, models
+
+from Jobs.search.zawgyi import to_unicode
+
+
+def backfill_normalized_text(apps, schema_editor):
+    Jobs = apps.get_model("Jobs", "Jobs")
+    JobCategory = apps.get_model("Jobs", "JobCategory")
+    jobs = list(Jobs.objects.only("id", "title", "description"))
+    for job in jobs:
+        job.title_normalized = to_unicode(job.title)
+        job.description_normalized = to_unicode(job.description)
+    Jobs.objects.bulk_update(jobs, ["title_normalized", "description_normalized"], batch_size=500)
+    categories = list(JobCategory.objects.only("id", "name"))
+    for category in categories:
+        category.name_normalized = to_unicode(category.name)
+    JobCategory.objects.bulk_update(categories, ["name_normalized"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("Jobs", "0013_jobsearchgram"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="jobcategory",
+            name="name_normalized",
+            field=models.CharField(
+                blank=True, default="", editable=False, max_length=100
+            ),
+        ),
+        migrations.AddField(
+            model_name="jobs",
+            name="description_normalized",
+            field=models.TextField(blank=True, default="", editable=False),
+        ),
+        migrations.AddField(
+            model_name="jobs",
+            name="title_normalized",
+            field=models.CharField(
+                blank=True, default="", editable=False, max_length=150
+            ),
+        ),
+        migrations.RunPython(backfill_normalized_text, migrations.RunPython.noop),
+    ]
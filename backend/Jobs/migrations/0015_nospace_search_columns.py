@@ -0,0 +1,91 @@
+# Generated by Django 5.2.6 on 2026-10-18 12:44
+
+from django.db import migrations, models
+
+from Jobs.search.tokenizer import squash
+
+TRIGRAM_COLUMNS = ["title_nospace", "location_nospace", "category_name_nospace", "description_nospace"]
+
+
+def backfill_nospace_columns(apps, schema_editor):
+    Jobs = apps.get_model("Jobs", "Jobs")
+    jobs = list(Jobs.objects.select_related("category"))
+    for job in jobs:
+        job.title_nospace = squash(job.title)
+        job.location_nospace = squash(job.location)
+        job.category_name_nospace = squash(job.category.name) if job.category else ""
+        job.description_nospace = squash(job.description)
+    Jobs.objects.bulk_update(jobs, TRIGRAM_COLUMNS, batch_size=500)
+
+
+def create_trigram_indexes(apps, schema_editor):
+    # LIKE '%...%' can only use an index on Postgres, through pg_trgm
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    table = apps.get_model("Jobs", "Jobs")._meta.db_table
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for column in TRIGRAM_COLUMNS:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS "jobs_{column}_trgm" ON "{table}" USING gin ("{column}" gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for column in TRIGRAM_COLUMNS:
+        schema_editor.execute(f'DROP INDEX IF EXISTS "jobs_{column}_trgm"')
+
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("EmployerProfile", "0003_normalized_search_text"),
+        ("Jobs", "0014_normalized_search_text"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="jobs",
+            name="category_name_nospace",
+            field=models.CharField(
+                blank=True, default="", editable=False, max_length=100
+            ),
+        ),
+        migrations.AddField(
+            model_name="jobs",
+            name="description_nospace",
+            field=models.TextField(blank=True, default="", editable=False),
+        ),
+        migrations.AddField(
+            model_name="jobs",
+            name="location_nospace",
+            field=models.CharField(
+                blank=True, default="", editable=False, max_length=20
+            ),
+        ),
+        migrations.AddField(
+            model_name="jobs",
+            name="title_nospace",
+            field=models.CharField(
+                blank=True, default="", editable=False, max_length=150
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="jobs",
+            index=models.Index(
+                fields=[
+                    "is_active",
+                    "title_nospace",
+                    "category_name_nospace",
+                    "location_nospace",
+                    "priority",
+                    "created_at",
+                ],
+                name="jobs_search_nospace_idx",
+            ),
+        ),
+        migrations.RunPython(backfill_nospace_columns, migrations.RunPython.noop),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
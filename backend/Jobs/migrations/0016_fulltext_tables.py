@@ -0,0 +1,64 @@
+# Full-text tables for Jobs/search/backends.py: FTS5 on SQLite, tsvector + GIN on Postgres.
+# Other vendors get nothing and fall back to the database backend.
+
+from django.db import migrations
+
+from Jobs.search.backends import JOB_COLUMNS, FTS_TOKENIZE, fulltext_backend
+
+
+def create_fulltext_tables(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5("
+            f"job_id UNINDEXED, {', '.join(JOB_COLUMNS)}, tokenize=\"{FTS_TOKENIZE}\")"
+        )
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS company_fts USING fts5("
+            f"company_id UNINDEXED, business_name, tokenize=\"{FTS_TOKENIZE}\")"
+        )
+    elif vendor == "postgresql":
+        schema_editor.execute(
+            "CREATE TABLE IF NOT EXISTS jobs_search_document (job_id uuid PRIMARY KEY, document tsvector NOT NULL)"
+        )
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS jobs_search_document_gin ON jobs_search_document USING gin (document)"
+        )
+        schema_editor.execute(
+            "CREATE TABLE IF NOT EXISTS company_search_document (company_id uuid PRIMARY KEY, document tsvector NOT NULL)"
+        )
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS company_search_document_gin ON company_search_document USING gin (document)"
+        )
+    else:
+        return
+
+    backend = fulltext_backend()
+    Jobs = apps.get_model("Jobs", "Jobs")
+    EmployerProfile = apps.get_model("EmployerProfile", "EmployerProfile")
+    backend.index_jobs(Jobs.objects.select_related("employer", "category"))
+    backend.index_companies(EmployerProfile.objects.all())
+
+
+def drop_fulltext_tables(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        tables = ["jobs_fts", "company_fts"]
+    elif vendor == "postgresql":
+        tables = ["jobs_search_document", "company_search_document"]
+    else:
+        return
+    for table in tables:
+        schema_editor.execute(f"DROP TABLE IF EXISTS {table}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("EmployerProfile", "0003_normalized_search_text"),
+        ("Jobs", "0015_nospace_search_columns"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fulltext_tables, drop_fulltext_tables),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.6 on 2026-10-18 12:57
+
+from django.db import migrations, models
+
+from Jobs.search.backends import fulltext_backend
+from Jobs.search.index import job_grams
+
+
+def refresh_minbrar_jobs(apps, schema_editor):
+    # 'MB' used to be listed twice, so MINBRAR jobs were indexed under the MYEBON label.
+    # Existing 'MB' rows stay MINBRAR (the first, selectable choice); MYEBON is now 'MBN'.
+    Jobs = apps.get_model("Jobs", "Jobs")
+    JobSearchGram = apps.get_model("Jobs", "JobSearchGram")
+    jobs = list(Jobs.objects.filter(location="MB").select_related("employer", "category"))
+    if not jobs:
+        return
+    JobSearchGram.objects.filter(job__in=jobs).delete()
+    JobSearchGram.objects.bulk_create(
+        (JobSearchGram(job_id=job.id, gram=gram) for job in jobs for gram in job_grams(job)),
+        batch_size=2000,
+    )
+    backend = fulltext_backend()
+    if backend:
+        backend.index_jobs(jobs)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("Jobs", "0016_fulltext_tables"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="jobs",
+            name="location",
+            field=models.CharField(
+                choices=[
+                    ("MO", "MRAUK-U"),
+                    ("MB", "MINBRAR"),
+                    ("SIT", "SITTWE"),
+                    ("RD", "RETHEEDAUNG"),
+                    ("MD", "MAUNGDAW"),
+                    ("KP", "KYAWTPYHU"),
+                    ("TD", "THANDWE"),
+                    ("TG", "TOUNGUP"),
+                    ("AN", "ANN"),
+                    ("PNG", "PONNAGYUN"),
+                    ("KT", "KYAUKTAW"),
+                    ("RM", "RAMREE"),
+                    ("MA", "MANAUNG"),
+                    ("GW", "GWA"),
+                    ("PT", "PAUKTAW"),
+                    ("BTD", "BUTHIDAUNG"),
+                    ("MBN", "MYEBON"),
+                ],
+                db_index=True,
+                default="MO",
+                null=True,
+            ),
+        ),
+        migrations.RunPython(refresh_minbrar_jobs, migrations.RunPython.noop),
+    ]
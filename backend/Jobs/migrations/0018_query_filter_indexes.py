@@ -0,0 +1,35 @@
+# Generated by Django 5.2.6 on 2026-10-18 13:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("Jobs", "0017_township_codes"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="jobs",
+            name="job_type",
+            field=models.CharField(
+                choices=[
+                    ("FULL", "Full-time"),
+                    ("PART", "Part-time"),
+                    ("INTERN", "Internship"),
+                    ("REMOTE", "Remote"),
+                ],
+                db_index=True,
+                default="FULL",
+                null=True,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="jobs",
+            name="salary",
+            field=models.DecimalField(
+                blank=True, db_index=True, decimal_places=2, max_digits=12, null=True
+            ),
+        ),
+    ]
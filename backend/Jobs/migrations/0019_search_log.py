@@ -0,0 +1,34 @@
+# Generated by Django 5.2.6 on 2026-10-18 13:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("Jobs", "0018_query_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SearchLog",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("q", models.CharField(blank=True, default="", max_length=200)),
+                ("loc", models.CharField(blank=True, default="", max_length=100)),
+                ("params", models.JSONField(blank=True, default=dict)),
+                ("backend", models.CharField(max_length=20)),
+                ("result_ids", models.JSONField(blank=True, default=list)),
+                ("latency_ms", models.FloatField()),
+                ("created_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+        ),
+    ]
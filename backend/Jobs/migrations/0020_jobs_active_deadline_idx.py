@@ -0,0 +1,20 @@
+# Generated by Django 5.2.6 on 2026-10-18 13:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("EmployerProfile", "0003_normalized_search_text"),
+        ("Jobs", "0019_search_log"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="jobs",
+            index=models.Index(
+                fields=["is_active", "deadline"], name="jobs_active_deadline_idx"
+            ),
+        ),
+    ]
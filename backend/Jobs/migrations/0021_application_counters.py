@@ -0,0 +1,69 @@
+# Generated by Django 5.2.6 on 2026-10-18 13:22
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+STATUS_COUNTERS = {
+    "P": "pending_count",
+    "R": "review_count",
+    "SL": "shortlist_count",
+    "RJ": "rejected_count",
+    "H": "hired_count",
+}
+
+
+def fill_counters(apps, schema_editor):
+    Jobs = apps.get_model("Jobs", "Jobs")
+    Application = apps.get_model("Application", "Application")
+
+    def count(**filters):
+        rows = Application.objects.filter(job=OuterRef("pk"), **filters).order_by().values("job")
+        return Coalesce(Subquery(rows.annotate(n=Count("pk")).values("n")), 0)
+
+    Jobs.objects.update(
+        application_count=count(),
+        **{field: count(status=status) for status, field in STATUS_COUNTERS.items()},
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("Application", "0004_alter_application_job"),
+        ("Jobs", "0020_jobs_active_deadline_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="jobs",
+            name="application_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="jobs",
+            name="hired_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="jobs",
+            name="pending_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="jobs",
+            name="rejected_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="jobs",
+            name="review_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="jobs",
+            name="shortlist_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.6 on 2026-10-18 13:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("Jobs", "0021_application_counters"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="JobChange",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("job_id", models.UUIDField()),
+                ("changed_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,16 @@
+# Generated by Django 5.2.6 on 2026-10-18 13:57
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("Jobs", "0022_job_change_log"),
+    ]
+
+    operations = [
+        migrations.DeleteModel(
+            name="JobSearchGram",
+        ),
+    ]
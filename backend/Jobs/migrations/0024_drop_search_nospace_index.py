@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-18 14:22
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("Jobs", "0023_drop_job_search_gram"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="jobs",
+            name="jobs_search_nospace_idx",
+        ),
+    ]
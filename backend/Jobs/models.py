@@ -2,6 +2,10 @@ from django.db import models
 from django.db import models
 from EmployerProfile.models import EmployerProfile
 from Accounts.models import CustomUser
+from django.db.models import Q, F, Case, When, Value, IntegerField
+from django.db.models.functions import Greatest
+from .search.tokenizer import squash
+from django.utils import timezone
 import uuid
 
 class JobCategory(models.Model):
@@ -11,6 +15,8 @@ class JobCategory(models.Model):
         editable=False         # User လက်နဲ့ မပြင်နိုင်အောင် lock
     )
     name = models.CharField(max_length=100)
+    # Unicode-normalized copy of name (Zawgyi converted), filled on save
+    name_normalized = models.CharField(max_length=100, blank=True, default="", editable=False)
     created_at = models.DateTimeField(auto_now_add=True,blank=True,null=True)
     updated_at = models.DateTimeField(auto_now=True,blank=True,null=True)
     user=models.ForeignKey(CustomUser,on_delete=models.CASCADE,blank=True,null=True)
@@ -28,18 +34,128 @@ class JobCategory(models.Model):
 
 #manager job
 class JobsManager(models.Manager):  
-     
-    def quick_search_by_city(self, city_name):
-        qs=self.get_queryset()
-        if city_name:
-            qs=qs.filter(location__icontains=city_name)
-        return qs 
-    
-    def quick_search_by_category(self, category_name):
-        qs=self.get_queryset()
-        if category_name:
-            qs=qs.filter(category__name__icontains=category_name)
-        return qs
+
+    def search(self, q="", loc=None, filters=None):
+        """
+        Database search over the stored *_nospace columns (see Jobs.Meta):
+        active, non-expired jobs ordered by priority then newest first, with the
+        id as tie-breaker so the ordering is total (keyset pagination relies on it).
+        loc is a township code (or a list of codes), already resolved through the gazetteer;
+        filters are the structured filters of search/query_parser.py.
+        """
+        today = timezone.localdate()
+        qs = self.filter(is_active=True).filter(Q(deadline__isnull=True) | Q(deadline__gte=today))
+        q = squash(q)
+        if q:
+            qs = qs.filter(
+                Q(title_nospace__contains=q) |
+                Q(location_nospace__contains=q) |
+                Q(category_name_nospace__contains=q) |
+                Q(description_nospace__contains=q)
+            )
+        if isinstance(loc, (list, tuple)):
+            qs = qs.filter(location__in=loc)
+        elif loc:
+            qs = qs.filter(location=loc)
+        filters = filters or {}
+        if filters.get("job_type"):
+            qs = qs.filter(job_type=filters["job_type"])
+        if filters.get("category"):
+            qs = qs.filter(category_id__in=filters["category"])
+        if filters.get("salary_min") is not None:
+            qs = qs.filter(salary__gte=filters["salary_min"])
+        if filters.get("salary_max") is not None:
+            qs = qs.filter(salary__lte=filters["salary_max"])
+        return qs.annotate(
+            priority_rank=Case(
+                When(priority="FEATURED", then=Value(3)),
+                When(priority="URGENT", then=Value(2)),
+                default=Value(1),
+                output_field=IntegerField(),
+            )
+        ).order_by("-priority_rank", "-created_at", "-id")
+
+    def adjust_application_counts(self, job_id, old_status=None, new_status=None, total=0):
+        """
+        One atomic F() UPDATE of a job's application counters: total added to
+        application_count, one application moved out of old_status and into
+        new_status (either may be None). Counters never go below zero.
+        """
+        changes = {}
+        if total:
+            changes["application_count"] = Greatest(F("application_count") + total, 0)
+        if old_status != new_status:
+            for status, delta in ((old_status, -1), (new_status, 1)):
+                field = Jobs.STATUS_COUNTERS.get(status)
+                if field:
+                    changes[field] = Greatest(F(field) + delta, 0)
+        if changes:
+            self.filter(pk=job_id).update(**changes)
+
+    def claim_application_slot(self, job_id, status="P"):
+        """
+        Count one new application against a job in a single conditional UPDATE:
+        only while the job is active, not past its deadline (whether or not the
+        sweeper has deactivated it yet) and under max_applicants (0 = unlimited),
+        deactivating it when this application takes the last slot. Concurrent
+        claims serialize on the row, so a job never goes over capacity.
+        Returns True if a slot was taken; the caller then inserts the
+        Application in the same transaction, flagged so the counter signal
+        does not count it twice.
+        """
+        changes = {
+            "application_count": F("application_count") + 1,
+            "is_active": Case(
+                When(Q(max_applicants__gt=0) & Q(application_count__gte=F("max_applicants") - 1), then=Value(False)),
+                default=Value(True),
+            ),
+        }
+        field = Jobs.STATUS_COUNTERS.get(status)
+        if field:
+            changes[field] = F(field) + 1
+        under_capacity = Q(max_applicants=0) | Q(application_count__lt=F("max_applicants"))
+        open_today = Q(deadline__isnull=True) | Q(deadline__gte=timezone.localdate())
+        return self.filter(under_capacity, open_today, pk=job_id, is_active=True).update(**changes) == 1
+
+    def reconcile_application_counts(self, fix=True):
+        """
+        Compare every job's counters with the Application table; with fix,
+        recount the drifted jobs in one UPDATE of correlated subqueries (so
+        applications written meanwhile are counted too). Returns
+        {job id: {counter: (stored, actual)}} of the jobs that had drifted.
+        """
+        from django.db.models import Count, OuterRef, Subquery
+        from django.db.models.functions import Coalesce
+        from Application.models import Application
+
+        fields = ["application_count", *Jobs.STATUS_COUNTERS.values()]
+        actual = {}
+        rows = Application.objects.order_by().values_list("job_id", "status").annotate(n=Count("pk"))
+        for job_id, status, n in rows:
+            counts = actual.setdefault(job_id, dict.fromkeys(fields, 0))
+            counts["application_count"] += n
+            if status in Jobs.STATUS_COUNTERS:
+                counts[Jobs.STATUS_COUNTERS[status]] += n
+        drift = {}
+        for job_id, *stored in self.values_list("id", *fields).iterator(chunk_size=2000):
+            counts = actual.get(job_id) or dict.fromkeys(fields, 0)
+            wrong = {
+                field: (value, counts[field])
+                for field, value in zip(fields, stored) if value != counts[field]
+            }
+            if wrong:
+                drift[job_id] = wrong
+        if fix and drift:
+            def count(**filters):
+                apps = Application.objects.filter(job=OuterRef("pk"), **filters).order_by().values("job")
+                return Coalesce(Subquery(apps.annotate(n=Count("pk")).values("n")), 0)
+
+            recount = {"application_count": count()}
+            recount.update({field: count(status=status) for status, field in Jobs.STATUS_COUNTERS.items()})
+            job_ids = list(drift)
+            for start in range(0, len(job_ids), 500):
+                self.filter(pk__in=job_ids[start:start + 500]).update(**recount)
+        return drift
 
 
 
@@ -76,9 +192,18 @@ class Jobs(models.Model):
         ('GW', 'GWA'),
         ('PT', 'PAUKTAW'),
         ('BTD', 'BUTHIDAUNG'),
-        ('MB', 'MYEBON'),
+        ('MBN', 'MYEBON'),
     ]
 
+    # Application.status -> counter column
+    STATUS_COUNTERS = {
+        "P": "pending_count",
+        "R": "review_count",
+        "SL": "shortlist_count",
+        "RJ": "rejected_count",
+        "H": "hired_count",
+    }
+
     id = models.UUIDField(
         primary_key=True,      # ဒီ field ကို primary key လုပ်မယ်
         default=uuid.uuid4,    # Auto-generate UUID v4
@@ -88,12 +213,28 @@ class Jobs(models.Model):
     employer=models.ForeignKey(EmployerProfile, on_delete=models.CASCADE,blank=True,null=True,related_name="jobs")
     title = models.CharField(max_length=150)
     description = models.TextField()
-    location = models.CharField(choices=LOCATION_CHOICES,default='MO',null=True)
-    job_type = models.CharField(choices=JOB_TYPE_CHOICES,default='FULL',null=True)
-    salary = models.DecimalField(max_digits=12,decimal_places=2, null=True, blank=True)
+    # Unicode-normalized copies (Zawgyi converted) used by search, filled on save
+    title_normalized = models.CharField(max_length=150, blank=True, default="", editable=False)
+    description_normalized = models.TextField(blank=True, default="", editable=False)
+    # lower-cased, whitespace-stripped forms for space-insensitive matching, filled on save
+    title_nospace = models.CharField(max_length=150, blank=True, default="", editable=False)
+    location_nospace = models.CharField(max_length=20, blank=True, default="", editable=False)
+    category_name_nospace = models.CharField(max_length=100, blank=True, default="", editable=False)
+    description_nospace = models.TextField(blank=True, default="", editable=False)
+    location = models.CharField(choices=LOCATION_CHOICES,default='MO',null=True,db_index=True)
+    job_type = models.CharField(choices=JOB_TYPE_CHOICES,default='FULL',null=True,db_index=True)
+    salary = models.DecimalField(max_digits=12,decimal_places=2, null=True, blank=True, db_index=True)
     category = models.ForeignKey(JobCategory, on_delete=models.SET_NULL, null=True)
     is_active = models.BooleanField(default=True)
     max_applicants = models.PositiveIntegerField(default=0, help_text="Maximum number of allowed applicants")
+    # application counters, kept by Jobs/signals.py with F() updates;
+    # `manage.py reconcile_application_counts` rebuilds them from the Application table
+    application_count = models.PositiveIntegerField(default=0, editable=False)
+    pending_count = models.PositiveIntegerField(default=0, editable=False)
+    review_count = models.PositiveIntegerField(default=0, editable=False)
+    shortlist_count = models.PositiveIntegerField(default=0, editable=False)
+    rejected_count = models.PositiveIntegerField(default=0, editable=False)
+    hired_count = models.PositiveIntegerField(default=0, editable=False)
     deadline = models.DateField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True,null=True, blank=True)
     updated_at = models.DateTimeField(auto_now=True,null=True, blank=True)
@@ -108,5 +249,51 @@ class Jobs(models.Model):
 
     objects = JobsManager()
 
+    class Meta:
+        # LIKE '%...%' on the *_nospace columns cannot use a B-tree index; on Postgres the
+        # pg_trgm GIN indexes of migration 0015 serve it, SQLite scans the table
+        indexes = [
+            # lifecycle sweeps (Jobs/lifecycle.py): active jobs past their deadline
+            models.Index(fields=["is_active", "deadline"], name="jobs_active_deadline_idx"),
+        ]
+
+    def __str__(self):
+        return self.title
+
+
+# one row per first-page search request (sampled by settings.JOB_SEARCH_LOG_RATE),
+# replayed by `manage.py bench_search --from-log`
+class SearchLog(models.Model):
+    q = models.CharField(max_length=200, blank=True, default="")   # normalized (search.tokenizer.normalize)
+    loc = models.CharField(max_length=100, blank=True, default="")
+    params = models.JSONField(default=dict, blank=True)   # the other request parameters (near, limit, total, ...)
+    backend = models.CharField(max_length=20)
+    result_ids = models.JSONField(default=list, blank=True)
+    latency_ms = models.FloatField()
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return self.q
+
+
+class JobChangeManager(models.Manager):
+    def record(self, job_ids):
+        """Log a write to these jobs, in the writing transaction (Jobs/search/changes.py)."""
+        self.bulk_create([JobChange(job_id=job_id) for job_id in dict.fromkeys(job_ids)])
+
+    def purge(self, before):
+        """Drop the rows logged before `before`; returns how many."""
+        return self.filter(changed_at__lt=before).delete()[0]
+
+
+# one row per write to a job (save, delete, QuerySet.update() through
+# signals.reindex_after_update), polled by every process that holds in-memory
+# search structures so they see the writes of the others (Jobs/search/changes.py)
+class JobChange(models.Model):
+    job_id = models.UUIDField()      # no foreign key: deleted jobs are logged too
+    changed_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    objects = JobChangeManager()
+
     def __str__(self):
-        return self.title
\ No newline at end of file
+        return f"{self.job_id} @ {self.changed_at}"
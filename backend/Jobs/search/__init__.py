@@ -0,0 +1,5 @@
+from .backends import fulltext_backend, get_backend, synced_fulltext_backend
+from .columns import JobColumns
+from .index import InvertedIndex, get_index, index_is_loaded, reset_index
+from .suggest import get_suggester, reset_suggester, suggester_is_loaded
+from .vocabulary import get_vocabulary, reset_vocabulary, vocabulary_is_loaded
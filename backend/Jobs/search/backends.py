@@ -0,0 +1,479 @@
+# Jobs/search/backends.py
+"""
+Pluggable search backends. Every backend answers with a SearchPage of ranked
+primary keys; the views hydrate them with a single in_bulk() query.
+Pages are keyset ("search after") pages, see pagination.py.
+
+    JOB_SEARCH_BACKEND = "memory"    in-process inverted index (Jobs/search/index.py)
+                         "database"  LIKE over the stored *_nospace columns
+                         "fulltext"  SQLite FTS5 or Postgres tsvector + GIN,
+                                     picked from the database vendor
+"""
+import uuid
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Case, DateTimeField, IntegerField, Q, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .facets import rows_facet_response
+from .fuzzy import correct_query
+from .index import PRIORITY_RANK, get_index, job_fields
+from .pagination import (
+    ESTIMATE_CAP, InvalidCursor, SearchPage, check_key, is_integer, is_number, is_timestamp_text, is_uuid_text,
+)
+from .proximity import location_ranks
+from .ranking import PRIORITY_BOOST
+from .tokenizer import runs, syllables, words
+from .vocabulary import get_vocabulary
+from .zawgyi import to_unicode
+
+JOB_COLUMNS = ("title", "category", "employer", "location", "description")
+# sort position of a job without created_at: older than any other
+NO_CREATED = datetime(1, 1, 1, tzinfo=dt_timezone.utc)
+# Postgres tsvector weights per column, title > category/employer > location > description
+JOB_WEIGHTS = ("A", "B", "B", "C", "D")
+
+FTS_TOKENIZE = "unicode61 categories 'L* N* Co M*'"   # keep Myanmar combining marks inside tokens
+
+
+def fts_rowid(pk):
+    # FTS5 needs integer rowids; the top 63 bits of the UUID are unique in practice
+    return pk.int >> 65
+
+
+def query_parts(q):
+    """
+    Split q into ("prefix", word) for Latin words and ("phrase", [syllables])
+    for each run of Myanmar script, which has to match as adjacent syllables.
+    """
+    return [("phrase", syllables(run)) if is_myanmar else ("prefix", run) for is_myanmar, run in runs(q)]
+
+
+def keyset_q(columns, values):
+    """Rows strictly after values in the ordering given by columns ("-name" = descending)."""
+    condition = Q()
+    equal = {}
+    for column, value in zip(columns, values):
+        name = column.lstrip("-")
+        lookup = "lt" if column.startswith("-") else "gt"
+        condition |= Q(**equal, **{f"{name}__{lookup}": value})
+        equal[name] = value
+    return condition
+
+
+def capped_total(count, total):
+    """(total, total_exact) for a count that was taken with at most ESTIMATE_CAP + 1 rows when estimating."""
+    if total == "estimate" and count > ESTIMATE_CAP:
+        return ESTIMATE_CAP, False
+    return count, True
+
+
+class SearchBackend:
+    name = None
+    # predicates (pagination.py) of the sort key values in a cursor, after the
+    # distance rank that leads the key when loc lists several townships
+    KEY_KINDS = ()
+
+    def check_cursor(self, after, loc=None):
+        """
+        Raise InvalidCursor unless after, a decoded cursor, has the shape of
+        the keys this backend hands out for loc.
+        """
+        fix = after.get("fix", {})
+        if not (
+            isinstance(fix, dict) and set(fix) <= {"q", "loc", "category"}
+            and all(isinstance(v, str) for v in fix.values())
+        ):
+            raise InvalidCursor("Malformed cursor.")
+        _, by_distance = location_ranks(loc)
+        check_key(after["k"], ((is_integer,) if by_distance else ()) + self.KEY_KINDS)
+
+    def search_jobs(self, q, loc=None, limit=30, after=None, total=None, facets=False, filters=None):
+        """
+        One SearchPage of jobs matching q in township loc (a code resolved
+        through the gazetteer, or None). after is a decoded cursor key
+        from a previous page; total is None, "exact" or "estimate"; facets asks
+        for facet counts over the whole match set; filters come from
+        query_parser.parse_query().
+        """
+        raise NotImplementedError
+
+    def correct_query(self, q):
+        """
+        q with misspelled words corrected (fuzzy.correct_query), or None: against
+        the term vocabulary alone, so no index is built for it.
+        """
+        return correct_query(get_vocabulary(), q)
+
+    def search_companies(self, q, limit=50):
+        from EmployerProfile.models import EmployerProfile
+
+        qs = EmployerProfile.objects.all()
+        if q:
+            qs = qs.filter(business_name_normalized__icontains=to_unicode(q))
+        return list(qs.order_by("business_name").values_list("id", flat=True)[:limit])
+
+    # kept in sync from Jobs/signals.py
+    def index_jobs(self, jobs):
+        pass
+
+    def remove_jobs(self, job_ids):
+        pass
+
+    def index_companies(self, companies):
+        pass
+
+    def remove_companies(self, company_ids):
+        pass
+
+    def clear(self):
+        pass
+
+
+class DatabaseBackend(SearchBackend):
+    name = "database"
+    KEY_KINDS = (is_integer, is_timestamp_text, is_uuid_text)   # priority rank, created_at, id
+
+    def search_jobs(self, q, loc=None, limit=30, after=None, total=None, facets=False, filters=None):
+        from Jobs.models import Jobs
+
+        ranks, by_distance = location_ranks(loc)
+        qs = Jobs.objects.search(q, list(ranks) if ranks else None, filters)
+        # a NULL created_at sorts (and pages) as the oldest possible value
+        qs = qs.annotate(created=Coalesce("created_at", Value(NO_CREATED), output_field=DateTimeField()))
+        columns = ["-priority_rank", "-created", "-id"]
+        if by_distance:
+            # nearest township first; ranks come precomputed from proximity.py
+            qs = qs.annotate(distance_rank=Case(
+                *[When(location=code, then=Value(rank)) for code, rank in ranks.items()],
+                output_field=IntegerField(),
+            ))
+            columns.insert(0, "distance_rank")
+        qs = qs.order_by(*columns)
+        count = exact = counts = None
+        if total == "exact":
+            count, exact = qs.count(), True
+        elif total == "estimate":
+            count, exact = capped_total(qs[:ESTIMATE_CAP + 1].count(), total)
+        if facets:
+            counts = rows_facet_response(qs.order_by().values_list("location", "job_type", "category_id", "salary"))
+        names = [column.lstrip("-") for column in columns]
+        if after:
+            # keyset on the ordering of Jobs.objects.search (created travels as ISO text)
+            values = list(after["k"])
+            values[-2] = parse_datetime(values[-2])
+            qs = qs.filter(keyset_q(columns, values))
+        rows = list(qs.values_list(*names)[:limit + 1])
+        next_key = None
+        if len(rows) > limit:
+            values = list(rows[limit - 1])
+            values[-2], values[-1] = values[-2].isoformat(), str(values[-1])
+            next_key = {"k": values}
+        return SearchPage([row[-1] for row in rows[:limit]], next_key, count, exact, counts)
+
+
+class MemoryBackend(SearchBackend):
+    name = "memory"
+    KEY_KINDS = (is_number, is_integer, is_number, is_uuid_text)   # score, priority rank, created_at, id
+
+    def check_cursor(self, after, loc=None):
+        super().check_cursor(after, loc)
+        # the scoring clock of the first page
+        if not is_number(after.get("t")):
+            raise InvalidCursor("Malformed cursor.")
+
+    def search_jobs(self, q, loc=None, limit=30, after=None, total=None, facets=False, filters=None):
+        # the in-process index always counts every match; "estimate" is free to be exact
+        return get_index().search(
+            q=q, loc=loc, limit=limit, after=after, facets=facets, filters=filters, today=timezone.localdate(),
+        )
+
+    def correct_query(self, q):
+        # the index has its own vocabulary
+        return correct_query(get_index(), q)
+
+
+class FullTextBackend(DatabaseBackend):
+    """
+    Shared filtering, ordering and keyset SQL; subclasses supply the match
+    (_hits) and the placeholders for a sort key (KEY).
+    """
+    KEY = ("%s", "%s", "%s")   # placeholders for (score, created, job_id)
+    # j.created_at of the hits, NULL sorting as the oldest possible value
+    CREATED = "COALESCE(j.created_at, '0001-01-01 00:00:00')"
+    KEY_KINDS = (is_number, is_timestamp_text, is_uuid_text)
+
+    def _job_filters(self, loc, filters):
+        from Jobs.models import Jobs
+
+        table = connection.ops.quote_name(Jobs._meta.db_table)
+        where = ["j.is_active", "(j.deadline IS NULL OR j.deadline >= %s)"]
+        params = [timezone.localdate()]
+        ranks, _ = location_ranks(loc)
+        if ranks:
+            where.append(f"j.location IN ({', '.join(['%s'] * len(ranks))})")
+            params.extend(ranks)
+        if filters.get("job_type"):
+            where.append("j.job_type = %s")
+            params.append(filters["job_type"])
+        if filters.get("category"):
+            where.append(f"j.category_id IN ({', '.join(['%s'] * len(filters['category']))})")
+            params.extend(_category_pk(pk) for pk in filters["category"])
+        if filters.get("salary_min") is not None:
+            where.append("j.salary >= %s")
+            params.append(filters["salary_min"])
+        if filters.get("salary_max") is not None:
+            where.append("j.salary <= %s")
+            params.append(filters["salary_max"])
+        # same priority blending as the in-process ranking: a multiplier on the text score
+        boosts = " ".join(f"WHEN '{p}' THEN {PRIORITY_BOOST[rank]}" for p, rank in PRIORITY_RANK.items())
+        boost = f"(CASE j.priority {boosts} ELSE 1.0 END)"
+        return table, where, params, boost
+
+    def search_jobs(self, q, loc=None, limit=30, after=None, total=None, facets=False, filters=None):
+        if not query_parts(q):
+            return super().search_jobs(q, loc, limit, after, total, facets, filters)
+        table, where, params, boost = self._job_filters(loc, filters or {})
+        ranks, by_distance = location_ranks(loc)
+        columns, key = ["score", "created", "job_id"], self.KEY
+        extra = ""
+        if by_distance:
+            # nearest township first, as a descending column like the others;
+            # codes come from LOCATION_CHOICES via proximity.py, never from the request
+            near = " ".join(f"WHEN '{code}' THEN {-rank}" for code, rank in ranks.items())
+            extra = f", (CASE j.location {near} END) AS near"
+            columns, key = ["near", *columns], ("%s", *key)
+        hits, hit_params = self._hits(q, table, boost, extra)
+        # hits yields (job_id, score, created[, near]), higher is better
+        hits = f"{hits} AND {' AND '.join(where)}"
+        hit_params = [*hit_params, *params]
+        count = exact = counts = None
+        with connection.cursor() as cursor:
+            if facets:
+                cursor.execute(
+                    f"SELECT j.location, j.job_type, j.category_id, j.salary "
+                    f"FROM ({hits}) h JOIN {table} j ON j.id = h.job_id",
+                    hit_params,
+                )
+                counts = rows_facet_response(cursor.fetchall())
+            if total:
+                cap = f" LIMIT {ESTIMATE_CAP + 1}" if total == "estimate" else ""
+                cursor.execute(f"SELECT COUNT(*) FROM ({hits}{cap}) counted", hit_params)
+                count, exact = capped_total(cursor.fetchone()[0], total)
+            sql = f"SELECT job_id, {', '.join(columns[:-1])} FROM ({hits}) hits"
+            if after:
+                sql += f" WHERE ({', '.join(columns)}) < ({', '.join(key)})"
+                hit_params += after["k"]
+            order = ", ".join(f"{column} DESC" for column in columns)
+            cursor.execute(f"{sql} ORDER BY {order} LIMIT %s", [*hit_params, limit + 1])
+            rows = cursor.fetchall()
+        next_key = {"k": list(rows[limit - 1][1:]) + [str(rows[limit - 1][0])]} if len(rows) > limit else None
+        return SearchPage([_uuid(row[0]) for row in rows[:limit]], next_key, count, exact, counts)
+
+
+# ---------- SQLite FTS5 ----------
+class SQLiteFTSBackend(FullTextBackend):
+    name = "sqlite-fts5"
+    # bm25() column weights, job_id first (unindexed)
+    BM25 = "bm25(jobs_fts, 0, 10.0, 5.0, 5.0, 2.0, 1.0)"
+
+    @staticmethod
+    def match_expression(q):
+        terms = []
+        for kind, value in query_parts(q):
+            if kind == "phrase":
+                terms.append('"%s"' % " ".join(value))
+            else:
+                terms.append('"%s"*' % value)
+        return " AND ".join(terms)
+
+    def _hits(self, q, table, boost, extra=""):
+        # bm25() is negative, lower is better, so negate it
+        sql = (
+            f"SELECT f.job_id AS job_id, -({self.BM25} * {boost}) AS score, {self.CREATED} AS created{extra} "
+            f"FROM jobs_fts f JOIN {table} j ON j.id = f.job_id WHERE jobs_fts MATCH %s"
+        )
+        return sql, [self.match_expression(q)]
+
+    def search_companies(self, q, limit=50):
+        if not query_parts(q):
+            return super().search_companies(q, limit)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT company_id FROM company_fts WHERE company_fts MATCH %s ORDER BY rank LIMIT %s",
+                [self.match_expression(q), limit],
+            )
+            return [_uuid(row[0]) for row in cursor.fetchall()]
+
+    def index_jobs(self, jobs):
+        rows = [(fts_rowid(job.id), job.id.hex, *(" ".join(words(t)) for t in job_fields(job))) for job in jobs]
+        with connection.cursor() as cursor:
+            cursor.executemany("DELETE FROM jobs_fts WHERE rowid = %s", [(row[0],) for row in rows])
+            cursor.executemany(
+                "INSERT INTO jobs_fts (rowid, job_id, title, category, employer, location, description) "
+                "VALUES (%s, %s, %s, %s, %s, %s, %s)",
+                rows,
+            )
+
+    def remove_jobs(self, job_ids):
+        with connection.cursor() as cursor:
+            cursor.executemany("DELETE FROM jobs_fts WHERE rowid = %s", [(fts_rowid(pk),) for pk in job_ids])
+
+    def index_companies(self, companies):
+        rows = [
+            (fts_rowid(c.id), c.id.hex, " ".join(words(c.business_name_normalized or c.business_name)))
+            for c in companies
+        ]
+        with connection.cursor() as cursor:
+            cursor.executemany("DELETE FROM company_fts WHERE rowid = %s", [(row[0],) for row in rows])
+            cursor.executemany(
+                "INSERT INTO company_fts (rowid, company_id, business_name) VALUES (%s, %s, %s)", rows
+            )
+
+    def remove_companies(self, company_ids):
+        with connection.cursor() as cursor:
+            cursor.executemany("DELETE FROM company_fts WHERE rowid = %s", [(fts_rowid(pk),) for pk in company_ids])
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM jobs_fts")
+            cursor.execute("DELETE FROM company_fts")
+
+
+# ---------- Postgres tsvector ----------
+def _lexeme(token):
+    return "'%s'" % token.replace("\\", "\\\\").replace("'", "''")
+
+
+def tsvector_literal(texts, weights):
+    """
+    Build the tsvector text form ourselves ('tok':1A ...) so Myanmar syllables
+    are not re-split by the Postgres parser. Columns are separated by a position
+    gap so phrases never match across two columns.
+    """
+    positions = {}
+    pos = 1
+    for text, weight in zip(texts, weights):
+        for token in words(text):
+            entry = positions.setdefault(token, [])
+            if len(entry) < 255:
+                entry.append(f"{min(pos, 16383)}{weight}")
+            pos += 1
+        pos += 10
+    return " ".join(f"{_lexeme(t)}:{','.join(p)}" for t, p in positions.items())
+
+
+def tsquery_literal(q):
+    terms = []
+    for kind, value in query_parts(q):
+        if kind == "phrase":
+            terms.append("(" + " <-> ".join(_lexeme(s) for s in value) + ")")
+        else:
+            terms.append(f"{_lexeme(value)}:*")
+    return " & ".join(terms)
+
+
+class PostgresFTSBackend(FullTextBackend):
+    name = "postgres-tsvector"
+    KEY = ("CAST(%s AS double precision)", "CAST(%s AS timestamptz)", "CAST(%s AS uuid)")
+    CREATED = "COALESCE(j.created_at, CAST('0001-01-01 00:00:00+00' AS timestamptz))"
+
+    def _hits(self, q, table, boost, extra=""):
+        sql = (
+            f"SELECT d.job_id AS job_id, CAST(ts_rank(d.document, query) * {boost} AS double precision) AS score, "
+            f"{self.CREATED} AS created{extra} "
+            f"FROM jobs_search_document d JOIN {table} j ON j.id = d.job_id, CAST(%s AS tsquery) query "
+            f"WHERE d.document @@ query"
+        )
+        return sql, [tsquery_literal(q)]
+
+    def search_companies(self, q, limit=50):
+        if not query_parts(q):
+            return super().search_companies(q, limit)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT company_id FROM company_search_document, CAST(%s AS tsquery) query "
+                "WHERE document @@ query ORDER BY ts_rank(document, query) DESC LIMIT %s",
+                [tsquery_literal(q), limit],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def index_jobs(self, jobs):
+        rows = [(job.id, tsvector_literal(job_fields(job), JOB_WEIGHTS)) for job in jobs]
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                "INSERT INTO jobs_search_document (job_id, document) VALUES (%s, CAST(%s AS tsvector)) "
+                "ON CONFLICT (job_id) DO UPDATE SET document = EXCLUDED.document",
+                rows,
+            )
+
+    def remove_jobs(self, job_ids):
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM jobs_search_document WHERE job_id = ANY(%s)", [list(job_ids)])
+
+    def index_companies(self, companies):
+        rows = [
+            (c.id, tsvector_literal([c.business_name_normalized or c.business_name], ["A"]))
+            for c in companies
+        ]
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                "INSERT INTO company_search_document (company_id, document) VALUES (%s, CAST(%s AS tsvector)) "
+                "ON CONFLICT (company_id) DO UPDATE SET document = EXCLUDED.document",
+                rows,
+            )
+
+    def remove_companies(self, company_ids):
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM company_search_document WHERE company_id = ANY(%s)", [list(company_ids)])
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM jobs_search_document")
+            cursor.execute("DELETE FROM company_search_document")
+
+
+def _uuid(value):
+    return value if isinstance(value, uuid.UUID) else uuid.UUID(value)
+
+
+def _category_pk(pk):
+    # raw SQL needs the column's stored form: hex text on SQLite, uuid on Postgres
+    from Jobs.models import JobCategory
+    return JobCategory._meta.pk.get_db_prep_value(_uuid(pk), connection)
+
+
+FULLTEXT_BACKENDS = {
+    "sqlite": SQLiteFTSBackend,
+    "postgresql": PostgresFTSBackend,
+}
+
+
+def fulltext_backend():
+    """Full-text backend for the current database vendor, or None if it has none."""
+    backend_class = FULLTEXT_BACKENDS.get(connection.vendor)
+    return backend_class() if backend_class else None
+
+
+def synced_fulltext_backend():
+    """
+    The full-text backend the Jobs signals keep in sync: only the configured
+    one (JOB_SEARCH_BACKEND = "fulltext"), so other backends pay nothing per
+    write. Switching to it later needs `manage.py rebuild_fulltext_index`.
+    """
+    if settings.JOB_SEARCH_BACKEND != "fulltext":
+        return None
+    return fulltext_backend()
+
+
+def get_backend():
+    name = settings.JOB_SEARCH_BACKEND
+    if name == "fulltext":
+        return fulltext_backend() or DatabaseBackend()
+    if name == "database":
+        return DatabaseBackend()
+    return MemoryBackend()
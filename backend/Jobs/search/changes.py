@@ -0,0 +1,111 @@
+# Jobs/search/changes.py
+"""
+Cross-process invalidation of the in-memory search structures (the index with
+its columns, the suggester and the vocabulary).
+
+Every write to a job records a Jobs.JobChange row in the writing transaction:
+saves and deletes through the Jobs signals, QuerySet.update() calls through
+signals.reindex_after_update(). Every process holding a loaded structure polls
+the log on access, at most every settings.JOB_SEARCH_SYNC_INTERVAL seconds,
+and re-reads the jobs changed since its last poll. So writes made by the other
+web workers, the job sweeper or the mail worker reach every worker. A
+worker's own writes are also applied as soon as they commit (Jobs/signals.py),
+so it reads them back without waiting for a poll.
+
+A change row is timestamped before its transaction commits, so each poll looks
+SLACK further back than the previous one and skips the rows it already
+applied. The log is purged after settings.JOB_CHANGE_RETENTION seconds (by the
+job sweeper); a process that has not polled for that long drops its
+structures, and they are rebuilt from the tables on next use.
+"""
+import threading
+import time
+from datetime import timedelta
+
+# longest a writing transaction may stay open between logging a change and committing it
+SLACK = timedelta(seconds=30)
+
+_lock = threading.Lock()
+_synced_at = None      # changes logged before this (minus SLACK) are applied
+_seen = set()          # ids of the applied change rows within SLACK of _synced_at
+_checked = 0.0         # time.monotonic() of the last poll
+
+
+def mark_synced(at):
+    """A structure was just built from the tables as they were at `at`."""
+    global _synced_at
+    with _lock:
+        # the earliest build wins: replaying a change a structure already has is harmless
+        if _synced_at is None or at < _synced_at:
+            _synced_at = at
+
+
+def reset_changes():
+    global _synced_at, _seen, _checked
+    with _lock:
+        _synced_at, _seen, _checked = None, set(), 0.0
+
+
+def refresh_jobs(job_ids):
+    """Re-read these jobs into the loaded structures; jobs no longer in the table are dropped."""
+    from Jobs.models import Jobs
+    from . import index, suggest, vocabulary
+
+    targets = []      # (add, remove) of each loaded structure
+    if index._index is not None:
+        targets.append((index._index.add, index._index.remove))
+    if suggest._suggester is not None:
+        targets.append((suggest._suggester.add_job, suggest._suggester.remove_job))
+    if vocabulary._vocabulary is not None:
+        targets.append((vocabulary._vocabulary.add, vocabulary._vocabulary.remove))
+    if not targets or not job_ids:
+        return
+    found = set()
+    for job in Jobs.objects.filter(id__in=job_ids).select_related("employer", "category"):
+        found.add(job.id)
+        for add, _ in targets:
+            add(job)
+    for job_id in set(job_ids) - found:
+        for _, remove in targets:
+            remove(job_id)
+
+
+def poll_changes(force=False):
+    """
+    Apply the changes every process logged since the last poll, at most once
+    per JOB_SEARCH_SYNC_INTERVAL unless forced. Returns the job ids re-read.
+    """
+    global _synced_at, _seen, _checked
+    from django.conf import settings
+
+    if _synced_at is None or (not force and time.monotonic() - _checked < settings.JOB_SEARCH_SYNC_INTERVAL):
+        return set()
+    # one poller at a time; the others (and re-entrant calls through get_index) serve as they are
+    if not _lock.acquire(blocking=False):
+        return set()
+    try:
+        from django.utils import timezone
+        from Jobs.models import JobChange
+        from .index import reset_index
+        from .suggest import reset_suggester
+        from .vocabulary import reset_vocabulary
+
+        _checked = time.monotonic()
+        now = timezone.now()
+        if now - _synced_at > timedelta(seconds=settings.JOB_CHANGE_RETENTION):
+            # the log no longer reaches back far enough: rebuild from the tables
+            reset_index()
+            reset_suggester()
+            reset_vocabulary()
+            _synced_at, _seen = None, set()
+            return set()
+        rows = list(
+            JobChange.objects.filter(changed_at__gte=_synced_at - SLACK).values_list("id", "job_id", "changed_at")
+        )
+        job_ids = {job_id for pk, job_id, _ in rows if pk not in _seen}
+        refresh_jobs(job_ids)
+        _synced_at = now
+        _seen = {pk for pk, _, changed_at in rows if changed_at >= now - SLACK}
+        return job_ids
+    finally:
+        _lock.release()
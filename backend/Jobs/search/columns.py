@@ -0,0 +1,308 @@
+# Jobs/search/columns.py
+"""
+Columnar in-memory snapshot of the structured Jobs columns, one NumPy array
+per column, one row per job.
+
+Filtering ("active, not expired, in these townships, this job type, salary
+at least n") is a handful of vectorized comparisons over whole arrays instead
+of a row-by-row loop or a SQL round trip, and yields row numbers that map
+back to job ids. Codes (location, job type, category, employer) are stored as
+small integers through per-column dictionaries; a missing salary is NaN so
+range comparisons reject it for free.
+
+Rows of deleted jobs are reused, so the arrays only grow with the number of
+live jobs. The in-process search index keeps one of these as its doc table
+(row number = doc number), which also serves jobs_list and the quick
+searches (InvertedIndex.browse()).
+"""
+import threading
+from datetime import date
+
+import numpy as np
+
+PRIORITY_RANK = {"FEATURED": 3, "URGENT": 2}
+
+NO_DEADLINE = np.iinfo(np.int32).max
+MISSING = -1
+
+# Jobs fields read by JobColumns.load(), in row tuple order
+VALUES_FIELDS = (
+    "id", "is_active", "deadline", "location", "job_type", "category_id", "employer_id",
+    "priority", "salary", "created_at",
+)
+
+
+class Codes:
+    """Value <-> small integer, for one coded column. Codes are never reused."""
+
+    def __init__(self, values=()):
+        self._codes = {}
+        self.values = []
+        for value in values:
+            self.code(value)
+
+    def code(self, value):
+        if value is None:
+            return MISSING
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def lookup(self, values):
+        """Codes of the known values among values (unknown ones cannot match anything)."""
+        return [self._codes[v] for v in values if v in self._codes]
+
+
+def _as_list(values):
+    return [values] if isinstance(values, str) or not hasattr(values, "__iter__") else list(values)
+
+
+class JobColumns:
+    COLUMNS = (
+        ("alive", np.bool_),
+        ("is_active", np.bool_),
+        ("deadline", np.int32),      # date ordinal, NO_DEADLINE when open-ended
+        ("location", np.int16),
+        ("job_type", np.int8),
+        ("category", np.int32),
+        ("employer", np.int32),
+        ("priority_rank", np.int8),
+        ("salary", np.float64),      # NaN when not given
+        ("created_at", np.float64),  # POSIX timestamp
+        ("id_key", np.uint64),       # first 8 bytes of the UUID: tie-break of page()
+    )
+
+    def __init__(self, capacity=1024):
+        from Jobs.models import Jobs
+
+        self._lock = threading.RLock()
+        self._location = Codes(code for code, _ in Jobs.LOCATION_CHOICES)
+        self._job_type = Codes(value for value, _ in Jobs.JOB_TYPE_CHOICES)
+        self._category = Codes()
+        self._employer = Codes()
+        self._ids = []             # row -> job id (None for a free row)
+        self._rows = {}            # job id -> row
+        self._free = []            # rows of removed jobs, reused first
+        self._arrays = {name: np.zeros(capacity, dtype=dtype) for name, dtype in self.COLUMNS}
+
+    @classmethod
+    def from_arrays(cls, arrays, codes, ids):
+        """
+        Read-only columns over existing arrays, e.g. of a memory-mapped snapshot
+        (snapshot.py). codes are the value lists of export(); ids gives
+        ids[row] -> job id, ids.get(job_id) -> row and len(ids).
+        """
+        columns = cls.__new__(cls)
+        columns._lock = threading.RLock()
+        columns._location = Codes(codes["location"])
+        columns._job_type = Codes(codes["job_type"])
+        columns._category = Codes(codes["category"])
+        columns._employer = Codes(codes["employer"])
+        columns._ids = columns._rows = ids
+        columns._free = []
+        columns._arrays = dict(arrays)
+        return columns
+
+    def export(self):
+        """(arrays trimmed to size, value lists of the coded columns, row -> job id list)."""
+        with self._lock:
+            n = self.size
+            codes = {
+                "location": list(self._location.values),
+                "job_type": list(self._job_type.values),
+                "category": list(self._category.values),
+                "employer": list(self._employer.values),
+            }
+            return {name: values[:n].copy() for name, values in self._arrays.items()}, codes, list(self._ids)
+
+    def __len__(self):
+        return len(self._rows)
+
+    @property
+    def size(self):
+        """High-water row count: every mask has this length."""
+        return len(self._ids)
+
+    # ---------- writes ----------
+    def _grow(self, needed):
+        capacity = len(self._arrays["alive"])
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name, values in self._arrays.items():
+            grown = np.zeros(capacity, dtype=values.dtype)
+            grown[:len(values)] = values
+            self._arrays[name] = grown
+
+    def _allocate(self, job_id):
+        row = self._rows.get(job_id)
+        if row is not None:
+            return row
+        if self._free:
+            row = self._free.pop()
+            self._ids[row] = job_id
+        else:
+            row = len(self._ids)
+            self._grow(row + 1)
+            self._ids.append(job_id)
+        self._rows[job_id] = row
+        return row
+
+    def _write(self, row, values):
+        job_id, is_active, deadline, location, job_type, category_id, employer_id, priority, salary, created_at = values
+        a = self._arrays
+        a["alive"][row] = True
+        a["is_active"][row] = bool(is_active)
+        a["deadline"][row] = deadline.toordinal() if deadline else NO_DEADLINE
+        a["location"][row] = self._location.code(location)
+        a["job_type"][row] = self._job_type.code(job_type)
+        a["category"][row] = self._category.code(str(category_id) if category_id else None)
+        a["employer"][row] = self._employer.code(str(employer_id) if employer_id else None)
+        a["priority_rank"][row] = PRIORITY_RANK.get(priority, 1)
+        a["salary"][row] = float(salary) if salary is not None else np.nan
+        a["created_at"][row] = created_at.timestamp() if created_at else 0.0
+        a["id_key"][row] = int.from_bytes(job_id.bytes[:8], "big")
+
+    def upsert(self, job):
+        """Write (or overwrite) the row of one Jobs instance; returns its row number."""
+        values = tuple(getattr(job, field) for field in VALUES_FIELDS)
+        with self._lock:
+            row = self._allocate(job.id)
+            self._write(row, values)
+            return row
+
+    def load(self, rows):
+        """Bulk upsert of VALUES_FIELDS tuples, e.g. from Jobs.objects.values_list(*VALUES_FIELDS)."""
+        with self._lock:
+            for values in rows:
+                self._write(self._allocate(values[0]), values)
+
+    def remove(self, job_id):
+        """Free the row of a job; returns the row number, or None if it was not loaded."""
+        with self._lock:
+            row = self._rows.pop(job_id, None)
+            if row is None:
+                return None
+            self._ids[row] = None
+            self._arrays["alive"][row] = False
+            self._free.append(row)
+            return row
+
+    # ---------- reads ----------
+    def row(self, job_id):
+        return self._rows.get(job_id)
+
+    def mask(
+        self, live=True, today=None, locations=None, job_types=None, categories=None,
+        employers=None, salary_min=None, salary_max=None,
+    ):
+        """
+        Boolean array over rows. live keeps active, non-expired jobs only; the
+        other arguments are values (or lists of values) a row must be one of,
+        or salary bounds. None means "no filter".
+        """
+        with self._lock:
+            n = self.size
+            a = {name: values[:n] for name, values in self._arrays.items()}
+            m = a["alive"].copy()
+            if live:
+                m &= a["is_active"]
+                m &= a["deadline"] >= (today or date.today()).toordinal()
+            for name, codes, values in (
+                ("location", self._location, locations),
+                ("job_type", self._job_type, job_types),
+                ("category", self._category, categories),
+                ("employer", self._employer, employers),
+            ):
+                if values is None:
+                    continue
+                if name in ("category", "employer"):
+                    values = [str(v) for v in _as_list(values)]
+                wanted = codes.lookup(_as_list(values))
+                if len(wanted) == 1:
+                    m &= a[name] == wanted[0]
+                else:
+                    # code -> wanted lookup table; the extra last slot is MISSING (-1)
+                    table = np.zeros(len(codes.values) + 1, dtype=bool)
+                    table[wanted] = True
+                    m &= table[a[name]]
+            # NaN compares False, so jobs without a salary drop out of any salary range
+            if salary_min is not None:
+                m &= a["salary"] >= salary_min
+            if salary_max is not None:
+                m &= a["salary"] <= salary_max
+            return m
+
+    def _location_ranks(self, rows, ranks):
+        # location code -> rank lookup table, unranked townships last
+        table = np.full(len(self._location.values) + 1, len(ranks), dtype=np.int32)
+        for code, rank in ranks.items():
+            for c in self._location.lookup([code]):
+                table[c] = rank
+        return table[self._arrays["location"][rows]]
+
+    def rows(self, mask, ranks=None):
+        """
+        Row numbers selected by mask, newest first. ranks ({location code: rank})
+        orders by that rank before recency (nearest township first).
+        """
+        with self._lock:
+            rows = np.flatnonzero(mask)
+            created = self._arrays["created_at"][rows]
+            if not ranks:
+                return rows[np.argsort(-created, kind="stable")]
+            return rows[np.lexsort((-created, self._location_ranks(rows, ranks)))]
+
+    def page(self, mask, limit, ranks=None, after=None):
+        """
+        One keyset page of rows(mask, ranks), ties broken by id: (job ids, next
+        key or None). A key is [location rank, created_at, id_key] of the last
+        row; pass it back as after for the next page. limit None returns every row.
+        """
+        return keyed_page(self.page_keys(mask, None if limit is None else limit + 1, ranks, after), limit)
+
+    def page_keys(self, mask, k=None, ranks=None, after=None):
+        """The first k (None = all) rows of page() as (key, job id) pairs, for merging pages of several columns."""
+        with self._lock:
+            rows = np.flatnonzero(mask)
+            created = self._arrays["created_at"][rows]
+            id_key = self._arrays["id_key"][rows]
+            rank = self._location_ranks(rows, ranks) if ranks else np.zeros(len(rows), dtype=np.int32)
+            if after is not None:
+                after_rank, after_created, after_id = after
+                after_id = np.uint64(after_id)
+                keep = (rank > after_rank) | (rank == after_rank) & (
+                    (created < after_created) | (created == after_created) & (id_key < after_id)
+                )
+                rows, created, id_key, rank = rows[keep], created[keep], id_key[keep], rank[keep]
+            # ~id_key sorts the unsigned keys descending
+            order = np.lexsort((~id_key, -created, rank))[:k]
+            keys = zip(rank[order].tolist(), created[order].tolist(), id_key[order].tolist())
+            return [([r, c, i], job_id) for (r, c, i), job_id in zip(keys, self.ids(rows[order]))]
+
+    def ids(self, rows):
+        """Job ids of row numbers, in order."""
+        with self._lock:
+            return [self._ids[row] for row in rows.tolist()]
+
+    def select(self, ranks=None, **filters):
+        """Ids of the jobs matching mask(**filters), newest (or nearest, then newest) first."""
+        with self._lock:
+            return self.ids(self.rows(self.mask(**filters), ranks))
+
+
+# ---------- pages ----------
+def key_order(entry):
+    """Sort key of a page_keys() entry: nearest, then newest, then highest id_key first."""
+    (rank, created, id_key), _ = entry
+    return rank, -created, -id_key
+
+
+def keyed_page(entries, limit):
+    """(job ids, next key or None) from page_keys() entries, limit + 1 of them when there is a next page."""
+    if limit is None or len(entries) <= limit:
+        return [job_id for _, job_id in entries], None
+    return [job_id for _, job_id in entries[:limit]], entries[limit - 1][0]
@@ -0,0 +1,86 @@
+# Jobs/search/facets.py
+"""
+Facet counts for the search sidebar: location, job type, category and salary band.
+
+The in-process index keeps one posting set per facet value and intersects it
+with the match set; the SQL backends count the same values from one narrow
+query over the matches. Both produce {facet: {value: count}} and go through
+facet_response() for labels.
+"""
+import uuid
+from collections import Counter
+
+FACETS = ("location", "job_type", "category", "salary")
+
+# (value, label, lower bound inclusive, upper bound exclusive), in MMK
+SALARY_BANDS = [
+    ("lt300k", "Under 300,000", None, 300000),
+    ("300k-500k", "300,000 - 500,000", 300000, 500000),
+    ("500k-1m", "500,000 - 1,000,000", 500000, 1000000),
+    ("1m+", "1,000,000 and above", 1000000, None),
+]
+
+
+def salary_band(salary):
+    if salary is None or salary == "":
+        return None
+    salary = float(salary)
+    for value, _, low, high in SALARY_BANDS:
+        if (low is None or salary >= low) and (high is None or salary < high):
+            return value
+    return None
+
+
+def facet_values(location, job_type, category_id, salary):
+    """Facet values of one job, in FACETS order; None means "not counted"."""
+    return (
+        location or None,
+        job_type or None,
+        str(uuid.UUID(str(category_id))) if category_id else None,   # raw SQLite rows carry hex ids
+        salary_band(salary),
+    )
+
+
+def count_rows(rows):
+    """{facet: {value: count}} from (location, job_type, category_id, salary) rows."""
+    counters = [Counter() for _ in FACETS]
+    for row in rows:
+        for counter, value in zip(counters, facet_values(*row)):
+            if value is not None:
+                counter[value] += 1
+    return {facet: dict(counter) for facet, counter in zip(FACETS, counters)}
+
+
+def _choices(choices):
+    labels = {}
+    for value, label in choices:
+        labels.setdefault(value, label)
+    return labels
+
+
+def facet_response(counts, category_names):
+    """
+    Sidebar shape: every location / job type / salary band with its count (0
+    included), and the categories that have matches, most jobs first.
+    """
+    from Jobs.models import Jobs
+
+    def bucket(facet, value, label):
+        return {"value": value, "label": label, "count": counts[facet].get(value, 0)}
+
+    categories = sorted(counts["category"].items(), key=lambda item: (-item[1], item[0]))
+    return {
+        "location": [bucket("location", v, l) for v, l in _choices(Jobs.LOCATION_CHOICES).items()],
+        "job_type": [bucket("job_type", v, l) for v, l in _choices(Jobs.JOB_TYPE_CHOICES).items()],
+        "category": [{"value": v, "label": category_names.get(v, ""), "count": n} for v, n in categories],
+        "salary": [bucket("salary", v, l) for v, l, _, _ in SALARY_BANDS],
+    }
+
+
+def rows_facet_response(rows):
+    """facet_response() for (location, job_type, category_id, salary) rows of the SQL backends."""
+    from Jobs.models import JobCategory
+
+    counts = count_rows(rows)
+    names = JobCategory.objects.filter(pk__in=list(counts["category"])).values_list("pk", "name")
+    return facet_response(counts, {str(pk): name for pk, name in names})
@@ -0,0 +1,101 @@
+# Jobs/search/fuzzy.py
+"""
+Typo tolerance: a trigram index over a vocabulary narrows the candidates for a
+misspelled word, then a bounded Levenshtein check picks the closest one.
+
+Lookups only touch the postings of the query's own trigrams, so the cost
+grows with how common those trigrams are, not with the vocabulary size.
+Used for "did you mean" on search (index terms, see InvertedIndex.correct)
+and for misspelled town names (gazetteer.py).
+"""
+from collections import Counter
+
+from .tokenizer import runs
+
+
+def max_distance(word):
+    """Edits allowed for a word of this length; short words must match exactly."""
+    if len(word) < 3:
+        return 0
+    return 1 if len(word) < 6 else 2
+
+
+def trigrams(word):
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def bounded_levenshtein(a, b, k):
+    """Edit distance between a and b, or None as soon as it must exceed k."""
+    if abs(len(a) - len(b)) > k:
+        return None
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > k:
+            return None
+        previous = current
+    return previous[-1] if previous[-1] <= k else None
+
+
+class FuzzyMatcher:
+    """Trigram postings over a vocabulary of words."""
+
+    def __init__(self, words=()):
+        self._trigrams = {}
+        for word in words:
+            self.add(word)
+
+    def add(self, word):
+        for gram in trigrams(word):
+            self._trigrams.setdefault(gram, set()).add(word)
+
+    def remove(self, word):
+        for gram in trigrams(word):
+            words = self._trigrams.get(gram)
+            if words is not None:
+                words.discard(word)
+                if not words:
+                    del self._trigrams[gram]
+
+    def closest(self, word, weight=None):
+        """
+        Closest vocabulary word within max_distance(word), ties broken by
+        weight(word) (e.g. document frequency), or None.
+        """
+        k = max_distance(word)
+        if not k:
+            return None
+        grams = trigrams(word)
+        # each edit breaks at most 3 trigrams of the padded word
+        needed = max(len(grams) - 3 * k, 1)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self._trigrams.get(gram, ()))
+        best = None
+        for candidate, count in shared.items():
+            if count < needed or candidate == word:
+                continue
+            distance = bounded_levenshtein(word, candidate, k)
+            if distance is None:
+                continue
+            rank = (distance, -(weight(candidate) if weight else 0), candidate)
+            if best is None or rank < best:
+                best = rank
+        return best[2] if best else None
+
+
+def correct_query(index, q):
+    """
+    q with every unknown Latin word replaced by its closest index term, or None
+    if nothing changed. Myanmar syllables are not spell-corrected.
+    """
+    changed = False
+    tokens = []
+    for is_myanmar, run in runs(q):
+        fixed = None if is_myanmar else index.correct(run)
+        tokens.append(fixed or run)
+        changed = changed or bool(fixed)
+    return " ".join(tokens) if changed else None
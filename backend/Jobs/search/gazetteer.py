@@ -0,0 +1,101 @@
+# Jobs/search/gazetteer.py
+"""
+Township gazetteer: resolves what people type for a town (English label,
+Burmese name, older / alternative romanizations, typos) to the unique code
+stored in Jobs.location, so location filters are exact equality lookups.
+
+Names are reduced to a key (no case, spaces or punctuation, Zawgyi converted)
+and looked up in a precomputed dict; a sorted key array answers unambiguous
+prefixes ("mrau" -> MO) and the fuzzy matcher catches misspellings.
+"""
+import threading
+from bisect import bisect_left
+
+from .fuzzy import FuzzyMatcher
+from .tokenizer import units
+
+# code -> other names for the township, besides the code and its LOCATION_CHOICES label
+ALIASES = {
+    "MO": ["မြောက်ဦး", "Mrauk U", "Mrauk Oo", "Myauk U", "Myohaung"],
+    "MB": ["မင်းပြား", "Minbya", "Minbra", "Minpya"],
+    "SIT": ["စစ်တွေ", "Sittway", "Sitway", "Akyab"],
+    "RD": ["ရသေ့တောင်", "Rathedaung", "Rathetaung", "Rathaydaung"],
+    "MD": ["မောင်တော", "Maungtaw", "Maung Daw"],
+    "KP": ["ကျောက်ဖြူ", "Kyaukpyu", "Kyaukphyu", "Kyauk Phyu"],
+    "TD": ["သံတွဲ", "Sandoway", "Thantwe"],
+    "TG": ["တောင်ကုတ်", "Taungup", "Taunggup", "Taunggok"],
+    "AN": ["အမ်း", "An"],
+    "PNG": ["ပုဏ္ဏားကျွန်း", "Ponnagyun", "Ponnakyun", "Ponnagyunn"],
+    "KT": ["ကျောက်တော်", "Kyauk Taw"],
+    "RM": ["ရမ်းဗြဲ", "Rambree", "Yanbye", "Ramri"],
+    "MA": ["မာန်အောင်", "Man Aung", "Cheduba"],
+    "GW": ["ဂွ"],
+    "PT": ["ပေါက်တော", "Pauk Taw"],
+    "BTD": ["ဘူးသီးတောင်", "Buthedaung", "Buthi Taung"],
+    "MBN": ["မြေပုံ", "Myepon", "Myebone"],
+}
+
+
+def location_key(text):
+    """Town name without case, spaces or punctuation: "Mrauk-U" / "mrauk u" -> "mrauku"."""
+    return "".join(units(text or ""))
+
+
+class Gazetteer:
+    def __init__(self, choices, aliases):
+        self.labels = {}
+        self.names = {}            # key -> code, town names only (no bare codes), for query parsing
+        self._codes = {}           # key -> code
+        for code, label in choices:
+            self.labels.setdefault(code, label)
+            for name in (label, *aliases.get(code, ())):
+                key = location_key(name)
+                if key:
+                    self.names.setdefault(key, code)
+            self._codes.setdefault(location_key(code), code)
+        for key, code in self.names.items():
+            self._codes.setdefault(key, code)
+        self._keys = sorted(self._codes)
+        self._fuzzy = FuzzyMatcher(self._keys)
+
+    def resolve(self, name):
+        """
+        (code, exact) for a township name: exact key, then a prefix that only
+        one township has, then the closest misspelling. (None, False) if none.
+        """
+        key = location_key(name)
+        if not key:
+            return None, False
+        code = self._codes.get(key)
+        if code:
+            return code, True
+        i = bisect_left(self._keys, key)
+        prefixed = set()
+        while i < len(self._keys) and self._keys[i].startswith(key) and len(prefixed) < 2:
+            prefixed.add(self._codes[self._keys[i]])
+            i += 1
+        if len(prefixed) == 1:
+            return prefixed.pop(), True
+        closest = self._fuzzy.closest(key)
+        return (self._codes[closest], False) if closest else (None, False)
+
+    def label(self, code):
+        return self.labels.get(code, code)
+
+
+_gazetteer = None
+_gazetteer_lock = threading.Lock()
+
+
+def get_gazetteer():
+    global _gazetteer
+    if _gazetteer is None:
+        with _gazetteer_lock:
+            if _gazetteer is None:
+                from Jobs.models import Jobs
+                _gazetteer = Gazetteer(Jobs.LOCATION_CHOICES, ALIASES)
+    return _gazetteer
+
+
+def resolve_location(name):
+    return get_gazetteer().resolve(name)
@@ -0,0 +1,347 @@
+# Jobs/search/index.py
+import threading
+import time
+import uuid
+from bisect import bisect_left, insort
+from collections import namedtuple
+from datetime import date
+
+import numpy as np
+
+from .changes import mark_synced, poll_changes
+from .columns import PRIORITY_RANK, JobColumns
+from .facets import FACETS, facet_response, facet_values
+from .fuzzy import FuzzyMatcher
+from .pagination import SearchPage
+from .proximity import location_ranks
+from .ranking import Scorer, TopK
+from .tokenizer import grams, query_grams, words
+
+# fields we index, in the order their term frequencies are stored
+FIELDS = ("title", "category", "employer", "location", "description")
+
+# what scoring and removal need of one doc; the filterable columns live in JobColumns
+JobDoc = namedtuple(
+    "JobDoc",
+    ["id", "location", "priority_rank", "created_at", "lengths", "terms", "grams", "facets"],
+)
+
+
+def job_fields(job):
+    """
+    Text of every indexed field for one job, in FIELDS order, preferring the
+    Unicode-normalized shadow columns. Expects employer and category to be
+    loaded (select_related).
+    """
+    location_display = dict(job._meta.get_field("location").choices).get(job.location, "")
+    category, employer = job.category, job.employer
+    return (
+        job.title_normalized or job.title or "",
+        (category.name_normalized or category.name) if category else "",
+        (employer.business_name_normalized or employer.business_name) if employer else "",
+        f"{job.location or ''} {location_display}",
+        job.description_normalized or job.description or "",
+    )
+
+
+def job_grams(job):
+    """Space-insensitive grams of every field; grams never span two fields."""
+    result = set()
+    for text in job_fields(job):
+        result |= grams(text)
+    return result
+
+
+class InvertedIndex:
+    """
+    In-process inverted index over the searchable job fields.
+    postings: term -> {doc number: (tf per field)}
+    gram postings: gram -> {doc numbers}, for space-insensitive matching
+    facet postings: per facet, value -> {doc numbers}, for sidebar counts
+    columns: JobColumns whose row numbers are the doc numbers, for filtering
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._postings = {}
+        self._vocab = []           # sorted terms
+        self._fuzzy = FuzzyMatcher()   # trigrams of the terms, for typo correction
+        self._grams = {}
+        self._gram_vocab = []      # sorted grams, used for prefix lookups
+        self._docs = {}            # doc number -> JobDoc
+        self._columns = JobColumns()   # doc number -> filterable columns; owns job id -> doc number
+        self._length_totals = [0] * len(FIELDS)   # for BM25 average field lengths
+        self._facets = [{} for _ in FACETS]
+        self._category_names = {}  # category facet value -> display name
+
+    def __len__(self):
+        return len(self._docs)
+
+    # ---------- writes ----------
+    def add(self, job):
+        """Index (or re-index) one job instance."""
+        gram_set = job_grams(job)
+        with self._lock:
+            self.remove(job.id)
+            doc = self._columns.upsert(job)
+
+            counts = {}
+            lengths = []
+            for pos, text in enumerate(job_fields(job)):
+                tokens = words(text)
+                lengths.append(len(tokens))
+                for term in tokens:
+                    tf = counts.setdefault(term, [0] * len(FIELDS))
+                    tf[pos] += 1
+
+            for term, tf in counts.items():
+                plist = self._postings.get(term)
+                if plist is None:
+                    plist = self._postings[term] = {}
+                    insort(self._vocab, term)
+                    self._fuzzy.add(term)
+                plist[doc] = tuple(tf)
+
+            for gram in gram_set:
+                docs = self._grams.get(gram)
+                if docs is None:
+                    docs = self._grams[gram] = set()
+                    insort(self._gram_vocab, gram)
+                docs.add(doc)
+
+            values = facet_values(job.location, job.job_type, job.category_id, job.salary)
+            for postings, value in zip(self._facets, values):
+                if value is not None:
+                    postings.setdefault(value, set()).add(doc)
+            if job.category_id:
+                self._category_names[values[2]] = job.category.name
+
+            self._docs[doc] = JobDoc(
+                id=job.id,
+                location=job.location,
+                priority_rank=PRIORITY_RANK.get(job.priority, 1),
+                created_at=job.created_at.timestamp() if job.created_at else 0.0,
+                lengths=tuple(lengths),
+                terms=tuple(counts),
+                grams=tuple(gram_set),
+                facets=values,
+            )
+            for f, length in enumerate(lengths):
+                self._length_totals[f] += length
+
+    def remove(self, job_id):
+        with self._lock:
+            doc = self._columns.remove(job_id)
+            if doc is None:
+                return
+            old = self._docs.pop(doc)
+            for f, length in enumerate(old.lengths):
+                self._length_totals[f] -= length
+            for term in old.terms:
+                if _discard(self._postings, self._vocab, term, doc):
+                    self._fuzzy.remove(term)
+            for gram in old.grams:
+                _discard(self._grams, self._gram_vocab, gram, doc)
+            for postings, value in zip(self._facets, old.facets):
+                if value is not None:
+                    docs = postings[value]
+                    docs.discard(doc)
+                    if not docs:
+                        del postings[value]
+
+    # ---------- reads ----------
+    def _prefix_docs(self, prefix):
+        """Union of the postings of every gram starting with prefix."""
+        docs = set()
+        i = bisect_left(self._gram_vocab, prefix)
+        while i < len(self._gram_vocab) and self._gram_vocab[i].startswith(prefix):
+            docs |= self._grams[self._gram_vocab[i]]
+            i += 1
+        return docs
+
+    def match(self, q):
+        """
+        Doc numbers containing q as a space-insensitive substring of one field,
+        answered from gram postings. Returns None for an empty query,
+        meaning "no text filter".
+        """
+        needed, is_prefix = query_grams(q)
+        if not needed:
+            return None
+        with self._lock:
+            if is_prefix:
+                return self._prefix_docs(needed[0])
+            # rarest postings first keeps the intersections small
+            postings = sorted((self._grams.get(g, set()) for g in needed), key=len)
+            result = set(postings[0])
+            for docs in postings[1:]:
+                if not result:
+                    break
+                result &= docs
+            return result
+
+    def known(self, word):
+        """True if word is a term or a term prefix (and so already matches)."""
+        with self._lock:
+            i = bisect_left(self._vocab, word)
+            return i < len(self._vocab) and self._vocab[i].startswith(word)
+
+    def correct(self, word):
+        """
+        Closest known term for a word that is neither a term nor a term prefix
+        (prefixes already match), preferring frequent terms; None otherwise.
+        """
+        with self._lock:
+            if self.known(word):
+                return None
+            return self._fuzzy.closest(word, weight=lambda term: len(self._postings[term]))
+
+    def facet_counts(self, numbers):
+        """{facet: {value: count}} over a set of doc numbers, by posting set intersection."""
+        numbers = numbers if isinstance(numbers, (set, frozenset)) else set(numbers)
+        with self._lock:
+            return {
+                facet: {value: n for value, docs in postings.items() if (n := len(docs & numbers))}
+                for facet, postings in zip(FACETS, self._facets)
+            }
+
+    def _candidates(self, matched, ranks, filters, today, hidden=None):
+        """
+        Doc numbers passing the structured filters (active, not expired, township,
+        job type, category, salary), as one vectorized mask over the columns,
+        restricted to the text matches when there are any. hidden masks out
+        docs superseded elsewhere (snapshot.LayeredIndex).
+        """
+        mask = self._columns.mask(
+            today=today,
+            locations=list(ranks) if ranks is not None else None,
+            job_types=filters.get("job_type") or None,
+            categories=filters.get("category") or None,
+            salary_min=filters.get("salary_min"),
+            salary_max=filters.get("salary_max"),
+        )
+        if matched is not None:
+            if not isinstance(matched, np.ndarray):
+                matched = np.fromiter(matched, dtype=np.intp, count=len(matched))
+            hit = np.zeros(len(mask), dtype=bool)
+            hit[matched] = True
+            mask &= hit
+        if hidden is not None:
+            mask &= ~hidden[:len(mask)]
+        return np.flatnonzero(mask).tolist()
+
+    def browse(self, limit, ranks=None, after=None, **filters):
+        """
+        JobColumns.page() over the indexed jobs selected by JobColumns.mask(**filters),
+        newest first: jobs_list and the quick searches, no text query.
+        """
+        with self._lock:
+            return self._columns.page(self._columns.mask(**filters), limit, ranks, after)
+
+    def search(self, q="", loc=None, limit=30, after=None, facets=False, filters=None, today=None):
+        """
+        One page of active, non-expired jobs matching q in township loc, best first:
+        BM25F relevance blended with priority and recency (see ranking.py).
+        loc may also be a list of codes nearest first, which then orders first.
+        filters are the structured filters of query_parser.parse_query().
+        after is the key of the previous page's last hit (pagination.py); its
+        scoring clock is reused so scores stay comparable across pages.
+        Returns a SearchPage; the total is always exact here. With facets=True
+        the page also carries facet counts over every match.
+        """
+        now = after["t"] if after else time.time()
+        keys, total, counts = self.ranked(q, loc, limit + 1, after, now, facets, filters, today)
+        return result_page(keys, limit, now, total, counts, self._category_names)
+
+    def ranked(self, q, loc, k, after, now, facets=False, filters=None, today=None, hidden=None, corpus=None):
+        """
+        The k best sort keys after the cursor, best first, with the match total
+        and raw facet counts (or None). corpus supplies the BM25 statistics
+        (see Scorer); snapshot.LayeredIndex ranks its overlay against its base.
+        """
+        today = today or date.today()
+        last = tuple(after["k"]) if after else None
+        ranks, by_distance = location_ranks(loc)
+        with self._lock:
+            numbers = self._candidates(self.match(q), ranks, filters or {}, today, hidden)
+            scorer = Scorer(self, q, now=now, corpus=corpus)
+            best = TopK(k)
+            for n in numbers:
+                doc = self._docs[n]
+                key = (scorer.score(n, doc), doc.priority_rank, doc.created_at, doc.id.hex)
+                if by_distance:
+                    key = (-ranks[doc.location],) + key
+                if last is None or key < last:
+                    best.push(key)
+            counts = self.facet_counts(numbers) if facets else None
+        return best.result(), len(numbers), counts
+
+
+def result_page(keys, limit, now, total, counts, category_names):
+    """SearchPage from ranked() keys (limit + 1 of them when there is a next page)."""
+    next_key = {"k": list(keys[limit - 1]), "t": now} if len(keys) > limit else None
+    counts = facet_response(counts, category_names) if counts is not None else None
+    return SearchPage([uuid.UUID(key[-1]) for key in keys[:limit]], next_key, total, True, counts)
+
+
+def _discard(postings, vocab, key, doc):
+    """Drop doc from the postings of key; True when key left the vocabulary."""
+    entries = postings[key]
+    if isinstance(entries, set):
+        entries.discard(doc)
+    else:
+        entries.pop(doc, None)
+    if not entries:
+        del postings[key]
+        i = bisect_left(vocab, key)
+        if i < len(vocab) and vocab[i] == key:
+            del vocab[i]
+        return True
+    return False
+
+
+# ---------- process-wide index ----------
+_index = None
+_index_lock = threading.Lock()
+
+
+def build_index():
+    """Build from the Jobs table; grams are generated from the normalized text columns."""
+    from Jobs.models import Jobs
+
+    index = InvertedIndex()
+    for job in Jobs.objects.select_related("employer", "category").iterator(chunk_size=2000):
+        index.add(job)
+    return index
+
+
+def get_index():
+    """
+    Return the process-wide index: the shared snapshot file (snapshot.py) when
+    settings.JOB_SEARCH_SNAPSHOT points at one, else built from the Jobs table
+    on first use. Writes of other processes are applied on access (changes.py).
+    """
+    global _index
+    if _index is not None:
+        poll_changes()
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                from django.conf import settings
+                from django.utils import timezone
+                from .snapshot import load_snapshot_index
+
+                started = timezone.now()
+                _index = load_snapshot_index(getattr(settings, "JOB_SEARCH_SNAPSHOT", None)) or build_index()
+                mark_synced(started)
+    return _index
+
+
+def index_is_loaded():
+    return _index is not None
+
+
+def reset_index():
+    global _index
+    with _index_lock:
+        _index = None
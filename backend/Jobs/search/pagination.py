@@ -0,0 +1,75 @@
+# Jobs/search/pagination.py
+"""
+Search-after cursors for search results.
+
+A cursor is an opaque url-safe token wrapping the sort key of the last result
+on the page (score / priority rank, created_at, id) plus whatever the backend
+needs to reproduce the ordering (e.g. the scoring clock), so page N costs the
+same as page 1 — no OFFSET.
+"""
+import base64
+import json
+import math
+import uuid
+from collections import namedtuple
+
+from django.utils.dateparse import parse_datetime
+
+# ids: ranked primary keys of this page
+# next_key: dict to encode as the next cursor, None on the last page
+# total / total_exact: match count when requested, exact or a lower-bound estimate
+# facets: facets.facet_response() over the whole match set, when requested
+SearchPage = namedtuple("SearchPage", ["ids", "next_key", "total", "total_exact", "facets"], defaults=[None])
+
+# "estimate" counts stop here and report total_exact=False
+ESTIMATE_CAP = 1000
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(backend_name, key):
+    payload = json.dumps({"b": backend_name, **key}, separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token, backend_name):
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise InvalidCursor("Malformed cursor.")
+    if not isinstance(payload, dict) or payload.pop("b", None) != backend_name or "k" not in payload:
+        raise InvalidCursor("Cursor does not belong to this search.")
+    return payload
+
+
+# ---------- sort key validation ----------
+# a cursor is client input: backends check its key against these before using it
+def is_integer(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+def is_uuid_text(value):
+    try:
+        return isinstance(value, str) and uuid.UUID(value) is not None
+    except ValueError:
+        return False
+
+
+def is_timestamp_text(value):
+    try:
+        return isinstance(value, str) and parse_datetime(value) is not None
+    except ValueError:
+        return False
+
+
+def check_key(values, kinds):
+    """Raise InvalidCursor unless values is a list with one value of each kind (a predicate above)."""
+    if not (isinstance(values, list) and len(values) == len(kinds) and all(kind(v) for kind, v in zip(kinds, values))):
+        raise InvalidCursor("Malformed cursor.")
@@ -0,0 +1,96 @@
+# Jobs/search/proximity.py
+"""
+Township proximity for "jobs near me": a precomputed distance matrix over
+Jobs.LOCATION_CHOICES, held in memory as a small float32 NumPy array.
+
+Distances are great-circle kilometres between town centres; near() turns a
+code and a radius into the codes in range, nearest first, so the backends only
+filter on a handful of codes and order by their rank.
+"""
+import threading
+
+import numpy as np
+
+DEFAULT_RADIUS_KM = 50
+MAX_RADIUS_KM = 500
+
+# approximate town centres (latitude, longitude)
+COORDINATES = {
+    "MO": (20.593, 93.192),
+    "MB": (20.366, 93.270),
+    "SIT": (20.146, 92.898),
+    "RD": (20.481, 92.762),
+    "MD": (20.824, 92.365),
+    "KP": (19.429, 93.549),
+    "TD": (18.461, 94.367),
+    "TG": (18.842, 94.233),
+    "AN": (19.777, 94.042),
+    "PNG": (20.331, 93.000),
+    "KT": (20.840, 92.984),
+    "RM": (19.094, 93.864),
+    "MA": (18.845, 93.734),
+    "GW": (17.595, 94.581),
+    "PT": (20.188, 93.067),
+    "BTD": (20.870, 92.531),
+    "MBN": (20.050, 93.368),
+}
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def distance_matrix(coordinates):
+    """Pairwise great-circle distances (km) of (lat, lon) rows, as float32; NaN rows -> inf."""
+    lat, lon = np.radians(np.asarray(coordinates, dtype=np.float64)).T
+    dlat = lat[:, None] - lat[None, :]
+    dlon = lon[:, None] - lon[None, :]
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat)[:, None] * np.cos(lat)[None, :] * np.sin(dlon / 2) ** 2
+    km = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+    km[np.isnan(km)] = np.inf
+    np.fill_diagonal(km, 0)
+    return km.astype(np.float32)
+
+
+class ProximityMatrix:
+    def __init__(self, codes, coordinates):
+        self.codes = tuple(codes)
+        self._position = {code: i for i, code in enumerate(self.codes)}
+        self.km = distance_matrix([coordinates.get(code, (np.nan, np.nan)) for code in self.codes])
+        # per township, every column ordered by distance: near() is a slice, not a sort
+        self._order = np.argsort(self.km, axis=1, kind="stable")
+
+    def near(self, code, radius_km=DEFAULT_RADIUS_KM):
+        """[(code, km), ...] of the townships within radius_km of code, nearest first (code itself included)."""
+        i = self._position.get(code)
+        if i is None:
+            return []
+        row = self.km[i]
+        order = self._order[i]
+        count = int(np.searchsorted(row[order], radius_km, side="right"))
+        return [(self.codes[j], round(float(row[j]), 1)) for j in order[:count]]
+
+
+_matrix = None
+_matrix_lock = threading.Lock()
+
+
+def get_proximity():
+    global _matrix
+    if _matrix is None:
+        with _matrix_lock:
+            if _matrix is None:
+                from Jobs.models import Jobs
+                codes = list(dict.fromkeys(code for code, _ in Jobs.LOCATION_CHOICES))
+                _matrix = ProximityMatrix(codes, COORDINATES)
+    return _matrix
+
+
+def location_ranks(loc):
+    """
+    Normalize a backend loc filter (None, one code, or codes nearest first)
+    into ({code: rank} or None, whether results are ordered by that rank).
+    """
+    if not loc:
+        return None, False
+    if isinstance(loc, str):
+        return {loc: 0}, False
+    return {code: rank for rank, code in enumerate(loc)}, len(loc) > 1
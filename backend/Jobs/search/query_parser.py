@@ -0,0 +1,249 @@
+# Jobs/search/query_parser.py
+"""
+Query understanding: pulls job types, township names, category names and
+salary expressions out of free text ("part time teacher sittwe 3-5 lakh")
+and turns them into equality / range filters. Job types, townships and
+salaries leave the text; a category name stays in it as well, so the category
+filter only narrows what the text matches (and the search view drops it when
+nothing is left).
+
+Phrases are looked up in a precompiled dict keyed by their tokens joined
+without spaces, so "part time", "part-time" and "parttime" are one key and
+Burmese names match syllable by syllable. At each position the longest
+phrase wins.
+"""
+import re
+import threading
+import time
+from collections import namedtuple
+
+from .gazetteer import get_gazetteer
+from .tokenizer import normalize, runs, syllables
+
+MAX_PHRASE_TOKENS = 6
+MIN_LATIN_KEY = 3          # shorter Latin words ("an", "it") are never read as filters
+
+# value -> extra ways people write it, besides the JOB_TYPE_CHOICES label
+JOB_TYPE_ALIASES = {
+    "FULL": ["full time", "fulltime", "permanent", "အချိန်ပြည့်"],
+    "PART": ["part time", "parttime", "အချိန်ပိုင်း"],
+    "INTERN": ["intern", "internship", "trainee", "အလုပ်သင်"],
+    "REMOTE": ["remote", "work from home", "wfh"],
+}
+
+# dropped from the leftover text once something was understood ("jobs in sittwe")
+STOPWORDS = {"in", "at", "near", "for", "job", "jobs", "salary", "the", "a", "လစာ", "အလုပ်"}
+
+_MYANMAR_DIGITS = str.maketrans("၀၁၂၃၄၅၆၇၈၉", "0123456789")
+# smallest number read as a salary on its own (below: "3 lakh", "1-2m" need a unit)
+SALARY_SIZED = 10000
+_UNITS = {"k": 1e3, "lakh": 1e5, "lakhs": 1e5, "lac": 1e5, "သိန်း": 1e5, "m": 1e6, "million": 1e6}
+_NUMBER = r"(\d+(?:[.,]\d+)*)\s*(k|lakhs?|lac|သိန်း|million|m)?(?:\s*(?:mmk|ks|kyats?))?(?![\w])"
+_SALARY_RE = re.compile(
+    rf"(?P<range>{_NUMBER}\s*(?:-|~|to)\s*{_NUMBER})"
+    rf"|(?P<min>(?:above|over|min|from|at least|more than|>=?)\s*{_NUMBER})"
+    rf"|(?P<max>(?:under|below|max|up to|upto|less than|<=?)\s*{_NUMBER})"
+    rf"|(?P<bare>{_NUMBER})"
+)
+
+ParsedQuery = namedtuple("ParsedQuery", ["text", "filters", "location", "understood"])
+
+
+def _amount(number, unit):
+    value = float(number.replace(",", ""))
+    return value * _UNITS.get(unit or "", 1)
+
+
+def _range_amount(number, unit, other_unit):
+    """One end of a range: a small bare number takes the unit of the other end ("1-2m", "3 lakh - 5")."""
+    if not unit and float(number.replace(",", "")) < SALARY_SIZED:
+        unit = other_unit
+    return _amount(number, unit)
+
+
+def parse_salary(text):
+    """(text without the salary expression, salary_min, salary_max, matched phrase)."""
+    text = text.translate(_MYANMAR_DIGITS)
+    for m in _SALARY_RE.finditer(text):
+        g = m.groups()
+        if m.group("range"):
+            low, high = _range_amount(g[1], g[2], g[4]), _range_amount(g[3], g[4], g[2])
+            if low > high:
+                continue
+            bounds = (low, high)
+        elif m.group("min"):
+            bounds = (_amount(g[6], g[7]), None)
+        elif m.group("max"):
+            bounds = (None, _amount(g[9], g[10]))
+        else:
+            # a bare number is only a salary with a unit or when it is salary-sized
+            amount = _amount(g[12], g[13])
+            if not g[13] and amount < SALARY_SIZED:
+                continue
+            bounds = (amount, None)
+        return text[:m.start()] + " " + text[m.end():], bounds[0], bounds[1], m.group().strip()
+    return text, None, None, None
+
+
+def _tokens(text):
+    """(is_myanmar, token) for every Latin word and Myanmar syllable."""
+    tokens = []
+    for is_myanmar, run in runs(text):
+        if is_myanmar:
+            tokens.extend((True, s) for s in syllables(run))
+        else:
+            tokens.append((False, run))
+    return tokens
+
+
+def _key(text):
+    return "".join(token for _, token in _tokens(text))
+
+
+class QueryDictionary:
+    """Precompiled phrase key -> (filter kind, values)."""
+
+    def __init__(self, job_types, locations, categories):
+        self._phrases = {}
+        # earlier kinds win a shared key: job type, then township, then category
+        for value, label in job_types:
+            for phrase in (label, *JOB_TYPE_ALIASES.get(value, ())):
+                self._add(_key(phrase), "job_type", value)
+        for key, code in locations.items():
+            self._add(key, "location", code)
+        for pk, name in categories:
+            self._add(_key(name), "category", pk)
+
+    def _add(self, key, kind, value):
+        if not key or (key.isascii() and len(key) < MIN_LATIN_KEY):
+            return
+        current = self._phrases.get(key)
+        if current is None:
+            self._phrases[key] = (kind, [value])
+        elif current[0] == kind and kind == "category" and value not in current[1]:
+            current[1].append(value)     # same name under several employers
+
+    def match(self, tokens, start):
+        """Longest phrase starting at tokens[start]: (end, kind, values) or None."""
+        for end in range(min(len(tokens), start + MAX_PHRASE_TOKENS), start, -1):
+            found = self._phrases.get("".join(token for _, token in tokens[start:end]))
+            if found:
+                return end, found[0], found[1]
+        return None
+
+
+def parse_query(q, dictionary, locations=True):
+    """
+    Split q into leftover text and filters:
+    {"job_type": value, "category": [ids], "salary_min": n, "salary_max": n}
+    plus the township code (None when locations=False or none was named).
+    """
+    text, salary_min, salary_max, salary_phrase = parse_salary(normalize(q))
+    filters = {}
+    understood = []
+    location = None
+    if salary_phrase:
+        if salary_min is not None:
+            filters["salary_min"] = salary_min
+        if salary_max is not None:
+            filters["salary_max"] = salary_max
+        understood.append({"type": "salary", "text": salary_phrase})
+
+    tokens = _tokens(text)
+    leftover = []
+    i = 0
+    while i < len(tokens):
+        found = dictionary.match(tokens, i)
+        if found:
+            end, kind, values = found
+            taken = (
+                (kind == "location" and locations and location is None)
+                or (kind in ("job_type", "category") and kind not in filters)
+            )
+            if taken:
+                if kind == "location":
+                    location = values[0]
+                else:
+                    filters[kind] = values[0] if kind == "job_type" else list(values)
+                phrase = _join(tokens[i:end])
+                understood.append({"type": kind, "text": phrase})
+                if kind == "category":
+                    leftover.extend(tokens[i:end])
+                i = end
+                continue
+        leftover.append(tokens[i])
+        i += 1
+
+    if understood:
+        leftover = [t for t in leftover if t[1] not in STOPWORDS]
+    return ParsedQuery(_join(leftover), filters, location, understood)
+
+
+def _join(tokens):
+    """Tokens back to text: spaces between words, none inside a Myanmar run."""
+    out = []
+    previous_myanmar = False
+    for is_myanmar, token in tokens:
+        if out and not (is_myanmar and previous_myanmar):
+            out.append(" ")
+        out.append(token)
+        previous_myanmar = is_myanmar
+    return "".join(out)
+
+
+def drop_category(parsed):
+    """parsed without its category filter (the category words are still in its text)."""
+    filters = {kind: value for kind, value in parsed.filters.items() if kind != "category"}
+    understood = [entry for entry in parsed.understood if entry["type"] != "category"]
+    return parsed._replace(filters=filters, understood=understood)
+
+
+# ---------- process-wide dictionary ----------
+_dictionary = None
+_version = None        # _category_version() the dictionary was built from
+_checked = 0.0         # time.monotonic() of the last version check
+_dictionary_lock = threading.Lock()
+
+
+def _category_version():
+    from django.db.models import Count, Max
+    from Jobs.models import JobCategory
+
+    version = JobCategory.objects.aggregate(n=Count("id"), latest=Max("updated_at"))
+    return version["n"], version["latest"]
+
+
+def get_query_dictionary():
+    """
+    Built on first use. Jobs/signals.py resets it after a category write in
+    this process; writes of other processes are noticed by comparing the
+    category count and latest update, at most every JOB_SEARCH_SYNC_INTERVAL
+    seconds.
+    """
+    global _dictionary, _version, _checked
+    from django.conf import settings
+
+    if _dictionary is not None and time.monotonic() - _checked >= settings.JOB_SEARCH_SYNC_INTERVAL:
+        _checked = time.monotonic()
+        if _category_version() != _version:
+            reset_query_dictionary()
+    if _dictionary is None:
+        with _dictionary_lock:
+            if _dictionary is None:
+                from Jobs.models import Jobs, JobCategory
+
+                _checked = time.monotonic()
+                _version = _category_version()
+                categories = JobCategory.objects.values_list("id", "name_normalized", "name")
+                _dictionary = QueryDictionary(
+                    Jobs.JOB_TYPE_CHOICES,
+                    get_gazetteer().names,
+                    [(str(pk), normalized or name) for pk, normalized, name in categories],
+                )
+    return _dictionary
+
+
+def reset_query_dictionary():
+    global _dictionary
+    with _dictionary_lock:
+        _dictionary = None
@@ -0,0 +1,100 @@
+# Jobs/search/ranking.py
+"""
+Relevance scoring for the in-process index: BM25F over the indexed fields,
+blended with job priority and recency, with a bounded heap for the top-k.
+"""
+import heapq
+import math
+import time
+from bisect import bisect_left
+
+from .tokenizer import words
+
+# per-field weights, in index.FIELDS order: title, category, employer, location, description
+FIELD_WEIGHTS = (3.0, 2.0, 1.5, 1.0, 1.0)
+FIELD_B = (0.5, 0.3, 0.3, 0.0, 0.75)   # length normalization per field
+K1 = 1.2
+
+# priority_rank -> multiplicative boost on the text score
+PRIORITY_BOOST = {3: 1.5, 2: 1.25, 1: 1.0}
+# additive recency boost, halving every RECENCY_HALF_LIFE_DAYS
+RECENCY_WEIGHT = 0.3
+RECENCY_HALF_LIFE_DAYS = 14
+# an expanded prefix ("dev" -> "developer") counts a bit less than the exact term
+PREFIX_PENALTY = 0.8
+MAX_PREFIX_TERMS = 50
+# text score floor for docs matched by substring (grams) but by none of the query words
+MIN_TEXT_SCORE = 0.1
+
+
+def query_terms(index, q):
+    """
+    Weighted index terms for q: each query word itself, plus vocabulary terms it
+    is a prefix of (bounded, so a one-letter query cannot expand to everything).
+    """
+    terms = {}
+    vocab = index._vocab
+    for word in set(words(q)):
+        i = bisect_left(vocab, word)
+        for term in vocab[i:i + MAX_PREFIX_TERMS]:
+            if not term.startswith(word):
+                break
+            weight = 1.0 if term == word else PREFIX_PENALTY
+            terms[term] = max(terms.get(term, 0.0), weight)
+    return terms
+
+
+class Scorer:
+    def __init__(self, index, q, now=None, corpus=None):
+        """
+        Scores docs of index; corpus (default: index itself) supplies the
+        collection statistics: doc count, average field lengths, document frequencies.
+        """
+        self.now = now or time.time()
+        corpus = index if corpus is None else corpus
+        n_docs = max(len(corpus), 1)
+        self.avg_lengths = [max(total / n_docs, 1.0) for total in corpus._length_totals]
+        self.terms = []
+        for term, weight in query_terms(index, q).items():
+            postings = index._postings[term]
+            df = len(corpus._postings.get(term) or postings)
+            idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+            self.terms.append((postings, idf * weight))
+
+    def text_score(self, doc_number, doc):
+        score = 0.0
+        for postings, idf in self.terms:
+            tfs = postings.get(doc_number)
+            if tfs is None:
+                continue
+            tf = 0.0
+            for f, count in enumerate(tfs):
+                if count:
+                    norm = 1 - FIELD_B[f] + FIELD_B[f] * doc.lengths[f] / self.avg_lengths[f]
+                    tf += FIELD_WEIGHTS[f] * count / norm
+            score += idf * tf / (K1 + tf)
+        return score
+
+    def score(self, doc_number, doc):
+        age_days = max(self.now - doc.created_at, 0) / 86400
+        recency = RECENCY_WEIGHT * 0.5 ** (age_days / RECENCY_HALF_LIFE_DAYS)
+        # with no query words (empty q) priority and recency alone order the list
+        text = max(self.text_score(doc_number, doc), MIN_TEXT_SCORE) if self.terms else 1.0
+        return text * PRIORITY_BOOST.get(doc.priority_rank, 1.0) + recency
+
+
+class TopK:
+    """Bounded min-heap keeping the k largest sort keys pushed, O(n log k)."""
+
+    def __init__(self, k):
+        self.k = k
+        self.heap = []
+
+    def push(self, key):
+        if len(self.heap) < self.k:
+            heapq.heappush(self.heap, key)
+        elif key > self.heap[0]:
+            heapq.heapreplace(self.heap, key)
+
+    def result(self):
+        return sorted(self.heap, reverse=True)
@@ -0,0 +1,457 @@
+# Jobs/search/snapshot.py
+"""
+On-disk snapshot of the in-process search index, shared by every worker.
+
+`manage.py build_search_index` builds an InvertedIndex from the tables and
+writes it as one versioned file of flat arrays: the doc table (JobColumns
+arrays, job ids, field lengths), the sorted term and gram dictionaries with
+their posting lists, and one value column per facet. Workers mmap the file,
+so its pages live once in the OS page cache instead of once per process, and
+a fresh worker answers its first query without building anything.
+
+Writes made after the snapshot go to a small in-process InvertedIndex, the
+delta overlay, fed from the JobChange log (changes.py) like the built index. Base docs it replaces (or
+that were deleted) are hidden by a tombstone mask, and search merges the two
+ranked lists; see LayeredIndex.
+"""
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+import uuid
+from bisect import bisect_left
+
+import numpy as np
+from django.db.models import Q
+
+from .columns import JobColumns, keyed_page, key_order
+from .facets import FACETS
+from .fuzzy import FuzzyMatcher
+from .index import FIELDS, InvertedIndex, JobDoc, result_page
+from .tokenizer import query_grams
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"AJCSNAP\0"
+FORMAT_VERSION = 3
+ALIGN = 64
+# magic, format version, reserved, header offset, header length
+_PREAMBLE = struct.Struct("<8sIIQQ")
+
+
+class SnapshotError(Exception):
+    pass
+
+
+# ---------- writing ----------
+def _strings(strings):
+    """Sorted strings as (offsets, utf-8 blob) arrays."""
+    encoded = [s.encode() for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(e) for e in encoded])
+    return offsets, np.frombuffer(b"".join(encoded), dtype=np.uint8)
+
+
+def _index_arrays(index):
+    """(arrays, header fields) of an InvertedIndex; doc numbers stay as they are."""
+    columns, codes, ids = index._columns.export()
+    n = len(ids)
+    arrays = dict(columns)
+
+    arrays["ids"] = np.array([(i.bytes if i else bytes(16)) for i in ids], dtype="S16")
+    live = [row for row, i in enumerate(ids) if i is not None]
+    order = sorted(live, key=lambda row: ids[row].bytes)
+    arrays["sorted_ids"] = np.array([ids[row].bytes for row in order], dtype="S16")
+    arrays["sorted_rows"] = np.array(order, dtype=np.int32)
+
+    lengths = np.zeros((n, len(FIELDS)), dtype=np.uint32)
+    for row, doc in index._docs.items():
+        lengths[row] = doc.lengths
+    arrays["lengths"] = lengths
+
+    # terms: postings of term i are post_docs / post_tfs[term_start[i]:term_start[i + 1]]
+    arrays["term_offsets"], arrays["term_blob"] = _strings(index._vocab)
+    start, docs, tfs = [0], [], []
+    for term in index._vocab:
+        plist = index._postings[term]
+        for doc in sorted(plist):
+            docs.append(doc)
+            tfs.append(plist[doc])
+        start.append(len(docs))
+    arrays["term_start"] = np.array(start, dtype=np.int64)
+    arrays["post_docs"] = np.array(docs, dtype=np.int32)
+    arrays["post_tfs"] = np.array(tfs, dtype=np.uint16).reshape(len(tfs), len(FIELDS))
+
+    # grams: same layout, doc numbers only
+    arrays["gram_offsets"], arrays["gram_blob"] = _strings(index._gram_vocab)
+    start, docs = [0], []
+    for gram in index._gram_vocab:
+        docs.extend(sorted(index._grams[gram]))
+        start.append(len(docs))
+    arrays["gram_start"] = np.array(start, dtype=np.int64)
+    arrays["gram_docs"] = np.array(docs, dtype=np.int32)
+
+    # facets: the value number of each doc (-1: none), a job has at most one value per facet
+    facet_values = []
+    for f, postings in enumerate(index._facets):
+        values = sorted(postings)
+        column = np.full(n, -1, dtype=np.int32)
+        for v, value in enumerate(values):
+            column[list(postings[value])] = v
+        arrays[f"facet_{f}"] = column
+        facet_values.append(values)
+
+    header = {
+        "docs": len(index),
+        "codes": codes,
+        "facet_values": facet_values,
+        "category_names": dict(index._category_names),
+        "length_totals": list(index._length_totals),
+    }
+    return arrays, header
+
+
+def write_snapshot(index, path, synced_at):
+    """
+    Write index to path (atomically: a temp file renamed over it). synced_at
+    is when reading the tables started; workers catch up on jobs updated since.
+    Returns the header written.
+    """
+    arrays, header = _index_arrays(index)
+    header.update(version=FORMAT_VERSION, built_at=time.time(), synced_at=synced_at.isoformat(), arrays={})
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(bytes(ALIGN))
+        for name, values in arrays.items():
+            offset = -f.tell() % ALIGN
+            f.write(bytes(offset))
+            header["arrays"][name] = [f.tell(), values.dtype.str, list(values.shape)]
+            f.write(np.ascontiguousarray(values).tobytes())
+        encoded = json.dumps(header).encode()
+        header_offset = f.tell()
+        f.write(encoded)
+        f.seek(0)
+        f.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, 0, header_offset, len(encoded)))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return header
+
+
+# ---------- reading ----------
+class Snapshot:
+    """The header and read-only NumPy views of one mmapped snapshot file."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mmap) < _PREAMBLE.size:
+            raise SnapshotError(f"{path}: truncated")
+        magic, version, _, offset, length = _PREAMBLE.unpack_from(self._mmap)
+        if magic != MAGIC:
+            raise SnapshotError(f"{path}: not a search index snapshot")
+        if version != FORMAT_VERSION:
+            raise SnapshotError(f"{path}: format version {version}, expected {FORMAT_VERSION}")
+        self.path = path
+        self.header = json.loads(self._mmap[offset:offset + length])
+        self.arrays = {}
+        for name, (start, dtype, shape) in self.header["arrays"].items():
+            values = np.frombuffer(self._mmap, dtype=dtype, count=int(np.prod(shape)), offset=start)
+            self.arrays[name] = values.reshape(shape)
+
+
+class StringTable:
+    """Sorted strings stored as offsets + blob; a sequence, so bisect works on it."""
+
+    def __init__(self, offsets, blob):
+        self._offsets = offsets
+        self._blob = blob
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self._blob[self._offsets[i]:self._offsets[i + 1]].tobytes().decode()
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def find(self, key):
+        i = bisect_left(self, key)
+        return i if i < len(self) and self[i] == key else None
+
+
+class Postings:
+    """Posting list of one term: doc number -> per-field term frequencies."""
+
+    def __init__(self, docs, tfs):
+        self._docs = docs
+        self._tfs = tfs
+
+    def __len__(self):
+        return len(self._docs)
+
+    def get(self, doc, default=None):
+        i = int(np.searchsorted(self._docs, doc))
+        if i < len(self._docs) and self._docs[i] == doc:
+            return tuple(self._tfs[i].tolist())
+        return default
+
+
+class PostingsTable:
+    """term -> Postings, the mapped counterpart of InvertedIndex._postings."""
+
+    def __init__(self, vocab, start, docs, tfs):
+        self._vocab = vocab
+        self._start = start
+        self._docs = docs
+        self._tfs = tfs
+
+    def get(self, term, default=None):
+        i = self._vocab.find(term)
+        if i is None:
+            return default
+        a, b = self._start[i], self._start[i + 1]
+        return Postings(self._docs[a:b], self._tfs[a:b])
+
+    def __getitem__(self, term):
+        postings = self.get(term)
+        if postings is None:
+            raise KeyError(term)
+        return postings
+
+
+class MappedIds:
+    """Row <-> job id over the ids arrays of a snapshot."""
+
+    def __init__(self, ids, sorted_ids, sorted_rows):
+        self._ids = ids
+        self._sorted_ids = sorted_ids
+        self._sorted_rows = sorted_rows
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __getitem__(self, row):
+        # "S16" drops trailing NUL bytes; put them back
+        return uuid.UUID(bytes=self._ids[row].ljust(16, b"\0"))
+
+    def get(self, job_id, default=None):
+        key = job_id.bytes
+        i = int(np.searchsorted(self._sorted_ids, key))
+        if i < len(self._sorted_ids) and self._sorted_ids[i].ljust(16, b"\0") == key:
+            return int(self._sorted_rows[i])
+        return default
+
+
+class DocTable:
+    """doc number -> JobDoc (the fields ranking needs) from the mapped columns."""
+
+    def __init__(self, ids, arrays, locations):
+        self._ids = ids
+        self._location = arrays["location"]
+        self._priority_rank = arrays["priority_rank"]
+        self._created_at = arrays["created_at"]
+        self._lengths = arrays["lengths"]
+        self._locations = locations
+
+    def __getitem__(self, n):
+        code = int(self._location[n])
+        return JobDoc(
+            id=self._ids[n],
+            location=self._locations[code] if code >= 0 else None,
+            priority_rank=int(self._priority_rank[n]),
+            created_at=float(self._created_at[n]),
+            lengths=tuple(self._lengths[n].tolist()),
+            terms=(), grams=(), facets=(),
+        )
+
+
+class MappedIndex(InvertedIndex):
+    """Read-only InvertedIndex over a Snapshot: the same reads, answered from the mapped arrays."""
+
+    def __init__(self, snapshot):
+        header, a = snapshot.header, snapshot.arrays
+        self.snapshot = snapshot
+        self._lock = threading.RLock()
+        self._vocab = StringTable(a["term_offsets"], a["term_blob"])
+        self._postings = PostingsTable(self._vocab, a["term_start"], a["post_docs"], a["post_tfs"])
+        self._gram_vocab = StringTable(a["gram_offsets"], a["gram_blob"])
+        self._gram_start = a["gram_start"]
+        self._gram_docs = a["gram_docs"]
+        self._ids = MappedIds(a["ids"], a["sorted_ids"], a["sorted_rows"])
+        self._columns = JobColumns.from_arrays(
+            {name: a[name] for name, _ in JobColumns.COLUMNS}, header["codes"], self._ids,
+        )
+        self._docs = DocTable(self._ids, a, header["codes"]["location"])
+        self._length_totals = header["length_totals"]
+        self._facet_values = header["facet_values"]
+        self._facet_codes = [a[f"facet_{f}"] for f in range(len(FACETS))]
+        self._category_names = header["category_names"]
+        self._fuzzy = None
+        self._size = header["docs"]
+
+    def __len__(self):
+        return self._size
+
+    def add(self, job):
+        raise TypeError("a snapshot index is read-only; write to LayeredIndex")
+
+    def remove(self, job_id):
+        raise TypeError("a snapshot index is read-only; write to LayeredIndex")
+
+    def row(self, job_id):
+        return self._ids.get(job_id)
+
+    def _gram_range(self, lo, hi):
+        return self._gram_docs[self._gram_start[lo]:self._gram_start[hi]]
+
+    def match(self, q):
+        """InvertedIndex.match over the mapped gram postings; returns a sorted doc number array."""
+        needed, is_prefix = query_grams(q)
+        if not needed:
+            return None
+        if is_prefix:
+            # grams sharing a prefix are adjacent, so their postings are one slice
+            lo = bisect_left(self._gram_vocab, needed[0])
+            hi = bisect_left(self._gram_vocab, needed[0] + "\U0010ffff")
+            return np.unique(self._gram_range(lo, hi))
+        postings = []
+        for gram in needed:
+            i = self._gram_vocab.find(gram)
+            if i is None:
+                return np.empty(0, dtype=np.int32)
+            postings.append(self._gram_range(i, i + 1))
+        postings.sort(key=len)
+        result = postings[0]
+        for docs in postings[1:]:
+            if not len(result):
+                break
+            result = np.intersect1d(result, docs, assume_unique=True)
+        return result
+
+    def correct(self, word):
+        # the trigram matcher is only needed for zero-result queries: built on the first one
+        if self._fuzzy is None:
+            with self._lock:
+                if self._fuzzy is None:
+                    self._fuzzy = FuzzyMatcher(self._vocab)
+        return super().correct(word)
+
+    def facet_counts(self, numbers):
+        """{facet: {value: count}} over doc numbers, by counting their facet value numbers."""
+        numbers = np.asarray(numbers, dtype=np.intp)
+        counts = {}
+        for facet, values, codes in zip(FACETS, self._facet_values, self._facet_codes):
+            codes = codes[numbers]
+            per_value = np.bincount(codes[codes >= 0], minlength=len(values))
+            counts[facet] = {value: int(n) for value, n in zip(values, per_value) if n}
+        return counts
+
+
+class LayeredIndex:
+    """
+    A MappedIndex base plus the delta overlay: jobs written since the snapshot
+    live in an in-process InvertedIndex, and their base docs are hidden. Has
+    the add / remove / search / correct API of InvertedIndex.
+    """
+
+    def __init__(self, base):
+        self.base = base
+        self.overlay = InvertedIndex()
+        self._hidden = np.zeros(len(base._ids), dtype=bool)   # base docs superseded or deleted
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.base) - int(self._hidden.sum()) + len(self.overlay)
+
+    def _hide(self, job_id):
+        row = self.base.row(job_id)
+        if row is not None:
+            self._hidden[row] = True
+
+    def add(self, job):
+        with self._lock:
+            self._hide(job.id)
+            self.overlay.add(job)
+
+    def remove(self, job_id):
+        with self._lock:
+            self._hide(job_id)
+            self.overlay.remove(job_id)
+
+    def catch_up(self, since):
+        """
+        Overlay jobs saved or logged as changed (QuerySet.update() leaves
+        updated_at alone) since the snapshot was taken, and hide those deleted since.
+        """
+        from Jobs.models import JobChange, Jobs
+        from .changes import SLACK
+
+        changed = JobChange.objects.filter(changed_at__gte=since - SLACK).values("job_id")
+        jobs = Jobs.objects.filter(Q(updated_at__gte=since) | Q(id__in=changed))
+        for job in jobs.select_related("employer", "category"):
+            self.add(job)
+        existing = set(Jobs.objects.values_list("id", flat=True))
+        with self._lock:
+            live = self.base._columns.mask(live=False)
+            for row in np.flatnonzero(live & ~self._hidden).tolist():
+                if self.base._ids[row] not in existing:
+                    self._hidden[row] = True
+
+    def correct(self, word):
+        if self.overlay.known(word):
+            return None
+        return self.base.correct(word)
+
+    def browse(self, limit, ranks=None, after=None, **filters):
+        """InvertedIndex.browse over both layers: the two column pages merged by key."""
+        k = None if limit is None else limit + 1
+        with self._lock:
+            columns = self.base._columns
+            entries = columns.page_keys(columns.mask(**filters) & ~self._hidden, k, ranks, after)
+            columns = self.overlay._columns
+            entries += columns.page_keys(columns.mask(**filters), k, ranks, after)
+        entries.sort(key=key_order)
+        return keyed_page(entries[:k], limit)
+
+    def search(self, q="", loc=None, limit=30, after=None, facets=False, filters=None, today=None):
+        """InvertedIndex.search over both layers: each ranks its own docs, scored with base statistics."""
+        now = after["t"] if after else time.time()
+        with self._lock:
+            base = self.base.ranked(q, loc, limit + 1, after, now, facets, filters, today, hidden=self._hidden)
+            overlay = self.overlay.ranked(q, loc, limit + 1, after, now, facets, filters, today, corpus=self.base)
+            category_names = {**self.base._category_names, **self.overlay._category_names}
+        keys = sorted(base[0] + overlay[0], reverse=True)[:limit + 1]
+        counts = None
+        if facets:
+            counts = {facet: dict(values) for facet, values in base[2].items()}
+            for facet, values in overlay[2].items():
+                for value, n in values.items():
+                    counts[facet][value] = counts[facet].get(value, 0) + n
+        return result_page(keys, limit, now, base[1] + overlay[1], counts, category_names)
+
+
+def load_snapshot_index(path):
+    """LayeredIndex over the snapshot at path, caught up with the tables; None if unusable."""
+    from django.utils.dateparse import parse_datetime
+
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        snapshot = Snapshot(path)
+    except (OSError, ValueError, SnapshotError) as e:
+        logger.warning("Ignoring search index snapshot: %s", e)
+        return None
+    index = LayeredIndex(MappedIndex(snapshot))
+    index.catch_up(parse_datetime(snapshot.header["synced_at"]))
+    return index
@@ -0,0 +1,223 @@
+# Jobs/search/suggest.py
+"""
+Typeahead suggestions for the search box: job titles, category names,
+employer business names and location display names.
+
+Suggestions live in a sorted array of (match key, suggestion id) answered with
+bisect. A suggestion is reachable from the start of each of its first few words
+(Latin words / Myanmar syllables), space-insensitively, so "dev", "webdev" and
+"ဆရာ" all complete. Its weight is its popularity: the number of live jobs
+behind it. Prefix ranges too wide to scan on every keystroke cache their
+top-k until a write touches a key under that prefix.
+"""
+import heapq
+import threading
+from bisect import bisect_left, insort
+from datetime import date
+
+from .changes import mark_synced, poll_changes
+from .tokenizer import runs, syllables
+
+TOP_K = 10
+MAX_KEY_LENGTH = 32
+MAX_WORD_STARTS = 4
+SCAN_LIMIT = 64            # prefix ranges wider than this get their top-k cached
+KIND_ORDER = {"title": 0, "category": 1, "employer": 2, "location": 3}
+
+
+def _tokens(text):
+    tokens = []
+    for is_myanmar, run in runs(text):
+        tokens.extend(syllables(run) if is_myanmar else [run])
+    return tokens
+
+
+def query_key(text):
+    """What the user typed, in match-key form (normalized, no spaces or punctuation)."""
+    return "".join(_tokens(text))[:MAX_KEY_LENGTH]
+
+
+def suggestion_keys(label):
+    """Match keys of a label: the squashed label from the start of each of its first words."""
+    tokens = _tokens(label)
+    keys = {"".join(tokens[i:])[:MAX_KEY_LENGTH] for i in range(min(len(tokens), MAX_WORD_STARTS))}
+    keys.discard("")
+    return keys
+
+
+def job_suggestions(job, today):
+    """((suggestion id, label), ...) a live job contributes; expects category / employer loaded."""
+    if not job.is_active or (job.deadline is not None and job.deadline < today):
+        return ()
+    refs = []
+    title = " ".join((job.title_normalized or job.title or "").split())
+    if title:
+        refs.append((("title", query_key(title)), title))
+    if job.category_id:
+        refs.append((("category", str(job.category_id)), job.category.name_normalized or job.category.name))
+    if job.employer_id:
+        employer = job.employer
+        refs.append((("employer", str(job.employer_id)), employer.business_name_normalized or employer.business_name))
+    if job.location:
+        display = dict(job._meta.get_field("location").choices).get(job.location, job.location)
+        refs.append((("location", job.location), display))
+    return tuple((sid, label) for sid, label in refs if sid[1] and label)
+
+
+class Suggestion:
+    __slots__ = ("kind", "value", "label", "weight", "keys")
+
+    def __init__(self, kind, value, label):
+        self.kind, self.value, self.label = kind, value, label
+        self.weight = 0
+        self.keys = ()
+
+    def rank(self):
+        return (-self.weight, KIND_ORDER[self.kind], self.label)
+
+    def as_dict(self):
+        return {"text": self.label, "type": self.kind, "value": self.value, "weight": self.weight}
+
+
+class SuggestIndex:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._keys = []           # sorted (key, suggestion id)
+        self._suggestions = {}    # suggestion id -> Suggestion
+        self._job_refs = {}       # job id -> what the job contributed (job_suggestions)
+        self._cache = {}          # prefix -> top-k Suggestions
+
+    def __len__(self):
+        return len(self._suggestions)
+
+    # ---------- writes ----------
+    def add_job(self, job, today=None):
+        refs = job_suggestions(job, today or date.today())
+        with self._lock:
+            self.remove_job(job.id)
+            for sid, label in refs:
+                self._bump(sid, label, 1)
+            if refs:
+                self._job_refs[job.id] = refs
+
+    def remove_job(self, job_id):
+        with self._lock:
+            for sid, _ in self._job_refs.pop(job_id, ()):
+                self._bump(sid, None, -1)
+
+    def _bump(self, sid, label, delta):
+        entry = self._suggestions.get(sid)
+        if entry is None:
+            entry = self._suggestions[sid] = Suggestion(sid[0], sid[1], label)
+            self._set_keys(entry, suggestion_keys(label))
+        elif label is not None and label != entry.label:
+            # renamed category / employer; titles differing only in case keep their keys
+            entry.label = label
+            keys = suggestion_keys(label)
+            if keys != set(entry.keys):
+                self._set_keys(entry, keys)
+        entry.weight += delta
+        self._invalidate(entry.keys)
+        if entry.weight <= 0:
+            self._set_keys(entry, ())
+            del self._suggestions[sid]
+
+    def _set_keys(self, entry, keys):
+        sid = (entry.kind, entry.value)
+        for key in entry.keys:
+            i = bisect_left(self._keys, (key, sid))
+            if i < len(self._keys) and self._keys[i] == (key, sid):
+                del self._keys[i]
+        for key in keys:
+            insort(self._keys, (key, sid))
+        self._invalidate(entry.keys)
+        self._invalidate(keys)
+        entry.keys = tuple(keys)
+
+    def _invalidate(self, keys):
+        if self._cache:
+            for key in keys:
+                for i in range(1, len(key) + 1):
+                    self._cache.pop(key[:i], None)
+
+    def load(self, jobs, today=None):
+        """Bulk version of add_job for a fresh index: one sort instead of an insort per key."""
+        today = today or date.today()
+        with self._lock:
+            for job in jobs:
+                refs = job_suggestions(job, today)
+                if not refs:
+                    continue
+                self._job_refs[job.id] = refs
+                for sid, label in refs:
+                    entry = self._suggestions.get(sid)
+                    if entry is None:
+                        entry = self._suggestions[sid] = Suggestion(sid[0], sid[1], label)
+                    entry.label = label
+                    entry.weight += 1
+            for sid, entry in self._suggestions.items():
+                entry.keys = tuple(suggestion_keys(entry.label))
+                self._keys.extend((key, sid) for key in entry.keys)
+            self._keys.sort()
+            self._cache.clear()
+
+    # ---------- reads ----------
+    def complete(self, text, limit=TOP_K):
+        """Top completions of text, most popular first."""
+        prefix = query_key(text)
+        if not prefix:
+            return []
+        with self._lock:
+            top = self._cache.get(prefix)
+            if top is None:
+                lo = bisect_left(self._keys, (prefix,))
+                hi = bisect_left(self._keys, (prefix + "\U0010ffff",))
+                sids = {sid for _, sid in self._keys[lo:hi]}
+                top = heapq.nsmallest(TOP_K, (self._suggestions[sid] for sid in sids), key=Suggestion.rank)
+                if hi - lo > SCAN_LIMIT:
+                    self._cache[prefix] = top
+            return [entry.as_dict() for entry in top[:limit]]
+
+
+# ---------- process-wide suggester ----------
+_suggester = None
+_suggester_lock = threading.Lock()
+
+
+def build_suggester():
+    from Jobs.models import Jobs
+
+    suggester = SuggestIndex()
+    suggester.load(
+        Jobs.objects.filter(is_active=True).select_related("employer", "category").iterator(chunk_size=2000)
+    )
+    return suggester
+
+
+def get_suggester():
+    """
+    Return the process-wide suggester, building it from the Jobs table on first
+    use. Writes of other processes are applied on access (changes.py).
+    """
+    global _suggester
+    if _suggester is not None:
+        poll_changes()
+    if _suggester is None:
+        with _suggester_lock:
+            if _suggester is None:
+                from django.utils import timezone
+
+                started = timezone.now()
+                _suggester = build_suggester()
+                mark_synced(started)
+    return _suggester
+
+
+def suggester_is_loaded():
+    return _suggester is not None
+
+
+def reset_suggester():
+    global _suggester
+    with _suggester_lock:
+        _suggester = None
@@ -0,0 +1,103 @@
+# Jobs/search/tokenizer.py
+"""
+Tokenizer for mixed Burmese / English job text.
+
+Burmese has no reliable word boundaries, so Myanmar script is cut into
+syllables (the sylbreak rules) and Latin text into lower-cased words.
+For space-insensitive matching both are flattened into "units"
+(a Latin character or a Myanmar syllable) and indexed as unit n-grams.
+"""
+import re
+
+from .zawgyi import to_unicode
+
+GRAM_SIZE = 3
+MAX_GRAM_LENGTH = 64   # longer grams are junk input
+
+_MY_CONSONANT = "က-အ"
+_MY_ASAT = "်"
+_MY_VIRAMA = "္"
+# independent vowels, digits and punctuation always start a new syllable
+_MY_OTHER = "ဣ-ဪဿ၊-၏၀-၉"
+
+# a syllable starts at a consonant that is not stacked (after virama)
+# and not killed (followed by asat / virama), or at any "other" character
+_SYLLABLE_BREAK = re.compile(
+    rf"(?:(?<!{_MY_VIRAMA})[{_MY_CONSONANT}](?![{_MY_ASAT}{_MY_VIRAMA}])|[{_MY_OTHER}])"
+)
+_TOKEN_RUN = re.compile(r"[က-႟ꩠ-ꩿ]+|[a-z0-9]+")
+
+
+def normalize(text):
+    return to_unicode(text).lower()
+
+
+def squash(text):
+    """normalize() with all whitespace removed, as stored in the Jobs *_nospace columns."""
+    return "".join(normalize(text).split())
+
+
+def syllables(text):
+    """Split a run of Myanmar script into syllables."""
+    starts = [m.start() for m in _SYLLABLE_BREAK.finditer(text)]
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+    return [text[a:b] for a, b in zip(starts, starts[1:] + [len(text)])]
+
+
+def _is_myanmar(run):
+    return "က" <= run[0] <= "႟" or "ꩠ" <= run[0] <= "ꩿ"
+
+
+def runs(text):
+    """(is_myanmar, run) for every run of Myanmar script or Latin letters/digits."""
+    return [(_is_myanmar(run), run) for run in _TOKEN_RUN.findall(normalize(text))]
+
+
+def words(text):
+    """Ranking tokens: English words and Myanmar syllables, in order."""
+    tokens = []
+    for is_myanmar, run in runs(text):
+        if is_myanmar:
+            tokens.extend(syllables(run))
+        else:
+            tokens.append(run)
+    return tokens
+
+
+def units(text):
+    """
+    Whitespace-insensitive unit sequence: every Latin character and every
+    Myanmar syllable, with spaces and punctuation dropped.
+    """
+    out = []
+    for is_myanmar, run in runs(text):
+        if is_myanmar:
+            out.extend(syllables(run))
+        else:
+            out.extend(run)
+    return out
+
+
+def grams(text, n=GRAM_SIZE):
+    """
+    Unit n-grams of text. Windows near the end are emitted shorter, so every
+    substring shorter than n units is still the prefix of some gram.
+    """
+    seq = units(text)
+    result = {"".join(seq[i:i + n]) for i in range(len(seq))}
+    return {gram for gram in result if len(gram) <= MAX_GRAM_LENGTH}
+
+
+def query_grams(q, n=GRAM_SIZE):
+    """
+    Grams a document must contain to match q as a space-insensitive substring.
+    Returns (grams, is_prefix): when q is shorter than n units the single
+    returned gram has to be looked up as a prefix of indexed grams.
+    """
+    seq = units(q)
+    if not seq:
+        return [], False
+    if len(seq) < n:
+        return ["".join(seq)], True
+    return sorted({"".join(seq[i:i + n]) for i in range(len(seq) - n + 1)}), False
@@ -0,0 +1,113 @@
+# Jobs/search/vocabulary.py
+"""
+The term vocabulary of the indexed job text, on its own: every term with the
+number of jobs using it, and a trigram matcher over the terms.
+
+"Did you mean" (fuzzy.correct_query) only needs this much. The memory backend
+corrects against its InvertedIndex, which has it anyway; the database and
+full-text backends correct against a Vocabulary instead of building a whole
+index (postings, grams, columns) just for zero-result queries.
+"""
+import threading
+from bisect import bisect_left, insort
+
+from .changes import mark_synced, poll_changes
+from .fuzzy import FuzzyMatcher
+from .index import job_fields
+from .tokenizer import words
+
+
+class Vocabulary:
+    """Terms of the job text with their document frequencies; the known / correct API of InvertedIndex."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._df = {}              # term -> number of jobs using it
+        self._vocab = []           # sorted terms
+        self._fuzzy = FuzzyMatcher()
+        self._terms = {}           # job id -> its terms, for removal
+
+    def __len__(self):
+        return len(self._vocab)
+
+    # ---------- writes ----------
+    def add(self, job):
+        """Count (or recount) the terms of one job instance."""
+        terms = set()
+        for text in job_fields(job):
+            terms.update(words(text))
+        with self._lock:
+            self.remove(job.id)
+            self._terms[job.id] = tuple(terms)
+            for term in terms:
+                if term not in self._df:
+                    self._df[term] = 0
+                    insort(self._vocab, term)
+                    self._fuzzy.add(term)
+                self._df[term] += 1
+
+    def remove(self, job_id):
+        with self._lock:
+            for term in self._terms.pop(job_id, ()):
+                self._df[term] -= 1
+                if not self._df[term]:
+                    del self._df[term]
+                    del self._vocab[bisect_left(self._vocab, term)]
+                    self._fuzzy.remove(term)
+
+    # ---------- reads ----------
+    def known(self, word):
+        """True if word is a term or a term prefix (and so already matches)."""
+        with self._lock:
+            i = bisect_left(self._vocab, word)
+            return i < len(self._vocab) and self._vocab[i].startswith(word)
+
+    def correct(self, word):
+        """Closest known term for an unknown word, preferring frequent terms; None otherwise."""
+        with self._lock:
+            if self.known(word):
+                return None
+            return self._fuzzy.closest(word, weight=self._df.get)
+
+
+# ---------- process-wide vocabulary ----------
+_vocabulary = None
+_vocabulary_lock = threading.Lock()
+
+
+def build_vocabulary():
+    from Jobs.models import Jobs
+
+    vocabulary = Vocabulary()
+    for job in Jobs.objects.select_related("employer", "category").iterator(chunk_size=2000):
+        vocabulary.add(job)
+    return vocabulary
+
+
+def get_vocabulary():
+    """
+    Return the process-wide vocabulary, building it from the Jobs table on
+    first use. Writes of other processes are applied on access (changes.py).
+    """
+    global _vocabulary
+    if _vocabulary is not None:
+        poll_changes()
+    if _vocabulary is None:
+        with _vocabulary_lock:
+            if _vocabulary is None:
+                from django.utils import timezone
+
+                started = timezone.now()
+                _vocabulary = build_vocabulary()
+                mark_synced(started)
+    return _vocabulary
+
+
+def vocabulary_is_loaded():
+    return _vocabulary is not None
+
+
+def reset_vocabulary():
+    global _vocabulary
+    with _vocabulary_lock:
+        _vocabulary = None
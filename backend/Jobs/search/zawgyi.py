@@ -0,0 +1,137 @@
+# Jobs/search/zawgyi.py
+"""
+Zawgyi -> Unicode conversion for Burmese text.
+
+Users type in both encodings; everything we store or search with goes through
+to_unicode() once so matching can stay an exact / indexed comparison.
+Rules follow the ordering of the Rabbit converter: code point remapping first,
+then reordering of prescript vowels and medials into Unicode storage order.
+"""
+import re
+import unicodedata
+
+_C = "\u1000-\u1021"   # consonants
+
+# Code points / sequences that do not occur in well-formed Unicode Burmese
+_ZAWGYI_RE = re.compile(
+    "[\u105a\u1060-\u1097]"                   # Zawgyi glyph variants (stacked, kinzi, medial forms)
+    "|[\u1033\u1034]"                         # Zawgyi u / uu variants
+    f"|\u1039(?![{_C}])"                      # asat typed as virama
+    "|(?:^|[\\s\u104a\u104b])[\u1031\u103b]"  # e-vowel / ya-yit typed before the consonant
+    f"|\u1031[\u103b\u103c]"
+    f"|[{_C}]\u103a\u1039(?![{_C}])"
+)
+
+_RULES = [(re.compile(a), b) for a, b in [
+    ("\u200b", ""),
+    # kinzi is typed after its consonant in Zawgyi
+    (f"(\u1031)?([\u103b\u107e-\u1084])?([{_C}])\u1064", "\u1064\\1\\2\\3"),
+    (f"(\u1031)?([\u103b\u107e-\u1084])?([{_C}])\u108b", "\u1064\\1\\2\\3\u102d"),
+    (f"(\u1031)?([\u103b\u107e-\u1084])?([{_C}])\u108c", "\u1064\\1\\2\\3\u102e"),
+    (f"(\u1031)?([\u103b\u107e-\u1084])?([{_C}])\u108d", "\u1064\\1\\2\\3\u1036"),
+    # medials and asat
+    ("[\u103d\u1087]", "\u103e"),
+    ("\u103c", "\u103d"),
+    ("[\u103b\u107e-\u1084]", "\u103c"),
+    ("[\u103a\u107d]", "\u103b"),
+    ("\u1039", "\u103a"),
+    # stacked consonants
+    ("[\u1066\u1067]", "\u1039\u1006"),
+    ("\u106a", "\u1009"),
+    ("\u106b", "\u100a"),
+    ("\u106c", "\u1039\u100b"),
+    ("\u106d", "\u1039\u100c"),
+    ("\u106e", "\u100d\u1039\u100d"),
+    ("\u106f", "\u100d\u1039\u100e"),
+    ("\u1070", "\u1039\u100f"),
+    ("[\u1071\u1072]", "\u1039\u1010"),
+    ("\u1060", "\u1039\u1000"),
+    ("\u1061", "\u1039\u1001"),
+    ("\u1062", "\u1039\u1002"),
+    ("\u1063", "\u1039\u1003"),
+    ("\u1065", "\u1039\u1005"),
+    ("\u1068", "\u1039\u1007"),
+    ("\u1069", "\u1039\u1008"),
+    ("[\u1073\u1074]", "\u1039\u1011"),
+    ("\u1075", "\u1039\u1012"),
+    ("\u1076", "\u1039\u1013"),
+    ("\u1077", "\u1039\u1014"),
+    ("\u1078", "\u1039\u1015"),
+    ("\u1079", "\u1039\u1016"),
+    ("\u107a", "\u1039\u1017"),
+    ("\u107c", "\u1039\u1019"),
+    ("\u1085", "\u1039\u101c"),
+    ("\u1096", "\u1039\u1010\u103d"),
+    ("\u1097", "\u100b\u1039\u100b"),
+    ("\u1091", "\u100f\u1039\u100d"),
+    ("\u1092", "\u100b\u1039\u100c"),
+    ("\u1019\u102c[\u107b\u1093]", "\u1019\u1039\u1018\u102c"),
+    ("[\u107b\u1093]", "\u1039\u1018"),
+    # vowel / tone variants
+    ("\u1033", "\u102f"),
+    ("\u1034", "\u1030"),
+    ("\u103f", "\u1030"),
+    ("\u1086", "\u103f"),
+    ("\u1036\u1088", "\u1088\u1036"),
+    ("\u1088", "\u103e\u102f"),
+    ("\u1089", "\u103e\u1030"),
+    ("\u108a", "\u103d\u103e"),
+    ("\u1064", "\u1004\u103a\u1039"),
+    ("\u108e", "\u102d\u1036"),
+    ("\u108f", "\u1014"),
+    ("\u1090", "\u101b"),
+    ("[\u1094\u1095]", "\u1037"),
+    ("\u105a", "\u102b\u103a"),
+    ("\u104e", "\u104e\u1004\u103a\u1038"),
+    # zero / seven typed for wa / ra
+    ("\u1040(?=[\u102b-\u1030\u1032\u1036\u103d\u103e])", "\u101d"),
+    ("\u1047(?=[\u102c-\u1030\u1032\u1036-\u1038\u103d])", "\u101b"),
+    # reorder: ya-yit and e-vowel are typed before the consonant
+    (f"\u103c([{_C}])", "\\1\u103c"),
+    (f"\u1031([{_C}\u103f])(\u103e)?(\u103b)?", "\\1\\2\\3\u1031"),
+    (f"([{_C}])\u1031([\u103b-\u103e]+)", "\\1\\2\u1031"),
+    (f"([{_C}])\u1031(\u1039[{_C}])", "\\1\\2\u1031"),
+    # normalize medial / vowel order
+    ("\u1032\u103d", "\u103d\u1032"),
+    ("([\u102d\u102e])\u103b", "\u103b\\1"),
+    ("\u103d\u103b", "\u103b\u103d"),
+    ("(\u103e)([\u103b\u103c])", "\\2\\1"),
+    ("([\u102d\u102e])([\u103d\u103e])", "\\2\\1"),
+    ("\u103a\u1037", "\u1037\u103a"),
+    ("([\u102f\u1030])([\u102d\u102e])", "\\2\\1"),
+    ("\u1036([\u102f\u1030])", "\\1\u1036"),
+    ("\u1036\u103d", "\u103d\u1036"),
+    ("\u1037\u1036", "\u1036\u1037"),
+    ("\u1038\u103a", "\u103a\u1038"),
+    (f"\u102c\u1039([{_C}])", "\u1039\\1\u102c"),
+    (f"\u103c\u1039([{_C}])", "\u1039\\1\u103c"),
+    (f"\u1036\u1039([{_C}])", "\u1039\\1\u1036"),
+    (f"([\u102d\u102e])\u1039([{_C}])", "\u1039\\2\\1"),
+    ("\u1025(?=\u1037?[\u103a\u102c])", "\u1009"),
+    ("\u1025\u102e", "\u1026"),
+    ("\u1005\u103b", "\u1008"),
+    # duplicated marks
+    ("\u102d\u103a|\u103a\u102d", "\u102d"),
+    ("\u102d\u102e|\u102e\u102d", "\u102e"),
+    ("([\u102d\u102e\u1032\u1036\u1037\u103a\u103d])\\1+", "\\1"),
+    (" \u1037", "\u1037"),
+]]
+
+
+def is_zawgyi(text):
+    return bool(text) and _ZAWGYI_RE.search(text) is not None
+
+
+def zawgyi_to_unicode(text):
+    for pattern, repl in _RULES:
+        text = pattern.sub(repl, text)
+    return text
+
+
+def to_unicode(text):
+    """Detect and convert Zawgyi, then NFC-normalize. Safe on Unicode and non-Burmese text."""
+    if not text:
+        return text or ""
+    if is_zawgyi(text):
+        text = zawgyi_to_unicode(text)
+    return unicodedata.normalize("NFC", text)
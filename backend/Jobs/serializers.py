@@ -3,16 +3,16 @@ from rest_framework import serializers
 from .models import JobCategory, Jobs
 from Accounts.models import CustomUser
 from EmployerProfile.models import EmployerProfile
+from JobSeeker.listing import SparseFieldsMixin
 
-class JobCategorySerializer(serializers.ModelSerializer):
+class JobCategorySerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = JobCategory
         fields = ['id', 'name']
     
 
     
-class JobsSerializer(serializers.ModelSerializer):
-    application_count = serializers.SerializerMethodField()
+class JobsSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     employer_business_name = serializers.CharField(
         source="employer.business_name",
         read_only=True
@@ -29,9 +29,6 @@ class JobsSerializer(serializers.ModelSerializer):
     job_type_display = serializers.CharField(source='get_job_type_display', read_only=True)
     priority_display = serializers.CharField(source='get_priority_display', read_only=True)
 
-    def get_application_count(self, job):
-        return job.applications.count()
-    
     class Meta:
         model = Jobs
         fields = [
@@ -50,7 +47,13 @@ class JobsSerializer(serializers.ModelSerializer):
             "job_type_display",
             "priority",
             "priority_display",
+            # counter columns kept by Jobs/signals.py
             "application_count",
+            "pending_count",
+            "review_count",
+            "shortlist_count",
+            "rejected_count",
+            "hired_count",
             "salary",
             "is_active",
             "max_applicants",
@@ -60,6 +63,11 @@ class JobsSerializer(serializers.ModelSerializer):
         ]
 
         read_only_fields = ["employer"]
+        # ?expand=category,employer nests these instead of their ids (lists only)
+        expandable = {
+            "category": "Jobs.serializers.JobCategorySerializer",
+            "employer": "EmployerProfile.serializers.CompanySerializer",
+        }
 
 
 
@@ -1,9 +1,15 @@
 # jobs/signals.py
 from django.db import transaction
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_save, pre_save, post_delete, pre_delete
 from django.dispatch import receiver
 from django.contrib.contenttypes.models import ContentType
-from .models import Jobs
+from .models import JobChange, Jobs, JobCategory
+from .search import synced_fulltext_backend
+from .search.changes import refresh_jobs
+from .search.query_parser import reset_query_dictionary
+from .search.tokenizer import squash
+from .search.zawgyi import to_unicode
+from EmployerProfile.models import EmployerProfile
 from Application.models import Application
 from Notification.models import Notification  # adjust if your app name is different
 
@@ -41,13 +47,150 @@ def notify_on_application_created(sender, instance, created, **kwargs):
 # -------- Track old status before save (for status-change detection) --------
 @receiver(pre_save, sender=Application)
 def cache_old_status(sender, instance, **kwargs):
-    if not instance.pk:
-        instance._old_status = None
+    instance._old_status = instance._old_job_id = None
+    if instance._state.adding:
         return
-    try:
-        old = Application.objects.get(pk=instance.pk)
-        instance._old_status = getattr(old, "status", None)
-    except Application.DoesNotExist:
-        instance._old_status = None
-        
+    old = Application.objects.filter(pk=instance.pk).values_list("status", "job_id").first()
+    if old:
+        instance._old_status, instance._old_job_id = old
+
+
+# -------- Application counters on Jobs (same transaction as the write) --------
+@receiver(post_save, sender=Application)
+def count_application_on_save(sender, instance, created, **kwargs):
+    old_job_id = getattr(instance, "_old_job_id", None)
+    if created and getattr(instance, "_slot_claimed", False):
+        return          # already counted by Jobs.objects.claim_application_slot()
+    if created:
+        Jobs.objects.adjust_application_counts(instance.job_id, new_status=instance.status, total=1)
+    elif old_job_id is None:
+        return
+    elif old_job_id != instance.job_id:
+        Jobs.objects.adjust_application_counts(old_job_id, old_status=instance._old_status, total=-1)
+        Jobs.objects.adjust_application_counts(instance.job_id, new_status=instance.status, total=1)
+    else:
+        Jobs.objects.adjust_application_counts(
+            instance.job_id, old_status=instance._old_status, new_status=instance.status,
+        )
+
+
+@receiver(post_delete, sender=Application)
+def count_application_on_delete(sender, instance, **kwargs):
+    Jobs.objects.adjust_application_counts(instance.job_id, old_status=instance.status, total=-1)
+
 # -------- Application status changed -> notify jobseeker --------
+
+
+# -------- Normalize searchable text once, at write time --------
+@receiver(pre_save, sender=Jobs)
+def normalize_job_text(sender, instance, **kwargs):
+    instance.title_normalized = to_unicode(instance.title)
+    instance.description_normalized = to_unicode(instance.description)
+    instance.title_nospace = squash(instance.title)
+    instance.location_nospace = squash(instance.location)
+    instance.category_name_nospace = squash(instance.category.name) if instance.category else ""
+    instance.description_nospace = squash(instance.description)
+
+
+@receiver(pre_save, sender=JobCategory)
+def normalize_category_name(sender, instance, **kwargs):
+    instance.name_normalized = to_unicode(instance.name)
+
+
+@receiver(pre_save, sender=EmployerProfile)
+def normalize_business_name(sender, instance, **kwargs):
+    instance.business_name_normalized = to_unicode(instance.business_name)
+
+
+# -------- Keep the search indexes (full-text tables, in-process index and suggester) in sync --------
+# In-memory structures follow the JobChange log (search/changes.py): every write logs
+# its jobs in its own transaction for the other processes, and this one applies it on commit
+_TEXT_FIELDS = {"title", "description", "location", "category", "employer"}
+
+
+def _log_changes(job_ids):
+    JobChange.objects.record(job_ids)
+    transaction.on_commit(lambda: refresh_jobs(job_ids))
+
+
+def _fulltext_index_jobs(jobs):
+    backend = synced_fulltext_backend()
+    if backend:
+        backend.index_jobs(jobs)
+
+
+def _refresh_search(queryset):
+    jobs = list(queryset.select_related("employer", "category"))
+    if not jobs:
+        return
+    _fulltext_index_jobs(jobs)
+    _log_changes([job.id for job in jobs])
+
+
+def reindex_after_update(job_ids):
+    """
+    QuerySet.update() sends no signals: log these jobs as changed so every
+    process refreshes its in-memory indexes. Only for non-text fields (is_active, ...).
+    """
+    job_ids = list(job_ids)
+    if job_ids:
+        _log_changes(job_ids)
+
+
+@receiver(post_save, sender=Jobs)
+def index_job_on_save(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or _TEXT_FIELDS & set(update_fields):
+        _fulltext_index_jobs([instance])
+    _log_changes([instance.id])
+
+
+@receiver(post_delete, sender=Jobs)
+def unindex_job_on_delete(sender, instance, **kwargs):
+    backend = synced_fulltext_backend()
+    if backend:
+        backend.remove_jobs([instance.id])
+    _log_changes([instance.id])
+
+
+@receiver(post_save, sender=JobCategory)
+def reindex_jobs_on_category_save(sender, instance, created, **kwargs):
+    # category names are query-parser phrases
+    transaction.on_commit(reset_query_dictionary)
+    if not created:
+        jobs = Jobs.objects.filter(category_id=instance.id)
+        jobs.update(category_name_nospace=squash(instance.name))
+        _refresh_search(jobs)
+
+
+@receiver(post_save, sender=EmployerProfile)
+def reindex_jobs_on_employer_save(sender, instance, created, **kwargs):
+    backend = synced_fulltext_backend()
+    if backend:
+        backend.index_companies([instance])
+    if not created:
+        _refresh_search(Jobs.objects.filter(employer_id=instance.id))
+
+
+@receiver(post_delete, sender=EmployerProfile)
+def unindex_employer_on_delete(sender, instance, **kwargs):
+    backend = synced_fulltext_backend()
+    if backend:
+        backend.remove_companies([instance.id])
+
+
+# jobs lose their category via SET_NULL, which sends no Jobs signals
+@receiver(pre_delete, sender=JobCategory)
+def remember_category_jobs(sender, instance, **kwargs):
+    instance._search_job_ids = list(Jobs.objects.filter(category_id=instance.id).values_list("id", flat=True))
+
+
+@receiver(post_delete, sender=JobCategory)
+def reindex_jobs_on_category_delete(sender, instance, **kwargs):
+    transaction.on_commit(reset_query_dictionary)
+    job_ids = getattr(instance, "_search_job_ids", None)
+    if job_ids:
+        jobs = Jobs.objects.filter(id__in=job_ids)
+        jobs.update(category_name_nospace="")
+        # after commit: when the owner is deleted, the same delete may still remove these
+        # jobs, and grams written now would point at them
+        transaction.on_commit(lambda: _refresh_search(Jobs.objects.filter(id__in=job_ids)))
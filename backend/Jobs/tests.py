@@ -1,3 +1,812 @@
-from django.test import TestCase
+import io
+import os
+import shutil
+import tempfile
+import uuid
+from datetime import datetime, timedelta, timezone as dt_timezone
 
-# Create your tests here.
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from Accounts.models import CustomUser
+from Application.models import Application
+from EmployerProfile.models import EmployerProfile
+from Jobs.lifecycle import sweep
+from Jobs.models import JobCategory, Jobs, SearchLog
+from Jobs.search import get_backend, get_index, reset_index, reset_suggester, reset_vocabulary
+from Jobs.search.backends import SQLiteFTSBackend
+from Jobs.search.changes import poll_changes, reset_changes
+from Jobs.search.columns import JobColumns
+from Jobs.search.fuzzy import FuzzyMatcher, bounded_levenshtein
+from Jobs.search.gazetteer import get_gazetteer
+from Jobs.search.index import build_index
+from Jobs.search.pagination import InvalidCursor, decode_cursor, encode_cursor
+from Jobs.search.proximity import DEFAULT_RADIUS_KM, MAX_RADIUS_KM, ProximityMatrix, get_proximity, location_ranks
+from Jobs.search.query_parser import (
+    QueryDictionary, drop_category, get_query_dictionary, parse_query, parse_salary, reset_query_dictionary,
+)
+from Jobs.search.snapshot import load_snapshot_index, write_snapshot
+from Jobs.search.tokenizer import grams, query_grams, squash, syllables, words
+from Jobs.search.zawgyi import is_zawgyi, to_unicode
+from JobSeekerProfile.models import JobseekerProfile
+
+
+def reset_search():
+    reset_index()
+    reset_suggester()
+    reset_vocabulary()
+    reset_changes()
+
+
+class SearchTestCase(TestCase):
+    """An employer with a handful of jobs and fresh in-memory search structures."""
+
+    def setUp(self):
+        reset_search()
+        self.addCleanup(reset_search)
+        user = CustomUser.objects.create_user(email="e@example.com", password="pw", role="employer")
+        self.employer = EmployerProfile.objects.create(
+            user=user, first_name="A", last_name="B", business_name="Arakan Tech", city="Sittwe",
+        )
+        self.category = JobCategory.objects.create(name="Software Engineering", user=user)
+        self.seeker = CustomUser.objects.create_user(email="s@example.com", password="pw")
+        self.client = APIClient()
+        self.client.force_authenticate(self.seeker)
+
+    def make_job(self, title, description="", **fields):
+        fields.setdefault("location", "SIT")
+        fields.setdefault("category", self.category)
+        return Jobs.objects.create(employer=self.employer, title=title, description=description, **fields)
+
+
+# ---------- tokenizer ----------
+class TokenizerTests(TestCase):
+    def test_words_and_syllables(self):
+        self.assertEqual(syllables("မြန်မာစာ"), ["မြန်", "မာ", "စာ"])
+        self.assertEqual(words("Python  Developer, မြန်မာစာ!"), ["python", "developer", "မြန်", "မာ", "စာ"])
+        self.assertEqual(words("ျမန္မာ"), ["မြန်", "မာ"])   # Zawgyi input
+
+    def test_squash(self):
+        self.assertEqual(squash("  Python \n DEV  "), "pythondev")
+        self.assertEqual(squash("မြန်မာ စာ"), "မြန်မာစာ")
+        self.assertEqual(squash(""), "")
+
+    def test_grams(self):
+        self.assertEqual(grams("abcd"), {"abc", "bcd", "cd", "d"})
+        self.assertEqual(query_grams("python"), (["hon", "pyt", "tho", "yth"], False))
+        # shorter than a gram: looked up as a prefix
+        self.assertEqual(query_grams("py"), (["py"], True))
+        self.assertEqual(query_grams("!!"), ([], False))
+
+
+# ---------- zawgyi ----------
+class ZawgyiTests(TestCase):
+    def test_converts_zawgyi(self):
+        for zawgyi, unicode in (("ျမန္မာ", "မြန်မာ"), ("ေက်ာင္းဆရာ", "ကျောင်းဆရာ"), ("အလုပ္", "အလုပ်")):
+            self.assertTrue(is_zawgyi(zawgyi), zawgyi)
+            self.assertEqual(to_unicode(zawgyi), unicode)
+
+    def test_leaves_unicode_and_latin_alone(self):
+        for text in ("မြန်မာ", "ကျောင်းဆရာ", "Python Developer", ""):
+            self.assertFalse(is_zawgyi(text), text)
+            self.assertEqual(to_unicode(text), text)
+        self.assertEqual(to_unicode(None), "")
+
+
+@override_settings(JOB_SEARCH_BACKEND="memory")
+class ZawgyiSearchTests(SearchTestCase):
+    def test_zawgyi_job_found_in_unicode(self):
+        job = self.make_job("ေက်ာင္းဆရာ")
+        job.refresh_from_db()
+        self.assertEqual(job.title_normalized, "ကျောင်းဆရာ")
+        for q in ("ကျောင်းဆရာ", "ေက်ာင္းဆရာ"):
+            results = self.client.get("/job/search/", {"q": q}).json()["results"]
+            self.assertEqual([row["id"] for row in results], [str(job.id)], q)
+
+
+# ---------- townships ----------
+class GazetteerTests(TestCase):
+    def test_names_and_aliases(self):
+        gazetteer = get_gazetteer()
+        for name in ("SIT", "sit", "Sittwe", "စစ်တွေ", "Akyab", "SITTWAY"):
+            self.assertEqual(gazetteer.resolve(name), ("SIT", True), name)
+        self.assertEqual(gazetteer.resolve("mrauk-u"), ("MO", True))
+        self.assertEqual(gazetteer.label("SIT"), "SITTWE")
+
+    def test_prefixes_and_misspellings(self):
+        gazetteer = get_gazetteer()
+        self.assertEqual(gazetteer.resolve("mrau"), ("MO", True))
+        # Kyaukpyu and Kyauktaw share the prefix
+        self.assertEqual(gazetteer.resolve("kyauk"), (None, False))
+        self.assertEqual(gazetteer.resolve("Sitwee"), ("SIT", False))
+        for name in ("atlantis", "", "  -  "):
+            self.assertEqual(gazetteer.resolve(name), (None, False), name)
+
+
+class ProximityTests(TestCase):
+    def test_near_is_nearest_first(self):
+        near = get_proximity().near("SIT")
+        self.assertEqual([code for code, _ in near], ["SIT", "PT", "PNG", "RD", "MB"])
+        self.assertEqual(near[0], ("SIT", 0.0))
+        self.assertTrue(all(km <= DEFAULT_RADIUS_KM for _, km in near))
+        self.assertEqual(get_proximity().near("SIT", 0), [("SIT", 0.0)])
+
+    def test_matrix(self):
+        matrix = ProximityMatrix(["A", "B", "C"], {"A": (20.0, 93.0), "B": (21.0, 93.0)})
+        self.assertAlmostEqual(float(matrix.km[0, 1]), 111.2, places=1)   # one degree of latitude
+        self.assertEqual(float(matrix.km[1, 0]), float(matrix.km[0, 1]))
+        # a township without coordinates is only near itself
+        self.assertEqual(matrix.near("C", MAX_RADIUS_KM), [("C", 0.0)])
+        self.assertEqual(matrix.near("unknown"), [])
+
+    def test_location_ranks(self):
+        self.assertEqual(location_ranks(None), (None, False))
+        self.assertEqual(location_ranks("SIT"), ({"SIT": 0}, False))
+        self.assertEqual(location_ranks(["SIT", "PT"]), ({"SIT": 0, "PT": 1}, True))
+
+
+@override_settings(JOB_SEARCH_BACKEND="memory")
+class NearSearchTests(SearchTestCase):
+    def test_nearest_township_first(self):
+        far = self.make_job("Python Developer", location="MB")
+        here = self.make_job("Python Developer")
+        self.make_job("Python Developer", location="GW")
+        body = self.client.get("/job/search/", {"q": "python", "near": "Sittwe"}).json()
+        self.assertEqual([row["id"] for row in body["results"]], [str(here.id), str(far.id)])
+        self.assertEqual(body["near"][0], {"code": "SIT", "label": "SITTWE", "km": 0.0})
+
+    def test_bad_near(self):
+        for params in ({"near": "atlantis"}, {"near": "SIT", "radius": "far"}):
+            self.assertEqual(self.client.get("/job/search/", {"q": "python", **params}).status_code, 400)
+
+
+# ---------- cursors ----------
+class CursorTests(TestCase):
+    def test_round_trip(self):
+        key = {"k": [1.5, "2026-01-01T00:00:00+00:00", uuid.uuid4().hex], "t": 1700000000.0}
+        token = encode_cursor("memory", key)
+        self.assertEqual(decode_cursor(token, "memory"), key)
+
+    def test_tampered_token(self):
+        token = encode_cursor("memory", {"k": [1, 2, 3]})
+        for bad in ("garbage", token[:-3], encode_cursor("memory", {"t": 1})):
+            with self.assertRaises(InvalidCursor):
+                decode_cursor(bad, "memory")
+
+    def test_other_backend(self):
+        with self.assertRaises(InvalidCursor):
+            decode_cursor(encode_cursor("database", {"k": [1, 2, 3]}), "memory")
+
+
+@override_settings(JOB_SEARCH_BACKEND="memory")
+class CursorPagingTests(SearchTestCase):
+    def setUp(self):
+        super().setUp()
+        for i in range(7):
+            self.make_job(f"Developer {i}", "python work")
+
+    def walk(self, path, params, items):
+        seen, cursor = [], None
+        while True:
+            page = self.client.get(path, {**params, **({"cursor": cursor} if cursor else {})})
+            self.assertEqual(page.status_code, 200)
+            seen += [job["id"] for job in page.json()[items]]
+            cursor = page.json()["next"]
+            if not cursor:
+                return seen
+
+    def test_jobs_list_pages(self):
+        seen = self.walk("/job/jobs/", {"limit": 3}, "jobs")
+        everything = [job["id"] for job in self.client.get("/job/jobs/").json()["jobs"]]
+        self.assertEqual(len(everything), 7)
+        self.assertEqual(seen, everything)
+
+    def test_search_pages(self):
+        seen = self.walk("/job/search/", {"q": "developer", "limit": 2}, "results")
+        everything = [job["id"] for job in self.client.get("/job/search/", {"q": "developer"}).json()["results"]]
+        self.assertEqual(len(everything), 7)
+        self.assertEqual(seen, everything)
+
+    def test_tampered_cursors_are_rejected(self):
+        tampered = [
+            "garbage",
+            encode_cursor("jobs", {"k": ["x", 1.0, 1]}),
+            encode_cursor("jobs", {"k": [0, 1.0, -1]}),
+            encode_cursor("jobs", {"k": [0, 1.0]}),
+            encode_cursor("search", {"k": [0, 1.0, 1]}),
+        ]
+        for cursor in tampered:
+            response = self.client.get("/job/jobs/", {"limit": 2, "cursor": cursor})
+            self.assertEqual(response.status_code, 400, cursor)
+        tampered = [
+            "garbage",
+            encode_cursor("memory", {"k": ["x", 1, 1.0, "nope"], "t": 1.0}),
+            encode_cursor("memory", {"k": [1.0, 1, 1.0, uuid.uuid4().hex], "t": "later"}),
+            encode_cursor("memory", {"k": [1.0, 1, 1.0, uuid.uuid4().hex], "t": 1.0, "fix": {"q": 5}}),
+            encode_cursor("jobs", {"k": [0, 1.0, 1]}),
+        ]
+        for cursor in tampered:
+            response = self.client.get("/job/search/", {"q": "developer", "limit": 2, "cursor": cursor})
+            self.assertEqual(response.status_code, 400, cursor)
+
+
+class JobsListTests(SearchTestCase):
+    def setUp(self):
+        super().setUp()
+        self.live = self.make_job("Python Developer", "django")
+        self.closed = self.make_job("Accountant", is_active=False)
+
+    def test_fields_and_expand(self):
+        jobs = self.client.get("/job/jobs/", {"fields": "id,title,category.name", "expand": "category"}).json()["jobs"]
+        self.assertEqual(jobs, [{"id": str(self.live.id), "title": "Python Developer", "category": {"name": "Software Engineering"}}])
+        jobs = self.client.get("/job/jobs/", {"fields": "id,category"}).json()["jobs"]
+        self.assertEqual(jobs, [{"id": str(self.live.id), "category": str(self.category.id)}])
+
+    def test_reads_only_the_rendered_columns(self):
+        get_index()
+        poll_changes(force=True)   # the jobs logged by setUp, so the request below only reads the page
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get("/job/jobs/", {"fields": "id,title"})
+        [select] = [q["sql"] for q in queries if '"Jobs_jobs"' in q["sql"]]
+        self.assertNotIn("description", select)
+        self.assertNotIn("JOIN", select)
+
+    def test_whole_list_without_limit(self):
+        for i in range(40):
+            self.make_job(f"Clerk {i}")
+        body = self.client.get("/job/jobs/").json()
+        self.assertEqual((len(body["jobs"]), body["next"]), (41, None))
+        self.assertEqual(len(self.client.get("/job/jobs/", {"limit": 5}).json()["jobs"]), 5)
+        self.assertEqual(self.client.get("/job/jobs/", {"limit": "many"}).status_code, 400)
+
+    def test_employers_see_their_closed_jobs(self):
+        self.client.force_authenticate(self.employer.user)
+        ids = {job["id"] for job in self.client.get("/job/jobs/", {"fields": "id"}).json()["jobs"]}
+        self.assertEqual(ids, {str(self.live.id), str(self.closed.id)})
+
+
+class NullCreatedPagingTests(SearchTestCase):
+    def test_database_and_fulltext(self):
+        for backend in ("database", "fulltext"):
+            with self.subTest(backend=backend), self.settings(JOB_SEARCH_BACKEND=backend):
+                jobs = [self.make_job(f"Developer {backend} {i}", "python work") for i in range(4)]
+                Jobs.objects.filter(pk__in=[jobs[1].pk, jobs[2].pk]).update(created_at=None)
+                seen, cursor = [], None
+                while True:
+                    params = {"q": f"developer {backend}", "limit": 1, **({"cursor": cursor} if cursor else {})}
+                    page = self.client.get("/job/search/", params)
+                    self.assertEqual(page.status_code, 200)
+                    seen += [job["id"] for job in page.json()["results"]]
+                    cursor = page.json()["next"]
+                    if not cursor:
+                        break
+                self.assertEqual(len(seen), 4)
+                # newest first, the jobs without created_at last
+                self.assertEqual(seen[:2], [str(jobs[3].id), str(jobs[0].id)])
+                self.assertEqual(set(seen[2:]), {str(jobs[1].id), str(jobs[2].id)})
+
+
+# ---------- columns and ranking ----------
+class JobColumnsTests(TestCase):
+    def load(self, rows):
+        """rows of (location, created_at hour); returns the columns and the job ids in row order."""
+        columns, ids = JobColumns(), []
+        for location, hour in rows:
+            job_id = uuid.uuid4()
+            ids.append(job_id)
+            created = datetime(2026, 1, 1, hour, tzinfo=dt_timezone.utc)
+            columns.load([(job_id, True, None, location, "FULL", None, None, "NORMAL", None, created)])
+        return columns, ids
+
+    def test_page_is_newest_first(self):
+        columns, ids = self.load([("SIT", 1), ("MO", 3), ("SIT", 2)])
+        job_ids, next_key = columns.page(columns.mask(), None)
+        self.assertEqual(job_ids, [ids[1], ids[2], ids[0]])
+        self.assertIsNone(next_key)
+
+    def test_page_nearest_then_newest(self):
+        columns, ids = self.load([("SIT", 1), ("MO", 3), ("SIT", 2), ("KT", 4)])
+        job_ids, _ = columns.page(columns.mask(locations=["SIT", "MO"]), None, ranks={"SIT": 0, "MO": 1})
+        self.assertEqual(job_ids, [ids[2], ids[0], ids[1]])
+
+    def test_pages_join_up(self):
+        columns, ids = self.load([("SIT", hour % 3) for hour in range(10)])
+        mask = columns.mask()
+        everything, _ = columns.page(mask, None)
+        seen, after = [], None
+        while True:
+            job_ids, after = columns.page(mask, 3, after=after)
+            seen += job_ids
+            if after is None:
+                break
+        self.assertEqual(seen, everything)
+        self.assertEqual(sorted(seen), sorted(ids))
+
+    def test_filters(self):
+        columns, ids = self.load([("SIT", 1), ("MO", 2)])
+        self.assertEqual(columns.select(locations="MO"), [ids[1]])
+        columns.remove(ids[1])
+        self.assertEqual(columns.select(), [ids[0]])
+
+
+class IndexRankingTests(SearchTestCase):
+    def test_title_match_ranks_first(self):
+        body = self.make_job("Office Assistant", "some python scripting now and then")
+        title = self.make_job("Python Developer", "building web apps")
+        self.make_job("English Teacher", "part time teaching")
+        page = build_index().search("python")
+        self.assertEqual(page.ids, [title.id, body.id])
+        self.assertEqual(page.total, 2)
+
+    def test_priority_breaks_ties(self):
+        normal = self.make_job("Python Developer", "building web apps")
+        featured = self.make_job("Python Developer", "building web apps", priority="FEATURED")
+        self.assertEqual(build_index().search("python").ids, [featured.id, normal.id])
+
+    def test_inactive_and_expired_jobs_are_left_out(self):
+        live = self.make_job("Python Developer")
+        self.make_job("Python Developer", is_active=False)
+        self.make_job("Python Developer", deadline=timezone.localdate() - timedelta(days=1))
+        self.assertEqual(build_index().search("python").ids, [live.id])
+
+
+# ---------- full-text backend ----------
+@override_settings(JOB_SEARCH_BACKEND="fulltext")
+class SQLiteFTSBackendTests(SearchTestCase):
+    def setUp(self):
+        super().setUp()
+        self.backend = get_backend()
+
+    def test_title_ranks_above_description(self):
+        self.assertIsInstance(self.backend, SQLiteFTSBackend)
+        body = self.make_job("Office Assistant", "python scripting now and then")
+        title = self.make_job("Python Developer", "web apps")
+        self.make_job("English Teacher")
+        page = self.backend.search_jobs("pyth", total="exact")
+        self.assertEqual(page.ids, [title.id, body.id])
+        self.assertEqual(page.total, 2)
+        self.assertEqual(self.backend.search_jobs("python", filters={"job_type": "PART"}).ids, [])
+
+    def test_myanmar_phrase(self):
+        job = self.make_job("ဆရာ", "မြန်မာစာ သင်ကြားရန်")
+        self.assertEqual(self.backend.search_jobs("မြန်မာစာ").ids, [job.id])
+        self.assertEqual(self.backend.search_jobs("စာမြန်မာ").ids, [])
+
+    def test_writes_reach_the_index(self):
+        job = self.make_job("Python Developer")
+        job.title = "Accountant"
+        job.save()
+        self.assertEqual(self.backend.search_jobs("python").ids, [])
+        self.assertEqual(self.backend.search_jobs("accountant").ids, [job.id])
+        job.delete()
+        self.assertEqual(self.backend.search_jobs("accountant").ids, [])
+
+    def test_companies(self):
+        self.assertEqual(self.backend.search_companies("arakan"), [self.employer.id])
+        self.assertEqual(self.backend.search_companies("nowhere"), [])
+
+
+# ---------- snapshot ----------
+class SnapshotTests(SearchTestCase):
+    def setUp(self):
+        super().setUp()
+        self.path = os.path.join(tempfile.mkdtemp(), "index.snap")
+        self.addCleanup(shutil.rmtree, os.path.dirname(self.path))
+        self.jobs = [
+            self.make_job("Python Developer", "django", salary=400000, job_type="FULL"),
+            self.make_job("Python Teacher", "classes", location="MO", job_type="PART"),
+            self.make_job("Accountant", "python reports", salary=1500000),
+        ]
+
+    def snapshot(self):
+        index = build_index()
+        write_snapshot(index, self.path, timezone.now())
+        return index, load_snapshot_index(self.path)
+
+    def test_round_trip(self):
+        built, loaded = self.snapshot()
+        self.assertEqual(len(loaded), 3)
+        for q in ("python", "pyth", "accountant", "nothing"):
+            self.assertEqual(loaded.search(q, facets=True), built.search(q, facets=True), q)
+        facets = loaded.search("python", facets=True).facets
+        counts = {facet: {b["value"]: b["count"] for b in buckets if b["count"]} for facet, buckets in facets.items()}
+        self.assertEqual(counts["location"], {"SIT": 2, "MO": 1})
+        self.assertEqual(counts["salary"], {"300k-500k": 1, "1m+": 1})
+
+    def test_overlay_supersedes_the_base(self):
+        _, loaded = self.snapshot()
+        job = self.jobs[0]
+        job.title = "Senior Accountant"
+        job.save()
+        loaded.add(job)
+        loaded.remove(self.jobs[1].id)
+        self.assertEqual(loaded.search("python").ids, [self.jobs[2].id])
+        self.assertEqual(set(loaded.search("accountant").ids), {job.id, self.jobs[2].id})
+        self.assertEqual(len(loaded), 2)
+        location = loaded.search("accountant", facets=True).facets["location"]
+        self.assertEqual(sum(bucket["count"] for bucket in location), 2)
+
+    def test_catches_up_on_load(self):
+        self.snapshot()
+        self.make_job("Python Intern")
+        self.assertEqual(load_snapshot_index(self.path).search("python").total, 4)
+
+    def test_unusable_files(self):
+        self.assertIsNone(load_snapshot_index(self.path))
+        with open(self.path, "wb") as f:
+            f.write(b"not a snapshot at all, just some bytes")
+        with self.assertLogs("Jobs.search.snapshot", "WARNING"):
+            self.assertIsNone(load_snapshot_index(self.path))
+
+
+# ---------- database search ----------
+class DatabaseSearchTests(SearchTestCase):
+    def test_spaces_and_case_do_not_matter(self):
+        squashed = self.make_job("PythonDeveloper")
+        spaced = self.make_job("Senior Python  Developer")
+        self.make_job("Python Teacher")
+        found = set(Jobs.objects.search("python developer").values_list("id", flat=True))
+        self.assertEqual(found, {squashed.id, spaced.id})
+        self.assertEqual(Jobs.objects.search("PYTHONDEV").count(), 2)
+
+    def test_category_rename_reaches_its_jobs(self):
+        job = self.make_job("Clerk")
+        self.category.name = "Data Entry"
+        self.category.save()
+        self.assertEqual(list(Jobs.objects.search("dataentry").values_list("id", flat=True)), [job.id])
+        self.assertFalse(Jobs.objects.search("software").exists())
+
+
+# ---------- search endpoint ----------
+@override_settings(JOB_SEARCH_BACKEND="memory")
+class SearchEndpointTests(SearchTestCase):
+    def test_matches_and_location(self):
+        sittwe = self.make_job("Python Developer", "django")
+        self.make_job("Python Developer", location="MO")
+        self.make_job("Accountant")
+        body = self.client.get("/job/search/", {"q": "python", "loc": "sittwe", "total": "exact"}).json()
+        self.assertEqual([row["id"] for row in body["results"]], [str(sittwe.id)])
+        self.assertEqual(body["location"]["code"], "SIT")
+        self.assertEqual((body["total"], body["total_is_exact"]), (1, True))
+        self.assertEqual(body["results"][0]["title"], "Python Developer")
+
+    def test_bad_parameters(self):
+        for params in ({"limit": "ten"}, {"total": "all"}, {"cursor": "garbage"}):
+            response = self.client.get("/job/search/", {"q": "python", **params})
+            self.assertEqual(response.status_code, 400, params)
+        body = self.client.get("/job/search/", {"q": "python", "loc": "atlantis"}).json()
+        self.assertEqual(body, {"count": 0, "next": None, "results": []})
+
+    def test_needs_a_login(self):
+        self.client.force_authenticate(None)
+        self.assertIn(self.client.get("/job/search/", {"q": "python"}).status_code, (401, 403))
+
+
+# ---------- did you mean ----------
+class FuzzyMatcherTests(TestCase):
+    def test_closest(self):
+        matcher = FuzzyMatcher(["python", "teacher", "developer", "accountant"])
+        self.assertEqual(matcher.closest("pyhton"), "python")
+        self.assertEqual(matcher.closest("develper"), "developer")
+        self.assertEqual(matcher.closest("teachr"), "teacher")
+
+    def test_too_far_or_too_short(self):
+        matcher = FuzzyMatcher(["python", "go"])
+        self.assertIsNone(matcher.closest("pascal"))
+        self.assertIsNone(matcher.closest("ga"))   # short words must match exactly
+        self.assertEqual(bounded_levenshtein("kitten", "sitting", 3), 3)
+        self.assertIsNone(bounded_levenshtein("kitten", "sitting", 2))
+
+
+class DidYouMeanTests(SearchTestCase):
+    def test_corrected_search_on_every_backend(self):
+        jobs = [self.make_job("Python Developer", "django") for _ in range(3)]
+        for backend in ("memory", "database", "fulltext"):
+            with self.subTest(backend=backend), self.settings(JOB_SEARCH_BACKEND=backend):
+                reset_search()
+                if backend == "fulltext":
+                    call_command("rebuild_fulltext_index", stdout=io.StringIO())
+                body = self.client.get("/job/search/", {"q": "pyhton develper", "limit": 2}).json()
+                self.assertEqual(body["did_you_mean"], {"q": "python developer"})
+                # the next page keeps searching the corrected query
+                rest = self.client.get("/job/search/", {"q": "pyhton develper", "cursor": body["next"]}).json()
+                seen = {row["id"] for row in body["results"] + rest["results"]}
+                self.assertEqual(seen, {str(job.id) for job in jobs})
+
+    @override_settings(JOB_SEARCH_BACKEND="memory")
+    def test_nothing_close(self):
+        self.make_job("Python Developer")
+        body = self.client.get("/job/search/", {"q": "zzzzzz"}).json()
+        self.assertEqual((body["results"], "did_you_mean" in body), ([], False))
+
+
+# ---------- facets ----------
+class FacetTests(SearchTestCase):
+    def setUp(self):
+        super().setUp()
+        other = JobCategory.objects.create(name="Teaching", user=self.category.user)
+        self.make_job("Python Developer", salary=400000)
+        self.make_job("Python Developer", location="MO", job_type="PART", salary=1500000)
+        self.make_job("Python Teacher", category=other)
+        self.make_job("Accountant", salary=400000)
+        self.other = other
+
+    def counts(self, **params):
+        body = self.client.get("/job/search/", {"q": "python", **params}).json()
+        if "facets" not in body:
+            return None
+        return {facet: {b["value"]: b["count"] for b in buckets if b["count"]} for facet, buckets in body["facets"].items()}
+
+    def test_same_counts_on_every_backend(self):
+        expected = {
+            "location": {"SIT": 2, "MO": 1},
+            "job_type": {"FULL": 2, "PART": 1},
+            "category": {str(self.category.id): 2, str(self.other.id): 1},
+            "salary": {"300k-500k": 1, "1m+": 1},
+        }
+        for backend in ("memory", "database", "fulltext"):
+            with self.subTest(backend=backend), self.settings(JOB_SEARCH_BACKEND=backend):
+                reset_search()
+                if backend == "fulltext":
+                    call_command("rebuild_fulltext_index", stdout=io.StringIO())
+                self.assertEqual(self.counts(), expected)
+
+    @override_settings(JOB_SEARCH_BACKEND="memory")
+    def test_first_page_only(self):
+        body = self.client.get("/job/search/", {"q": "python", "limit": 1}).json()
+        category = body["facets"]["category"]
+        self.assertEqual(category[0], {"value": str(self.category.id), "label": "Software Engineering", "count": 2})
+        self.assertNotIn("facets", self.client.get("/job/search/", {"q": "python", "cursor": body["next"]}).json())
+        self.assertIsNone(self.counts(facets="false"))
+
+
+# ---------- suggestions ----------
+class SuggestTests(SearchTestCase):
+    def complete(self, q):
+        response = self.client.get("/job/suggest/", {"q": q})
+        self.assertEqual(response.status_code, 200)
+        return [(row["text"], row["type"], row["weight"]) for row in response.json()["suggestions"]]
+
+    def test_most_popular_first(self):
+        self.make_job("Python Developer")
+        self.make_job("Python  Developer")
+        self.make_job("Python Teacher")
+        self.assertEqual(self.complete("pyth"), [("Python Developer", "title", 2), ("Python Teacher", "title", 1)])
+        # from the start of a later word, space-insensitively
+        self.assertEqual(self.complete("dev")[0][0], "Python Developer")
+        self.assertEqual(self.complete("pythondev")[0][0], "Python Developer")
+        self.assertEqual(self.complete("arakan tech"), [("Arakan Tech", "employer", 3)])
+        self.assertEqual(self.complete("engineer"), [("Software Engineering", "category", 3)])
+
+    def test_writes_update_the_weights(self):
+        first = self.make_job("Web Developer")
+        second = self.make_job("Web Developer")
+        self.assertEqual(self.complete("webdev"), [("Web Developer", "title", 2)])
+        first.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            first.save()
+        self.assertEqual(self.complete("webdev"), [("Web Developer", "title", 1)])
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertEqual(self.complete("webdev"), [])
+        self.assertEqual(self.complete(""), [])
+
+
+# ---------- search log ----------
+@override_settings(JOB_SEARCH_BACKEND="memory")
+class SearchLogTests(SearchTestCase):
+    def setUp(self):
+        super().setUp()
+        for i in range(3):
+            self.make_job(f"Developer {i}")
+
+    @override_settings(JOB_SEARCH_LOG_RATE=1)
+    def test_first_pages_are_recorded(self):
+        page = self.client.get("/job/search/", {"q": "Developer", "limit": 2}).json()
+        self.client.get("/job/search/", {"q": "developer", "limit": 2, "cursor": page["next"]})
+        [log] = SearchLog.objects.all()
+        self.assertEqual((log.q, log.backend, log.params), ("developer", "memory", {"limit": "2"}))
+        self.assertEqual(log.result_ids, [job["id"] for job in page["results"]])
+
+    @override_settings(JOB_SEARCH_LOG_RATE=0)
+    def test_off(self):
+        self.client.get("/job/search/", {"q": "developer"})
+        self.assertFalse(SearchLog.objects.exists())
+
+
+# ---------- application slots ----------
+class ClaimApplicationSlotTests(SearchTestCase):
+    def test_last_slot_closes_the_job(self):
+        job = self.make_job("Python Developer", max_applicants=2)
+        self.assertTrue(Jobs.objects.claim_application_slot(job.id))
+        job.refresh_from_db()
+        self.assertTrue(job.is_active)
+        self.assertTrue(Jobs.objects.claim_application_slot(job.id, "P"))
+        job.refresh_from_db()
+        self.assertFalse(job.is_active)
+        self.assertEqual(job.application_count, 2)
+        self.assertFalse(Jobs.objects.claim_application_slot(job.id))
+        job.refresh_from_db()
+        self.assertEqual(job.application_count, 2)
+
+    def test_unlimited(self):
+        job = self.make_job("Python Developer")
+        for _ in range(5):
+            self.assertTrue(Jobs.objects.claim_application_slot(job.id))
+        job.refresh_from_db()
+        self.assertTrue(job.is_active)
+        self.assertEqual(job.application_count, 5)
+
+    def test_past_deadline(self):
+        job = self.make_job("Python Developer", deadline=timezone.localdate() - timedelta(days=1))
+        self.assertFalse(Jobs.objects.claim_application_slot(job.id))
+        job.refresh_from_db()
+        self.assertEqual(job.application_count, 0)
+
+
+# ---------- application counters ----------
+class ApplicationCounterTests(SearchTestCase):
+    def setUp(self):
+        super().setUp()
+        self.job = self.make_job("Python Developer")
+        self.profiles = [
+            JobseekerProfile.objects.create(user=CustomUser.objects.create_user(email=f"s{i}@example.com", password="pw"))
+            for i in range(3)
+        ]
+
+    def counters(self, job=None):
+        job = job or self.job
+        job.refresh_from_db()
+        return {field: getattr(job, field) for field in ("application_count", *Jobs.STATUS_COUNTERS.values())}
+
+    def test_signals_follow_every_write(self):
+        first, second = (Application.objects.create(job_seeker_profile=p, job=self.job) for p in self.profiles[:2])
+        self.assertEqual(self.counters()["pending_count"], 2)
+        first.status = "SL"
+        first.save()
+        second.delete()
+        self.assertEqual(self.counters(), {
+            "application_count": 1, "pending_count": 0, "review_count": 0, "shortlist_count": 1,
+            "rejected_count": 0, "hired_count": 0,
+        })
+        other = self.make_job("Accountant")
+        first.job = other
+        first.save()
+        self.assertEqual((self.counters()["application_count"], self.counters(other)["shortlist_count"]), (0, 1))
+
+    def test_reconcile_fixes_drift(self):
+        for profile in self.profiles:
+            Application.objects.create(job_seeker_profile=profile, job=self.job, status="H")
+        # writes that skip the signals
+        Application.objects.filter(job_seeker_profile=self.profiles[0]).update(status="RJ")
+        Jobs.objects.filter(pk=self.job.pk).update(application_count=7)
+        out = io.StringIO()
+        call_command("reconcile_application_counts", "--dry-run", stdout=out)
+        self.assertIn("1 job(s) drifted", out.getvalue())
+        self.assertEqual(self.counters()["application_count"], 7)
+        call_command("reconcile_application_counts", stdout=out)
+        self.assertEqual(self.counters(), {
+            "application_count": 3, "pending_count": 0, "review_count": 0, "shortlist_count": 0,
+            "rejected_count": 1, "hired_count": 2,
+        })
+        self.assertEqual(Jobs.objects.reconcile_application_counts(), {})
+
+
+# ---------- lifecycle ----------
+class SweepTests(SearchTestCase):
+    def test_expires_and_closes(self):
+        today = timezone.localdate()
+        self.make_job("Python Developer", deadline=today - timedelta(days=1))
+        last_day = self.make_job("Python Developer", deadline=today)
+        full = self.make_job("Python Developer", max_applicants=1)
+        open_job = self.make_job("Python Developer", max_applicants=2)
+        Jobs.objects.filter(pk__in=[full.pk, open_job.pk]).update(application_count=1)
+        self.assertIn(full.id, get_index().search("python").ids)
+
+        self.assertEqual(sweep(), {"expired": 1, "closed": 1})
+        active = set(Jobs.objects.filter(is_active=True).values_list("id", flat=True))
+        self.assertEqual(active, {last_day.id, open_job.id})
+        self.assertEqual(set(get_index().search("python").ids), active)
+        self.assertEqual(sweep(), {"expired": 0, "closed": 0})
+
+    def test_sweep_for_another_day(self):
+        job = self.make_job("Python Developer", deadline=timezone.localdate())
+        self.assertEqual(sweep(today=job.deadline + timedelta(days=1)), {"expired": 1, "closed": 0})
+
+
+# ---------- query understanding ----------
+class ParseSalaryTests(TestCase):
+    def bounds(self, text):
+        _, low, high, _ = parse_salary(text)
+        return low, high
+
+    def test_units(self):
+        self.assertEqual(self.bounds("teacher 3-5 lakh"), (3e5, 5e5))
+        self.assertEqual(self.bounds("1-2m"), (1e6, 2e6))
+        self.assertEqual(self.bounds("3 lakh - 5"), (3e5, 5e5))
+        self.assertEqual(self.bounds("above 500k"), (5e5, None))
+        self.assertEqual(self.bounds("under ၅ သိန်း"), (None, 5e5))
+
+    def test_full_amount_keeps_its_value(self):
+        self.assertEqual(self.bounds("500000-1m"), (5e5, 1e6))
+        self.assertEqual(self.bounds("300000 to 1m"), (3e5, 1e6))
+        self.assertEqual(self.bounds("1,000,000 to 2m"), (1e6, 2e6))
+
+    def test_reversed_range_is_not_a_salary(self):
+        self.assertEqual(parse_salary("5-3 lakh"), ("5-3 lakh", None, None, None))
+        self.assertEqual(self.bounds("2m - 500000"), (None, None))
+
+    def test_bare_numbers(self):
+        self.assertEqual(self.bounds("cashier 300000"), (3e5, None))
+        self.assertEqual(self.bounds("grade 5 teacher"), (None, None))
+
+
+class ParseQueryTests(TestCase):
+    def setUp(self):
+        self.dictionary = QueryDictionary(
+            Jobs.JOB_TYPE_CHOICES, get_gazetteer().names, [("teaching-id", "Teaching"), ("sales-id", "Sales")],
+        )
+
+    def test_job_type_township_and_salary(self):
+        parsed = parse_query("part time teacher in sittwe 3-5 lakh", self.dictionary)
+        self.assertEqual(parsed.text, "teacher")
+        self.assertEqual(parsed.filters, {"job_type": "PART", "salary_min": 3e5, "salary_max": 5e5})
+        self.assertEqual(parsed.location, "SIT")
+        self.assertEqual([entry["type"] for entry in parsed.understood], ["salary", "job_type", "location"])
+
+    def test_online_is_not_remote(self):
+        parsed = parse_query("online marketing", self.dictionary)
+        self.assertEqual((parsed.text, parsed.filters, parsed.understood), ("online marketing", {}, []))
+        self.assertEqual(parse_query("remote marketing", self.dictionary).filters, {"job_type": "REMOTE"})
+
+    def test_category_words_stay_in_the_text(self):
+        parsed = parse_query("english teaching", self.dictionary)
+        self.assertEqual(parsed.text, "english teaching")
+        self.assertEqual(parsed.filters, {"category": ["teaching-id"]})
+        dropped = drop_category(parsed)
+        self.assertEqual((dropped.text, dropped.filters, dropped.understood), ("english teaching", {}, []))
+
+    def test_short_words_and_townships_off(self):
+        parsed = parse_query("it jobs sittwe", self.dictionary, locations=False)
+        self.assertEqual((parsed.text, parsed.filters, parsed.location), ("it jobs sittwe", {}, None))
+
+
+@override_settings(JOB_SEARCH_BACKEND="memory", JOB_SEARCH_SYNC_INTERVAL=0)
+class SearchQueryUnderstandingTests(SearchTestCase):
+    def setUp(self):
+        super().setUp()
+        reset_query_dictionary()
+        self.addCleanup(reset_query_dictionary)
+
+    def search(self, **params):
+        response = self.client.get("/job/search/", params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_category_narrows(self):
+        teaching = JobCategory.objects.create(name="Teaching", user=self.employer.user)
+        in_category = self.make_job("English Teacher", category=teaching)
+        self.make_job("Software Engineering Teaching Assistant")
+        body = self.search(q="teaching")
+        self.assertEqual([job["id"] for job in body["results"]], [str(in_category.id)])
+        self.assertEqual(body["query"]["filters"], {"category": [str(teaching.id)]})
+
+    def test_empty_category_falls_back_to_the_text(self):
+        JobCategory.objects.create(name="Teaching", user=self.employer.user)
+        job = self.make_job("Teaching Assistant")
+        body = self.search(q="teaching", limit=1)
+        self.assertEqual([row["id"] for row in body["results"]], [str(job.id)])
+        self.assertEqual(body["did_you_mean"], {"category": "any"})
+        self.assertNotIn("query", body)
+
+    def test_categories_of_other_processes(self):
+        get_query_dictionary()
+        # written without signals, as another worker's write looks to this one
+        JobCategory.objects.bulk_create([JobCategory(name="Nursing", name_normalized="nursing")])
+        self.assertEqual(parse_query("nursing", get_query_dictionary()).filters["category"], [
+            str(JobCategory.objects.get(name="Nursing").id),
+        ])
@@ -19,6 +19,7 @@ urlpatterns = [
 
     #search
     path('search/',views.search,name="search-list"),
+    path('suggest/',views.suggest,name="suggest"),
 
     #quick search
     path('quick-search-city/',views.quick_search_by_location,name="quick-search"),
@@ -1,23 +1,26 @@
 
-from django.shortcuts import render
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import BasePermission,IsAuthenticated,AllowAny
 from rest_framework.response import Response
 from django.utils import timezone
-from django.db.models import Q,F, Case, When, Value, IntegerField
-from django.db.models import Count
-from datetime import date
+import math
+import random
+import time
+from django.conf import settings
 from django.db import IntegrityError
-from django.db.models import (
-    Q, F, Value, Func, Case, When, IntegerField, CharField
-)
 
-# import Application
-from Application.models import Application
-from .models import JobCategory, Jobs
+from .models import JobCategory, Jobs, SearchLog
 from .serializers import JobCategorySerializer, JobsSerializer
+from .search import get_backend, get_index, get_suggester
+from .search.gazetteer import get_gazetteer
+from .search.proximity import DEFAULT_RADIUS_KM, MAX_RADIUS_KM, get_proximity
+from .search.query_parser import drop_category, get_query_dictionary, parse_query
+from .search.pagination import InvalidCursor, decode_cursor, encode_cursor
+from .search.tokenizer import normalize
+from .search.zawgyi import to_unicode
 from EmployerProfile.models import EmployerProfile
+from JobSeeker.listing import ListParamError, list_params, list_queryset
 from django.shortcuts import get_object_or_404
 
 # Create your views here.
@@ -107,25 +110,101 @@ def job_category_delete(request, pk):
         category.delete()
     return Response({'message': 'Category deleted'}, status=status.HTTP_204_NO_CONTENT)
 
+def _near(request):
+    """
+    ?near=<code or town name>&radius=<km>: townships in range, nearest first,
+    as ([{"code", "label", "km"}], None), or (None, error message). ([], None) without near.
+    """
+    near = to_unicode(request.GET.get("near") or "").strip()
+    if not near:
+        return [], None
+    try:
+        radius = min(float(request.GET.get("radius") or DEFAULT_RADIUS_KM), MAX_RADIUS_KM)
+    except ValueError:
+        return None, "radius must be a number of kilometres"
+    code, _ = get_gazetteer().resolve(near)
+    if not code:
+        return None, "Unknown township for near"
+    return [
+        {"code": c, "label": get_gazetteer().label(c), "km": km}
+        for c, km in get_proximity().near(code, radius)
+    ], None
+
+
+def _hydrate(job_ids, fields=None, expand=None):
+    """
+    Jobs rows for ids from the in-memory columns, in the same order, with one
+    in_bulk query reading only the columns JobsSerializer(fields, expand) renders.
+    """
+    jobs = list_queryset(Jobs.objects.all(), JobsSerializer, fields, expand).in_bulk(job_ids)
+    return [jobs[job_id] for job_id in job_ids if job_id in jobs]
+
+
+def _is_columns_key(key):
+    """True for a JobColumns.page() key: [location rank, created_at, id_key]."""
+    if not (isinstance(key, list) and len(key) == 3) or any(isinstance(v, bool) for v in key):
+        return False
+    rank, created, id_key = key
+    return (
+        isinstance(rank, int) and 0 <= rank < 2 ** 31
+        and isinstance(created, (int, float)) and math.isfinite(created)
+        and isinstance(id_key, int) and 0 <= id_key < 2 ** 64
+    )
+
+
+def _jobs_page(request, name, filters, ranks=None):
+    """
+    One keyset page (?limit, ?cursor) of the jobs selected by filters
+    (JobColumns.mask() arguments) on the search index's columns, rendered with
+    ?fields / ?expand: ({"jobs", "next"}, None) or (None, error message).
+    name scopes the cursor to the endpoint.
+    """
+    try:
+        fields, expand, limit = list_params(request)
+        after = None
+        if request.GET.get("cursor"):
+            after = decode_cursor(request.GET["cursor"], name)["k"]
+            if not _is_columns_key(after):
+                raise InvalidCursor("Malformed cursor.")
+    except (ListParamError, InvalidCursor) as e:
+        return None, str(e)
+    job_ids, next_key = get_index().browse(limit, ranks, after, **filters)
+    serializer = JobsSerializer(_hydrate(job_ids, fields, expand), many=True, fields=fields, expand=expand)
+    return {
+        "jobs": serializer.data,
+        "next": encode_cursor(name, {"k": next_key}) if next_key else None,
+    }, None
+
+
 # jobs list
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def jobs_list(request):
-    today = date.today()
+    today = timezone.localdate()
     user = request.user
-    Jobs.objects.filter(is_active=True, deadline__lt=today).update(is_active=False)
+    near, error = _near(request)
+    if error:
+        return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+    # a pure read: expired jobs are deactivated by the lifecycle sweeper (Jobs/lifecycle.py)
+    # and the public list also checks the deadline itself.
+    # Filtered and paged (newest first; nearest township first with near) on the
+    # search index's columns, then hydrated by id
+    ranks = {town["code"]: rank for rank, town in enumerate(near)} if near else None
+    locations = list(ranks) if near else None
     if user.is_staff:  
         # Admin → All jobs
-        jobs = Jobs.objects.all().order_by('-created_at')
+        filters = {"live": False, "locations": locations}
     elif hasattr(user, "employerprofile"):
         # Employer → Only their own jobs
-        jobs = Jobs.objects.filter(employer__user=user).order_by('-created_at')
+        filters = {"live": False, "employers": [user.employerprofile.id], "locations": locations}
     else:  
-        jobs = Jobs.objects.filter(is_active=True).order_by('-created_at')
-    serializer = JobsSerializer(jobs, many=True)
-    return Response({
-        "jobs":serializer.data,
-    }, status=status.HTTP_200_OK)
+        filters = {"today": today, "locations": locations}
+    body, error = _jobs_page(request, "jobs", filters, ranks)
+    if error:
+        return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+    if near:
+        body["near"] = near
+    return Response(body, status=status.HTTP_200_OK)
 
 # jobs create
 @api_view(['POST'])
@@ -185,7 +264,7 @@ def jobs_update(request, pk):
     # ------------------------------------------
     # 🔥 AUTO REACTIVATE JOB IF MAX APPLICANTS INCREASED
     # ------------------------------------------
-    total_apps = updated_job.applications.count()
+    total_apps = updated_job.application_count
 
     # If the new max is higher AND job is inactive → reactivate
     if updated_job.max_applicants and total_apps < updated_job.max_applicants:
@@ -209,84 +288,173 @@ def jobs_delete(request, pk):
     return Response({'message': 'Job deleted'}, status=status.HTTP_204_NO_CONTENT)
 
 
-@api_view(['GET'])
-@permission_classes([IsAuthenticated])
-def search(request):
-    q = (request.GET.get("q") or "").strip()
-    loc = (request.GET.get("loc") or "").strip()
-    today = date.today()
-
-    # Not expired filter
-    not_expired = Q(deadline__isnull=True) | Q(deadline__gte=today)
-
-    # Base queryset
-    qs = Jobs.objects.filter(is_active=True).filter(not_expired)
-
-    # Ensure employer is joined
-    qs = qs.select_related("employer")
-
-    normalized_q = q.replace(" ", "")
-    normalized_loc = loc.replace(" ", "")
-
-    # Annotate everything we need
-    qs = qs.annotate(
-        title_nospace=Func(F("title"), Value(" "), Value(""), function="REPLACE", output_field=CharField()),
-        location_nospace=Func(F("location"), Value(" "), Value(""), function="REPLACE", output_field=CharField()),
-        category_name=F("category__name"),
-        category_name_nospace=Func(F("category__name"), Value(" "), Value(""), function="REPLACE", output_field=CharField()),
-        description_nospace=Func(F("description"), Value(" "), Value(""), function="REPLACE", output_field=CharField()),
-
-        # ✔️ Annotated employer business name
-        employer_business_name=F("employer__business_name"),
+def _search_row(job):
+    return {
+        "id": job.id,
+        "title": job.title,
+        "location": job.location,
+        "category_name": job.category.name if job.category else None,
+        "employer_business_name": job.employer.business_name if job.employer else None,
+        "description": job.description,
+        "deadline": job.deadline,
+        "created_at": job.created_at,
+        "priority": job.priority,
+    }
+
+
+# request parameters kept with a logged search, besides q and loc
+_LOGGED_PARAMS = ("near", "radius", "limit", "total", "facets", "parse")
+
+
+def _log_search(request, backend, results, started):
+    """Record a first-page search in SearchLog (sampled) for `manage.py bench_search` replays."""
+    rate = settings.JOB_SEARCH_LOG_RATE
+    if rate <= 0 or (rate < 1 and random.random() >= rate):
+        return
+    SearchLog.objects.create(
+        q=" ".join(normalize(request.GET.get("q") or "").split())[:200],
+        loc=(request.GET.get("loc") or "").strip()[:100],
+        params={key: request.GET[key] for key in _LOGGED_PARAMS if request.GET.get(key)},
+        backend=backend.name,
+        result_ids=[str(row["id"]) for row in results],
+        latency_ms=(time.perf_counter() - started) * 1000,
     )
 
-    if q:
-        qs = qs.filter(
-            Q(title__icontains=q) |
-            Q(location__icontains=q) |
-            Q(category__name__icontains=q) |
-            Q(description__icontains=q) |
-            Q(title_nospace__icontains=normalized_q) |
-            Q(location_nospace__icontains=normalized_q) |
-            Q(category_name_nospace__icontains=normalized_q) |
-            Q(description_nospace__icontains=normalized_q)
-        )
-
-    if loc:
-        qs = qs.filter(
-            Q(location__icontains=loc) |
-            Q(location_nospace__icontains=normalized_loc)
-        )
 
-    qs = qs.annotate(
-        priority_rank=Case(
-            When(priority="FEATURED", then=Value(3)),
-            When(priority="URGENT", then=Value(2)),
-            default=Value(1),
-            output_field=IntegerField(),
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def search(request):
+    started = time.perf_counter()
+    q = to_unicode(request.GET.get("q") or "").strip()
+    loc = to_unicode(request.GET.get("loc") or "").strip()
+    total = request.GET.get("total") or None   # "exact" | "estimate"
+    try:
+        limit = min(max(int(request.GET.get("limit") or 30), 1), 100)
+    except ValueError:
+        return Response({"error": "limit must be a number"}, status=status.HTTP_400_BAD_REQUEST)
+    if total not in (None, "exact", "estimate"):
+        return Response({"error": "total must be 'exact' or 'estimate'"}, status=status.HTTP_400_BAD_REQUEST)
+
+    # Next pages continue after the last hit of the previous one (no OFFSET)
+    backend = get_backend()
+    after = None
+    if request.GET.get("cursor"):
+        try:
+            after = decode_cursor(request.GET["cursor"], backend.name)
+        except InvalidCursor as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    # near: townships within radius, nearest first; takes the place of loc
+    near, error = _near(request)
+    if error:
+        return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+
+    # loc: code, English / Burmese name or misspelling -> exactly one township code
+    fix = {}
+    location = None
+    if loc and not near:
+        code, exact = get_gazetteer().resolve(loc)
+        if not code:
+            return Response({"count": 0, "next": None, "results": []}, status=status.HTTP_200_OK)
+        location = {"code": code, "label": get_gazetteer().label(code)}
+        if not exact:
+            fix["loc"] = code
+
+    # "part time teacher sittwe 3-5 lakh" -> job type / township / salary filters + "teacher";
+    # a township named in q only counts when neither loc nor near was given
+    parsed = None
+    filters = {}
+    understood = []
+    if q and request.GET.get("parse", "true").lower() not in ("0", "false"):
+        parsed = parse_query(q, get_query_dictionary(), locations=not (loc or near))
+        q, filters, understood = parsed.text, parsed.filters, parsed.understood
+        if parsed.location:
+            location = {"code": parsed.location, "label": get_gazetteer().label(parsed.location)}
+
+    loc = location["code"] if location else None
+    if near:
+        loc = [town["code"] for town in near]
+    if after:
+        try:
+            backend.check_cursor(after, loc)
+        except InvalidCursor as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    # a cursor from a corrected search keeps searching the corrected query
+    if after and after.get("fix"):
+        fix = after["fix"]
+    q = fix.get("q", q)
+    if "category" in fix and parsed:
+        parsed = drop_category(parsed)
+        filters, understood = parsed.filters, parsed.understood
+
+    # facet counts cover the whole match set, so only the first page carries them
+    want_facets = after is None and request.GET.get("facets", "true").lower() not in ("0", "false")
+    page = backend.search_jobs(q, loc, limit=limit, after=after, total=total, facets=want_facets, filters=filters)
+
+    # Nothing in the category named in q: the category words are still in the text, match on them alone
+    if not page.ids and after is None and "category" in filters:
+        fix["category"] = "any"
+        parsed = drop_category(parsed)
+        filters, understood = parsed.filters, parsed.understood
+        page = backend.search_jobs(q, loc, limit=limit, total=total, facets=want_facets, filters=filters)
+
+    # Nothing found: retry once with misspelled words corrected
+    if not page.ids and after is None and q:
+        corrected = backend.correct_query(q)
+        if corrected:
+            fix["q"] = q = corrected
+            page = backend.search_jobs(q, loc, limit=limit, total=total, facets=want_facets, filters=filters)
+    next_key = page.next_key
+    if next_key and fix:
+        next_key = {**next_key, "fix": fix}
+    job_ids = page.ids
+
+    # Hydrate the ranked ids with one in_bulk query
+    jobs = (
+        Jobs.objects.select_related("category", "employer")
+        .only(
+            "id", "title", "location", "description", "deadline", "created_at", "priority",
+            "category__name", "employer__business_name",
         )
-    ).order_by("-priority_rank", "-created_at")
-
-    # 🚨 FIXED: Use employer_business_name not employer__business_name
-    data = list(
-        qs.values(
-            "id",
-            "title",
-            "location",
-            "category_name",
-            "employer_business_name",  # ← THE KEY FIX
-            "description",
-            "deadline",
-            "created_at",
-            "priority"
-        )[:30]
+        .in_bulk(job_ids)
     )
+    data = [_search_row(jobs[job_id]) for job_id in job_ids if job_id in jobs]
+    if after is None:
+        _log_search(request, backend, data, started)
 
-    return Response({
+    body = {
         "count": len(data),
+        "next": encode_cursor(backend.name, next_key) if next_key else None,
         "results": data
-    }, status=status.HTTP_200_OK)
-
+    }
+    if location:
+        body["location"] = location
+    if near:
+        body["near"] = near
+    if understood:
+        body["query"] = {"text": q, "filters": filters, "understood": understood}
+    if fix:
+        body["did_you_mean"] = fix
+    if total:
+        body["total"] = page.total
+        body["total_is_exact"] = page.total_exact
+    if page.facets is not None:
+        body["facets"] = page.facets
+    return Response(body, status=status.HTTP_200_OK)
+
+
+
+# typeahead: one call per keystroke, answered from the in-memory suggester
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def suggest(request):
+    q = to_unicode(request.GET.get("q") or "").strip()
+    try:
+        limit = min(max(int(request.GET.get("limit") or 10), 1), 10)
+    except ValueError:
+        return Response({"error": "limit must be a number"}, status=status.HTTP_400_BAD_REQUEST)
+    return Response({"suggestions": get_suggester().complete(q, limit)}, status=status.HTTP_200_OK)
 
 
 #quck search 
@@ -294,18 +462,32 @@ def search(request):
 @permission_classes([IsAuthenticated])
 def quick_search_by_location(request):
    location=request.GET.get("city_name")
-   jobs=Jobs.objects.quick_search_by_city(location)
-   serializer=JobsSerializer(jobs,many=True)
-   return Response({"jobs":serializer.data},status=status.HTTP_200_OK)
+   # code, English / Burmese name or misspelling -> one township code; live jobs there from the columns
+   code, exact = get_gazetteer().resolve(location) if location else (None, True)
+   # an unknown township ([None]) matches nothing
+   body,error=_jobs_page(request,"jobs-by-location",{"locations":[code] if location else None})
+   if error:
+      return Response({"error":error},status=status.HTTP_400_BAD_REQUEST)
+   # "Sitwe" -> searched as SITTWE; tell the client what we understood
+   if code and not exact:
+      body["did_you_mean"] = get_gazetteer().label(code)
+   return Response(body,status=status.HTTP_200_OK)
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def quick_search_by_category(request):
    category=request.GET.get("category")
-   jobs=Jobs.objects.quick_search_by_category(category)
-   serializer=JobsSerializer(jobs,many=True)
-   return Response({"jobs":serializer.data},status=status.HTTP_200_OK)
+   # the name match runs on the small category table; the jobs come from the columns
+   categories=None
+   if category:
+      categories=list(
+         JobCategory.objects.filter(name_normalized__icontains=to_unicode(category)).values_list("id",flat=True)
+      )
+   body,error=_jobs_page(request,"jobs-by-category",{"categories":categories})
+   if error:
+      return Response({"error":error},status=status.HTTP_400_BAD_REQUEST)
+   return Response(body,status=status.HTTP_200_OK)
         
 
 
@@ -1,6 +1,6 @@
 # notifications/admin.py
 from django.contrib import admin
-from .models import Notification
+from .models import EmailOutbox, Notification
 
 @admin.register(Notification)
 class NotificationAdmin(admin.ModelAdmin):
@@ -10,6 +10,21 @@ class NotificationAdmin(admin.ModelAdmin):
     ordering = ('-created_at',)
 
 
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'to', 'kind', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status', 'kind')
+    search_fields = ('subject', 'last_error')
+    ordering = ('-created_at',)
+    actions = ('requeue',)
+
+    @admin.action(description="Send dead messages again")
+    def requeue(self, request, queryset):
+        # only dead ones: sent mail (OTPs, links) is never sent twice
+        count = EmailOutbox.objects.requeue(queryset)
+        self.message_user(request, f"{count} dead message(s) queued again.")
+
+
 
 
 
@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class NotificationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'Notification'
+
+    def ready(self):
+        from django.conf import settings
+
+        if getattr(settings, "EMAIL_OUTBOX_WORKER_INTERVAL", 0) > 0:
+            from .outbox import start_mail_worker
+            start_mail_worker(settings.EMAIL_OUTBOX_WORKER_INTERVAL)
@@ -0,0 +1,171 @@
+# Notification/emails.py
+"""
+Precompiled email rendering. The transactional emails (templates/emails/) are
+mostly static HTML around a handful of per-recipient values, so each template
+is rendered through Django once per process, with a sentinel in place of every
+per-recipient variable, and split at the sentinels into static parts and
+variable slots. render_email() then only joins the cached parts with the
+escaped values. The plain-text alternative comes from the same compiled form:
+the sentinel HTML is converted to text once and split the same way.
+
+Variables a template uses in tags or filters (e.g. {% if status_label == ... %})
+cannot be spliced; pass their names as `keyed` and one form is compiled per
+distinct value. compile_email() refuses templates where a spliced variable
+does more than being printed.
+"""
+import re
+import threading
+from html import escape
+from html.parser import HTMLParser
+
+from django.core.exceptions import ImproperlyConfigured
+from django.template.base import Node, TextNode, VariableNode
+from django.template.loader import get_template, render_to_string
+from django.utils.formats import localize
+from django.utils.safestring import SafeData
+
+# private-use characters: autoescape, the HTML parser and the templates leave them alone
+_SENTINEL = "\ue000{}\ue001"
+_SENTINEL_RE = re.compile("\ue000(\\d+)\ue001")
+
+
+class _TextConverter(HTMLParser):
+    """HTML -> readable plain text: block elements end lines, links keep their URL."""
+
+    BLOCKS = {"p", "div", "br", "tr", "li", "h1", "h2", "h3", "h4", "h5", "h6", "table", "hr"}
+    SKIP = {"head", "style", "script", "title"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.out = []
+        self.skipping = 0
+        self.links = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP:
+            self.skipping += 1
+        elif tag in self.BLOCKS:
+            self.out.append("\n")
+        elif tag == "a":
+            self.links.append((dict(attrs).get("href") or "", len(self.out)))
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP:
+            self.skipping = max(0, self.skipping - 1)
+        elif tag in self.BLOCKS:
+            self.out.append("\n")
+        elif tag == "a" and self.links:
+            href, start = self.links.pop()
+            label = " ".join("".join(self.out[start:]).split())
+            if href and href != label:
+                self.out.append(f": {href}" if label else href)
+
+    def handle_data(self, data):
+        if not self.skipping:
+            self.out.append(data)
+
+    def text(self):
+        lines = (" ".join(line.split()) for line in "".join(self.out).split("\n"))
+        return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip() + "\n"
+
+
+def html_to_text(html):
+    converter = _TextConverter()
+    converter.feed(html)
+    converter.close()
+    return converter.text()
+
+
+class CompiledEmail:
+    """One template (and one value of its keyed variables), split at its per-recipient variables."""
+
+    def __init__(self, template_name, names, keyed_context):
+        self.template_name = template_name
+        self.names = tuple(names)
+        self._check_spliceable()
+        sentinels = {name: _SENTINEL.format(i) for i, name in enumerate(self.names)}
+        html = render_to_string(template_name, {**keyed_context, **sentinels})
+        self.html_parts = self._split(html)
+        self.text_parts = self._split(html_to_text(html))
+        # and rendering the spliced variables empty has to give exactly the static parts
+        blank = render_to_string(template_name, {**keyed_context, **{name: "" for name in self.names}})
+        if blank != "".join(part for part in self.html_parts if isinstance(part, str)):
+            raise ImproperlyConfigured(
+                f"{template_name} uses one of {sorted(self.names)} in a tag or filter; "
+                "pass it in `keyed` so it is compiled per value."
+            )
+
+    def _check_spliceable(self):
+        """Spliced variables may only be printed as they are: not in tags, not through filters."""
+        names = set(self.names)
+        for node in get_template(self.template_name).template.nodelist.get_nodes_by_type(Node):
+            if isinstance(node, TextNode):
+                continue
+            if isinstance(node, VariableNode) and not node.filter_expression.filters:
+                continue
+            used = names & set(re.findall(r"[A-Za-z_]\w*", node.token.contents if node.token else ""))
+            if used:
+                raise ImproperlyConfigured(
+                    f"{self.template_name} uses {sorted(used)} in "
+                    f"{{% {node.token.contents} %}}; pass it in `keyed` so it is compiled per value."
+                )
+
+    def _split(self, rendered):
+        """static strings and variable indexes, alternating: ["<p>Hello ", 0, ",</p>..."]"""
+        parts = []
+        for i, piece in enumerate(_SENTINEL_RE.split(rendered)):
+            parts.append(int(piece) if i % 2 else piece)
+        return parts
+
+    @staticmethod
+    def _splice(parts, values):
+        out = [parts[0]]
+        for i in range(1, len(parts), 2):
+            out.append(values[parts[i]])
+            out.append(parts[i + 1])
+        return "".join(out)
+
+    def render(self, context):
+        """(html, text) with the values of context spliced in (escaped in the HTML)."""
+        values = [
+            value if isinstance(value, str) else str(localize(value))
+            for value in (context.get(name, "") for name in self.names)
+        ]
+        # what autoescape does (django.utils.html.conditional_escape), minus the lazy-string wrapper
+        html = self._splice(
+            self.html_parts, [value if isinstance(value, SafeData) else escape(value) for value in values],
+        )
+        return html, self._splice(self.text_parts, values)
+
+
+# ---------- process-wide cache of compiled templates ----------
+_compiled = {}
+_compiled_lock = threading.Lock()
+
+
+def compile_email(template_name, names, keyed_context=None):
+    keyed_context = keyed_context or {}
+    key = (template_name, tuple(sorted(names)), tuple(sorted(keyed_context.items())))
+    compiled = _compiled.get(key)
+    if compiled is None:
+        with _compiled_lock:
+            compiled = _compiled.get(key)
+            if compiled is None:
+                compiled = _compiled[key] = CompiledEmail(template_name, sorted(names), keyed_context)
+    return compiled
+
+
+def reset_email_templates():
+    """Forget the compiled forms (after editing a template)."""
+    with _compiled_lock:
+        _compiled.clear()
+
+
+def render_email(template_name, context, keyed=()):
+    """
+    (html, text) of an email template for context. Variables named in `keyed`
+    select the compiled form; all others are spliced in per call.
+    """
+    keyed_context = {name: context.get(name) for name in keyed}
+    names = [name for name in context if name not in keyed_context]
+    return compile_email(template_name, names, keyed_context).render(context)
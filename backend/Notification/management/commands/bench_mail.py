@@ -0,0 +1,165 @@
+# Notification/management/commands/bench_mail.py
+"""
+Measure mail transport throughput in messages per second against the stand-in
+SMTP server (Notification/smtp_sink.py) or, with --smtp-host, an existing
+server such as a local mail catcher. Modes:
+
+  per-message     a new SMTP session per message (EmailMultiAlternatives.send())
+  one-connection  one session, messages one after the other
+  pool            SMTPPool: --pool-size sessions, sent concurrently
+
+--render times building the messages instead: render_to_string() against the
+precompiled templates of Notification/emails.py (which also give the text part).
+"""
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.template.loader import render_to_string
+from django.test.utils import override_settings
+
+from Notification.emails import render_email
+
+from Notification.outbox import _send_sequentially
+from Notification.smtp_pool import SMTP_BACKEND, SMTPPool
+from Notification.smtp_sink import SMTPSink
+
+MODES = ("per-message", "one-connection", "pool")
+
+# (template, context, keyed variables) of the transactional emails
+RENDER_CASES = [
+    ("emails/otp_verification.html", {"username": "mgmg", "otp_code": "123456", "year": 2026}, ()),
+    ("emails/employer_email_verify.html", {"email": "hr@example.com", "verify_url": "https://example.com/verify/abc/", "year": 2026}, ()),
+    (
+        "emails/application_status_update.html",
+        {
+            "username": "Mg Mg", "job_title": "Python Developer", "status_label": "ShortList", "status_class": "shortlist",
+            "application_link": "https://example.com/job-search/applications/1", "year": 2026,
+        },
+        ("status_label",),
+    ),
+]
+
+
+class Command(BaseCommand):
+    help = "Throughput (messages/s) of per-message SMTP sessions vs one session vs the SMTP pool."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--messages", type=int, default=500, help="messages per mode (default 500)")
+        parser.add_argument("--modes", default=",".join(MODES), help=f"comma-separated, of {', '.join(MODES)}")
+        parser.add_argument("--pool-size", type=int, default=8, help="pooled sessions (default 8)")
+        parser.add_argument("--max-per-connection", type=int, default=100, help="messages per pooled session (default 100)")
+        parser.add_argument("--batch-size", type=int, default=50, help="messages per send_each() call (default 50)")
+        parser.add_argument("--rtt-ms", type=float, default=2.0, help="stand-in server: delay per reply (default 2)")
+        parser.add_argument("--handshake-ms", type=float, default=30.0, help="stand-in server: delay before the greeting (default 30)")
+        parser.add_argument("--smtp-host", help="use this server instead of the stand-in (no TLS, no auth)")
+        parser.add_argument("--smtp-port", type=int, default=25)
+        parser.add_argument("--to", default="bench@example.invalid", help="recipient (default bench@example.invalid)")
+        parser.add_argument("--render", action="store_true", help="time email rendering (--messages per template) instead")
+
+    def handle(self, *args, **options):
+        modes = [mode.strip() for mode in options["modes"].split(",") if mode.strip()]
+        unknown = set(modes) - set(MODES)
+        if unknown:
+            raise CommandError(f"Unknown mode(s) {sorted(unknown)}; expected {', '.join(MODES)}")
+        if min(options["messages"], options["pool_size"], options["max_per_connection"], options["batch_size"]) < 1:
+            raise CommandError("--messages, --pool-size, --max-per-connection and --batch-size must be positive.")
+        if options["render"]:
+            self._render(options["messages"])
+            return
+
+        sink = None
+        if options["smtp_host"]:
+            host, port = options["smtp_host"], options["smtp_port"]
+        else:
+            sink = SMTPSink(rtt_ms=options["rtt_ms"], handshake_ms=options["handshake_ms"]).start()
+            host, port = sink.host, sink.port
+            self.stdout.write(
+                f"stand-in SMTP server on {host}:{port} (handshake {options['handshake_ms']} ms, "
+                f"{options['rtt_ms']} ms per reply)"
+            )
+        smtp = {
+            "EMAIL_HOST": host, "EMAIL_PORT": port, "EMAIL_USE_TLS": False, "EMAIL_USE_SSL": False,
+            "EMAIL_HOST_USER": "", "EMAIL_HOST_PASSWORD": "",
+        }
+        try:
+            with override_settings(**smtp):
+                for mode in modes:
+                    if sink:
+                        sink.reset_counts()
+                    messages = self._messages(options["messages"], options["to"])
+                    started = time.perf_counter()
+                    results, sessions = getattr(self, "_" + mode.replace("-", "_"))(messages, options)
+                    elapsed = time.perf_counter() - started
+                    self._report(mode, results, elapsed, sessions, sink)
+        finally:
+            if sink:
+                sink.stop()
+
+    def _render(self, n):
+        for template_name, context, keyed in RENDER_CASES:
+            timings = {}
+            for name, render in (
+                ("render_to_string", lambda c: render_to_string(template_name, c)),
+                ("render_email", lambda c: render_email(template_name, c, keyed=keyed)),
+            ):
+                render(context)         # compiled / cached outside the timing
+                started = time.perf_counter()
+                for i in range(n):
+                    render({**context, "year": 2000 + i % 50})
+                timings[name] = (time.perf_counter() - started) / n * 1e6
+            self.stdout.write(
+                f"{template_name}: render_to_string {timings['render_to_string']:.1f} us, "
+                f"render_email {timings['render_email']:.1f} us (HTML + text), "
+                f"{timings['render_to_string'] / timings['render_email']:.1f}x"
+            )
+
+    def _messages(self, n, to):
+        html = "<html><body><p>Your verification code is <b>123456</b>.</p></body></html>"
+        messages = []
+        for i in range(n):
+            message = EmailMultiAlternatives(
+                f"Bench message {i}", "Your verification code is 123456.", "bench@example.invalid", [to],
+            )
+            message.attach_alternative(html, "text/html")
+            messages.append(message)
+        return messages
+
+    def _per_message(self, messages, options):
+        results = []
+        for message in messages:
+            started = time.perf_counter()
+            result = _send_sequentially([message], get_connection(SMTP_BACKEND, fail_silently=False))[0]
+            # including the session setup and QUIT
+            results.append(result._replace(ms=(time.perf_counter() - started) * 1000))
+        return results, len(messages)
+
+    def _one_connection(self, messages, options):
+        return _send_sequentially(messages, get_connection(SMTP_BACKEND, fail_silently=False)), 1
+
+    def _pool(self, messages, options):
+        pool = SMTPPool(size=options["pool_size"], max_messages=options["max_per_connection"])
+        results = []
+        try:
+            for start in range(0, len(messages), options["batch_size"]):
+                results.extend(pool.send_each(messages[start:start + options["batch_size"]]))
+        finally:
+            pool.shutdown()
+        return results, pool.stats["opened"]
+
+    def _report(self, mode, results, elapsed, sessions, sink):
+        sent = [result.ms for result in results if result.error is None]
+        failed = len(results) - len(sent)
+        line = (
+            f"{mode:>14}: {len(sent)} sent in {elapsed:.2f}s = {len(sent) / elapsed:,.0f} msg/s; "
+            f"{sessions} session(s)"
+        )
+        if sent:
+            line += f"; per message p50 {np.percentile(sent, 50):.1f} ms, p95 {np.percentile(sent, 95):.1f} ms"
+        if sink:
+            line += f"; server saw {sink.counts['messages']} message(s) over {sink.counts['connections']} connection(s)"
+        if failed:
+            first = next(result.error for result in results if result.error is not None)
+            line += f"; {failed} failed ({type(first).__name__}: {first})"
+        self.stdout.write(line)
@@ -0,0 +1,74 @@
+# Notification/management/commands/run_mail_worker.py
+import signal
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from django.utils import timezone
+
+from Notification.models import EmailOutbox
+from Notification.outbox import BATCH_SIZE, drain, metrics, purge_expired
+from Notification.smtp_pool import reset_smtp_pool
+
+
+class Command(BaseCommand):
+    help = (
+        "Deliver the transactional email outbox in batches, retrying failures with exponential "
+        "backoff and parking messages as dead after EMAIL_OUTBOX_MAX_ATTEMPTS attempts."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help=f"messages per batch (default {BATCH_SIZE})")
+        parser.add_argument("--interval", type=float, default=2.0, help="seconds to wait when nothing is due (default 2)")
+        parser.add_argument("--stats-interval", type=int, default=60, help="seconds between stats lines (default 60, 0 = off)")
+        parser.add_argument("--once", action="store_true", help="deliver what is due now and exit")
+        parser.add_argument("--stats", action="store_true", help="print the outbox stats and exit")
+        parser.add_argument("--requeue-dead", action="store_true", help="send the dead messages again, then exit")
+        parser.add_argument("--purge", action="store_true", help="delete the expired sent and dead messages, then exit")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive.")
+        if options["stats"]:
+            self._stats()
+            return
+        if options["requeue_dead"]:
+            self.stdout.write(f"{EmailOutbox.objects.requeue()} dead message(s) requeued")
+            return
+        if options["purge"]:
+            self.stdout.write(f"{purge_expired(force=True)} expired message(s) deleted")
+            return
+
+        # SIGTERM (docker stop) finishes the current batch, then exits
+        stop = threading.Event()
+        signal.signal(signal.SIGTERM, lambda *_: stop.set())
+        last_stats = time.monotonic()
+        try:
+            while not stop.is_set():
+                result = drain(options["batch_size"], stop)
+                if result["claimed"]:
+                    self.stdout.write(
+                        f"{timezone.now():%Y-%m-%d %H:%M:%S} sent={result['sent']} "
+                        f"retried={result['retried']} dead={result['dead']}"
+                    )
+                if options["once"]:
+                    break
+                if options["stats_interval"] and time.monotonic() - last_stats >= options["stats_interval"]:
+                    self._stats()
+                    last_stats = time.monotonic()
+                close_old_connections()
+                stop.wait(options["interval"])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            reset_smtp_pool()       # QUIT the pooled SMTP sessions
+        self._stats()
+
+    def _stats(self):
+        queue = EmailOutbox.objects.stats()
+        delivered = metrics.snapshot()
+        self.stdout.write(
+            "outbox: " + " ".join(f"{k}={v}" for k, v in queue.items())
+            + " | worker: " + " ".join(f"{k}={v}" for k, v in delivered.items())
+        )
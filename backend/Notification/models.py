@@ -1,4 +1,7 @@
+from datetime import timedelta
 from django.db import models
+from django.db.models import Count, Min, Q
+from django.utils import timezone
 from Accounts.models import CustomUser
 import uuid
 from django.contrib.contenttypes.models import ContentType
@@ -20,3 +23,114 @@ class Notification(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True,null=True, blank=True)
 
+
+
+class EmailOutboxManager(models.Manager):
+    def enqueue(self, message, kind=""):
+        """
+        Queue an EmailMessage / EmailMultiAlternatives instead of sending it. The row
+        is written in the caller's transaction, so mail of a rolled-back request is
+        never sent; `manage.py run_mail_worker` delivers it (Notification/outbox.py).
+        """
+        html = next((content for content, mimetype in getattr(message, "alternatives", ()) if mimetype == "text/html"), "")
+        return self.create(
+            kind=kind,
+            subject=message.subject,
+            body=message.body,
+            html_body=html,
+            from_email=message.from_email or "",
+            to=list(message.to),
+            reply_to=list(message.reply_to),
+        )
+
+    def claim_batch(self, size, lease_seconds):
+        """
+        Take up to `size` due messages for one worker: pending ones whose next attempt
+        is due, and ones another worker claimed but never finished (lease expired).
+        The conditional UPDATE on a fresh claim token keeps two workers from taking
+        the same row. Returns the claimed rows, oldest first.
+        """
+        now = timezone.now()
+        due = (
+            Q(status=self.model.PENDING, next_attempt_at__lte=now)
+            | Q(status=self.model.SENDING, locked_until__lt=now)
+        )
+        ids = list(self.filter(due).order_by("next_attempt_at").values_list("id", flat=True)[:size])
+        if not ids:
+            return []
+        token = uuid.uuid4().hex
+        self.filter(due, id__in=ids).update(
+            status=self.model.SENDING,
+            claim=token,
+            locked_until=now + timedelta(seconds=lease_seconds),
+        )
+        return list(self.filter(claim=token, status=self.model.SENDING).order_by("next_attempt_at"))
+
+    def requeue(self, queryset=None):
+        """Send the dead messages (of queryset, if given) again from a clean slate; returns how many."""
+        queryset = (self.all() if queryset is None else queryset).filter(status=self.model.DEAD)
+        return queryset.update(
+            status=self.model.PENDING, attempts=0, next_attempt_at=timezone.now(),
+            claim="", locked_until=None, last_error="",
+        )
+
+    def purge(self, before):
+        """Delete the sent and dead messages queued before `before`; returns how many."""
+        deleted, _ = self.filter(status__in=(self.model.SENT, self.model.DEAD), created_at__lt=before).delete()
+        return deleted
+
+    def stats(self):
+        """{"pending": n, "sending": n, "sent": n, "dead": n, "oldest_pending_seconds": s or None}"""
+        counts = dict(self.order_by().values_list("status").annotate(n=Count("id")))
+        result = {value: counts.get(value, 0) for value, _ in self.model.STATUS_CHOICES}
+        oldest = self.filter(status=self.model.PENDING).aggregate(oldest=Min("created_at"))["oldest"]
+        result["oldest_pending_seconds"] = round((timezone.now() - oldest).total_seconds(), 1) if oldest else None
+        return result
+
+
+class EmailOutbox(models.Model):
+    """
+    Transactional mail waiting for, or done with, delivery. Requests only insert
+    rows (EmailOutbox.objects.enqueue); the mail worker sends them in batches,
+    retries failures with exponential backoff and parks a message as dead after
+    settings.EMAIL_OUTBOX_MAX_ATTEMPTS failed attempts. The bodies of sent
+    messages are blanked (they carry OTP codes and verification links); sent
+    and dead rows are deleted after settings.EMAIL_OUTBOX_RETENTION seconds.
+    """
+    PENDING = "pending"
+    SENDING = "sending"
+    SENT = "sent"
+    DEAD = "dead"
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (SENDING, "Sending"),
+        (SENT, "Sent"),
+        (DEAD, "Dead"),
+    ]
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    kind = models.CharField(max_length=50, blank=True)  # e.g. "otp_verification"
+    subject = models.CharField(max_length=255)
+    body = models.TextField()                           # plain-text part
+    html_body = models.TextField(blank=True)            # text/html alternative, if any
+    from_email = models.CharField(max_length=255, blank=True)
+    to = models.JSONField(default=list)
+    reply_to = models.JSONField(default=list, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    claim = models.CharField(max_length=32, blank=True)             # token of the worker batch holding it
+    locked_until = models.DateTimeField(null=True, blank=True)      # claim lease while sending
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    objects = EmailOutboxManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"], name="outbox_due_idx"),
+            models.Index(fields=["claim"], name="outbox_claim_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.to)} ({self.status})"
@@ -0,0 +1,248 @@
+# Notification/outbox.py
+"""
+Delivery of the transactional email outbox (Notification.EmailOutbox).
+
+Views never talk to SMTP: they queue mail with EmailOutbox.objects.enqueue()
+inside their transaction, and `manage.py run_mail_worker` (or the in-process
+worker thread, settings.EMAIL_OUTBOX_WORKER_INTERVAL) delivers it here:
+
+- deliver_batch() claims up to BATCH_SIZE due messages and sends them through
+  the configured EMAIL_BACKEND (concurrently with the pooled SMTP backend);
+- a failed message is retried after backoff_seconds(attempts): EMAIL_OUTBOX_BACKOFF
+  doubled per attempt, capped at EMAIL_OUTBOX_BACKOFF_MAX, with some jitter;
+- after EMAIL_OUTBOX_MAX_ATTEMPTS failures it is parked as dead (the dead letters,
+  sent again with EmailOutbox.objects.requeue() or the admin action);
+- a sent message keeps its envelope but not its bodies, and purge_expired()
+  deletes sent and dead messages older than EMAIL_OUTBOX_RETENTION.
+
+Claims are exclusive (EmailOutbox.objects.claim_batch), so several workers can
+drain the same outbox. A worker killed mid-batch leaves its rows "sending"
+until LEASE_SECONDS pass, then another worker takes them over.
+"""
+import logging
+import random
+import statistics
+import threading
+import time
+from collections import deque
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import close_old_connections
+from django.db.models import F
+from django.utils import timezone
+
+from .models import EmailOutbox
+from .smtp_pool import SendResult
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 50
+# a claimed batch that is not finished by then is handed to another worker
+LEASE_SECONDS = 300
+# seconds between purges of expired messages (per process)
+PURGE_INTERVAL = 3600
+
+
+def backoff_seconds(attempts):
+    """Delay before the retry that follows failed attempt number `attempts` (1-based)."""
+    base = getattr(settings, "EMAIL_OUTBOX_BACKOFF", 30)
+    cap = getattr(settings, "EMAIL_OUTBOX_BACKOFF_MAX", 3600)
+    # jitter: messages that failed together (SMTP outage) do not all come back at once
+    return min(cap, base * 2 ** (attempts - 1)) * random.uniform(0.8, 1.2)
+
+
+def to_message(row, connection=None):
+    """The EmailMultiAlternatives of an outbox row."""
+    message = EmailMultiAlternatives(
+        subject=row.subject,
+        body=row.body,
+        from_email=row.from_email or None,
+        to=row.to,
+        reply_to=row.reply_to or None,
+        connection=connection,
+    )
+    if row.html_body:
+        message.attach_alternative(row.html_body, "text/html")
+    return message
+
+
+class DeliveryMetrics:
+    """Running totals of this process's deliveries, for the worker's stats lines."""
+
+    SAMPLES = 1000
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.batches = self.sent = self.retried = self.dead = 0
+            self._send_ms = deque(maxlen=self.SAMPLES)
+
+    def record_batch(self, result, send_ms):
+        with self._lock:
+            self.batches += 1
+            self.sent += result["sent"]
+            self.retried += result["retried"]
+            self.dead += result["dead"]
+            self._send_ms.extend(send_ms)
+
+    def snapshot(self):
+        with self._lock:
+            samples = list(self._send_ms)
+            result = {"batches": self.batches, "sent": self.sent, "retried": self.retried, "dead": self.dead}
+        # over the last SAMPLES sends; "inclusive" interpolates between samples like numpy.percentile
+        result["send_ms_p50"] = result["send_ms_p95"] = None
+        if samples:
+            cuts = statistics.quantiles(samples, n=100, method="inclusive") if len(samples) > 1 else samples * 99
+            result["send_ms_p50"], result["send_ms_p95"] = round(cuts[49], 1), round(cuts[94], 1)
+        return result
+
+
+metrics = DeliveryMetrics()
+
+
+def _failed(row, error, now):
+    """Schedule the retry of a failed message, or park it as dead; returns the new status."""
+    attempts = row.attempts + 1
+    max_attempts = getattr(settings, "EMAIL_OUTBOX_MAX_ATTEMPTS", 8)
+    changes = {"attempts": attempts, "last_error": f"{type(error).__name__}: {error}"[:2000], "claim": "", "locked_until": None}
+    if attempts >= max_attempts:
+        changes["status"] = EmailOutbox.DEAD
+        logger.warning("Outbox message %s is dead after %d attempts: %s", row.id, attempts, changes["last_error"])
+    else:
+        changes["status"] = EmailOutbox.PENDING
+        changes["next_attempt_at"] = now + timedelta(seconds=backoff_seconds(attempts))
+    EmailOutbox.objects.filter(pk=row.pk, claim=row.claim).update(**changes)
+    return changes["status"]
+
+
+def _send_sequentially(messages, connection):
+    """SendResult per message, sent one after the other over one backend connection."""
+    results = []
+    try:
+        connection.open()
+        open_error = None
+    except Exception as e:
+        open_error = e
+    try:
+        for message in messages:
+            started = time.perf_counter()
+            try:
+                if open_error is not None:
+                    raise open_error
+                message.connection = connection
+                if not message.send():
+                    raise ValueError("no recipients")
+                error = None
+            except Exception as e:
+                error = e
+                if open_error is None:
+                    # the session may be broken: go on with a fresh one
+                    connection.close()
+                    try:
+                        connection.open()
+                    except Exception as e:
+                        open_error = e
+            results.append(SendResult(error, (time.perf_counter() - started) * 1000))
+    finally:
+        connection.close()
+    return results
+
+
+def deliver_batch(size=BATCH_SIZE, connection=None):
+    """
+    Claim and send one batch of due messages. A backend with send_each() (the
+    pooled SMTP backend, Notification/smtp_pool.py) sends them concurrently;
+    any other goes one by one over one connection.
+    Returns {"claimed": n, "sent": n, "retried": n, "dead": n}.
+    """
+    rows = EmailOutbox.objects.claim_batch(size, LEASE_SECONDS)
+    result = {"claimed": len(rows), "sent": 0, "retried": 0, "dead": 0}
+    if not rows:
+        return result
+    connection = connection or get_connection(fail_silently=False)
+    messages = [to_message(row) for row in rows]
+    if hasattr(connection, "send_each"):
+        outcomes = connection.send_each(messages)
+    else:
+        outcomes = _send_sequentially(messages, connection)
+
+    now = timezone.now()
+    sent = []
+    for row, outcome in zip(rows, outcomes):
+        if outcome.error is None:
+            sent.append(row.pk)
+        elif _failed(row, outcome.error, now) == EmailOutbox.DEAD:
+            result["dead"] += 1
+        else:
+            result["retried"] += 1
+    if sent:
+        # all rows of the batch share the claim token; the bodies (OTP codes,
+        # verification links) are not kept once delivered
+        EmailOutbox.objects.filter(pk__in=sent, claim=rows[0].claim).update(
+            status=EmailOutbox.SENT, sent_at=now, attempts=F("attempts") + 1,
+            claim="", locked_until=None, last_error="", body="", html_body="",
+        )
+    result["sent"] = len(sent)
+    metrics.record_batch(result, [outcome.ms for outcome in outcomes if outcome.error is None])
+    return result
+
+
+_purged = 0.0      # time.monotonic() of this process's last purge
+
+
+def purge_expired(force=False):
+    """
+    Delete the sent and dead messages older than EMAIL_OUTBOX_RETENTION seconds,
+    at most once per PURGE_INTERVAL unless forced; returns how many.
+    """
+    global _purged
+    if not force and _purged and time.monotonic() - _purged < PURGE_INTERVAL:
+        return 0
+    _purged = time.monotonic()
+    retention = getattr(settings, "EMAIL_OUTBOX_RETENTION", 7 * 86400)
+    return EmailOutbox.objects.purge(timezone.now() - timedelta(seconds=retention))
+
+
+def drain(size=BATCH_SIZE, stop=None):
+    """Deliver batches until nothing is due (or `stop` is set); returns the summed results."""
+    purge_expired()
+    total = {"claimed": 0, "sent": 0, "retried": 0, "dead": 0}
+    while stop is None or not stop.is_set():
+        result = deliver_batch(size)
+        for key in total:
+            total[key] += result[key]
+        if result["claimed"] < size:
+            break
+    return total
+
+
+# ---------- in-process worker ----------
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def _run_forever(interval, stop):
+    while not stop.wait(interval):
+        try:
+            drain(stop=stop)
+        except Exception:
+            logger.exception("Outbox delivery failed")
+        finally:
+            close_old_connections()
+
+
+def start_mail_worker(interval):
+    """Start the daemon outbox thread of this process (once); returns its stop event."""
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            stop = threading.Event()
+            thread = threading.Thread(target=_run_forever, args=(interval, stop), name="mail-worker", daemon=True)
+            thread.start()
+            _worker = (thread, stop)
+        return _worker[1]
@@ -0,0 +1,176 @@
+# Notification/smtp_pool.py
+"""
+Pooled SMTP transport: persistent, authenticated SMTP connections shared by
+every send of the process, instead of one connect + STARTTLS + AUTH per message.
+
+SMTPPool keeps `size` connection slots. A slot connects on first use and is
+reused until it has carried `max_messages` messages (providers cap messages
+per session), sat idle long enough to need a NOOP check, or broke; then it is
+replaced. send_each() sends a list of messages over the slots concurrently
+from a thread pool and reports every message's outcome.
+
+PooledEmailBackend puts the process-wide pool behind Django's email API:
+EMAIL_BACKEND = "Notification.smtp_pool.PooledEmailBackend". The connections
+themselves are Django's SMTP backend, so EMAIL_HOST, EMAIL_PORT, EMAIL_USE_TLS,
+EMAIL_HOST_USER, ... apply unchanged.
+"""
+import queue
+import smtplib
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+
+SMTP_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+# a slot idle for longer is checked with NOOP before use (servers drop idle sessions)
+IDLE_CHECK_SECONDS = 30
+
+# error is None when the message was sent
+SendResult = namedtuple("SendResult", ["error", "ms"])
+
+
+def _smtp_connection():
+    return get_connection(SMTP_BACKEND, fail_silently=False)
+
+
+class _Slot:
+    def __init__(self, pool):
+        self.pool = pool
+        self.backend = None
+        self.sent = 0
+        self.last_used = 0.0
+
+    def ready(self):
+        """The open backend of this slot, (re)connecting when needed."""
+        if self.backend is not None and self.sent >= self.pool.max_messages:
+            self.close()
+        if self.backend is not None and time.monotonic() - self.last_used > IDLE_CHECK_SECONDS:
+            try:
+                alive = self.backend.connection.noop()[0] == 250
+            except (smtplib.SMTPException, OSError):
+                alive = False
+            if not alive:
+                self.close()
+        if self.backend is None:
+            backend = self.pool.connection_factory()
+            backend.open()
+            self.backend, self.sent = backend, 0
+            self.pool._count("opened")
+        self.last_used = time.monotonic()
+        return self.backend
+
+    def close(self):
+        if self.backend is not None:
+            try:
+                self.backend.close()
+            except Exception:
+                pass
+            self.backend = None
+
+
+class SMTPPool:
+    def __init__(self, size=4, max_messages=100, connection_factory=_smtp_connection):
+        if size < 1 or max_messages < 1:
+            raise ValueError("size and max_messages must be positive")
+        self.size = size
+        self.max_messages = max_messages
+        self.connection_factory = connection_factory
+        self._slots = queue.LifoQueue()     # most recently used first: fewer idle sessions
+        for _ in range(size):
+            self._slots.put(_Slot(self))
+        self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="smtp-pool")
+        self._stats_lock = threading.Lock()
+        self.stats = {"opened": 0, "sent": 0, "failed": 0}
+
+    def _count(self, name):
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def _send_one(self, message):
+        started = time.perf_counter()
+        slot = self._slots.get()
+        try:
+            for attempt in (1, 2):
+                try:
+                    if not slot.ready().send_messages([message]):
+                        raise ValueError("no recipients")
+                    slot.sent += 1
+                    self._count("sent")
+                    return SendResult(None, (time.perf_counter() - started) * 1000)
+                except (smtplib.SMTPServerDisconnected, ConnectionError) as e:
+                    # a pooled session the server has dropped: one retry on a fresh one
+                    slot.close()
+                    if attempt == 2:
+                        error = e
+                except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError, ValueError) as e:
+                    error = e           # refused message; the session is still usable
+                    break
+                except Exception as e:
+                    slot.close()
+                    error = e
+                    break
+            self._count("failed")
+            return SendResult(error, (time.perf_counter() - started) * 1000)
+        finally:
+            self._slots.put(slot)
+
+    def send_each(self, messages):
+        """Send messages concurrently over the pooled sessions; a SendResult per message, in order."""
+        messages = list(messages)
+        if len(messages) <= 1:
+            return [self._send_one(message) for message in messages]
+        return list(self._executor.map(self._send_one, messages))
+
+    def close(self):
+        """Quit every open session (the pool stays usable and reconnects on demand)."""
+        slots = [self._slots.get() for _ in range(self.size)]
+        for slot in slots:
+            slot.close()
+            self._slots.put(slot)
+
+    def shutdown(self):
+        self.close()
+        self._executor.shutdown(wait=True)
+
+
+# ---------- process-wide pool ----------
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_smtp_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = SMTPPool(
+                    size=getattr(settings, "EMAIL_POOL_SIZE", 4),
+                    max_messages=getattr(settings, "EMAIL_POOL_MAX_MESSAGES", 100),
+                )
+    return _pool
+
+
+def reset_smtp_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+        _pool = None
+
+
+class PooledEmailBackend(BaseEmailBackend):
+    """Django email backend over the process-wide SMTPPool; open()/close() leave the sessions open."""
+
+    def send_messages(self, email_messages):
+        results = self.send_each(email_messages)
+        errors = [result.error for result in results if result.error is not None]
+        if errors and not self.fail_silently:
+            raise errors[0]
+        return len(results) - len(errors)
+
+    def send_each(self, email_messages):
+        return get_smtp_pool().send_each(email_messages)
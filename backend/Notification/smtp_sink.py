@@ -0,0 +1,91 @@
+# Notification/smtp_sink.py
+"""
+A stand-in SMTP server for measuring and trying the mail transport without a
+real provider: it speaks enough ESMTP for smtplib (EHLO, AUTH PLAIN / LOGIN,
+MAIL, RCPT, DATA, RSET, NOOP, QUIT), accepts every message and keeps only
+counts. Latency is simulated: `handshake_ms` before the greeting stands in for
+TCP + TLS setup, and `rtt_ms` delays every reply like a network round trip.
+
+    sink = SMTPSink(rtt_ms=2, handshake_ms=30).start()
+    ... EMAIL_HOST=sink.host, EMAIL_PORT=sink.port, EMAIL_USE_TLS=False ...
+    sink.stop()
+"""
+import socketserver
+import threading
+import time
+
+
+class _Session(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        if self.server.rtt:
+            time.sleep(self.server.rtt)
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self):
+        sink = self.server.sink
+        sink._count("connections")
+        if self.server.handshake:
+            time.sleep(self.server.handshake)
+        self.reply("220 sink ESMTP ready")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode(errors="replace").strip().upper()
+            if command.startswith(("EHLO", "HELO")):
+                self.reply("250-sink\r\n250-AUTH PLAIN LOGIN\r\n250-8BITMIME\r\n250 SMTPUTF8")
+            elif command.startswith("AUTH LOGIN"):
+                self.reply("334 VXNlcm5hbWU6")
+                self.rfile.readline()
+                self.reply("334 UGFzc3dvcmQ6")
+                self.rfile.readline()
+                self.reply("235 authenticated")
+            elif command.startswith("AUTH"):
+                self.reply("235 authenticated")
+            elif command.startswith(("MAIL", "RCPT", "RSET", "NOOP")):
+                self.reply("250 ok")
+            elif command == "DATA":
+                self.reply("354 end with <CRLF>.<CRLF>")
+                while self.rfile.readline() not in (b".\r\n", b".\n", b""):
+                    pass
+                sink._count("messages")
+                self.reply("250 queued")
+            elif command == "QUIT":
+                self.reply("221 bye")
+                return
+            else:
+                self.reply("502 not implemented")
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class SMTPSink:
+    def __init__(self, host="127.0.0.1", port=0, rtt_ms=0.0, handshake_ms=0.0):
+        self._server = _Server((host, port), _Session)
+        self._server.sink = self
+        self._server.rtt = rtt_ms / 1000
+        self._server.handshake = handshake_ms / 1000
+        self.host, self.port = self._server.server_address[:2]
+        self._lock = threading.Lock()
+        self.counts = {"connections": 0, "messages": 0}
+        self._thread = None
+
+    def _count(self, name):
+        with self._lock:
+            self.counts[name] += 1
+
+    def reset_counts(self):
+        with self._lock:
+            self.counts = {"connections": 0, "messages": 0}
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="smtp-sink", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
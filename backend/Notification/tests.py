@@ -1,4 +1,213 @@
-from django.test import TestCase
+import smtplib
+from datetime import timedelta
 
+from django.core import mail
+from django.core.exceptions import ImproperlyConfigured
+from django.core.mail import EmailMultiAlternatives
+from django.core.mail.backends.base import BaseEmailBackend
+from django.template.loader import render_to_string
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from django.utils.safestring import mark_safe
 
-# Create your tests here.
\ No newline at end of file
+from Notification.emails import html_to_text, render_email, reset_email_templates
+from Notification.models import EmailOutbox
+from Notification.outbox import DeliveryMetrics, deliver_batch, purge_expired
+from Notification.smtp_pool import SMTPPool
+
+
+class FailingBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        raise ConnectionRefusedError("SMTP server is down")
+
+
+def queue(subject="Your Email Verification Code", body="Your code is 123456."):
+    message = EmailMultiAlternatives(subject, body, "noreply@example.com", ["to@example.com"])
+    message.attach_alternative(f"<p>{body}</p>", "text/html")
+    return EmailOutbox.objects.enqueue(message, kind="otp_verification")
+
+
+# ---------- outbox ----------
+@override_settings(EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend")
+class OutboxTests(TestCase):
+    def make_due(self):
+        EmailOutbox.objects.update(next_attempt_at=timezone.now())
+
+    def test_sent_once_without_its_bodies(self):
+        row = queue()
+        self.assertEqual(deliver_batch(), {"claimed": 1, "sent": 1, "retried": 0, "dead": 0})
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].body, "Your code is 123456.")
+        row.refresh_from_db()
+        self.assertEqual((row.status, row.attempts, row.body, row.html_body), (EmailOutbox.SENT, 1, "", ""))
+        self.assertIsNotNone(row.sent_at)
+        self.assertEqual(deliver_batch()["claimed"], 0)
+
+    @override_settings(EMAIL_OUTBOX_MAX_ATTEMPTS=3)
+    def test_retries_then_dead(self):
+        row = queue()
+        for attempt in (1, 2):
+            result = deliver_batch(connection=FailingBackend())
+            self.assertEqual(result, {"claimed": 1, "sent": 0, "retried": 1, "dead": 0})
+            row.refresh_from_db()
+            self.assertEqual((row.status, row.attempts), (EmailOutbox.PENDING, attempt))
+            self.assertGreater(row.next_attempt_at, timezone.now())
+            self.assertIn("ConnectionRefusedError", row.last_error)
+            # not due before its backoff
+            self.assertEqual(deliver_batch(connection=FailingBackend())["claimed"], 0)
+            self.make_due()
+        self.assertEqual(deliver_batch(connection=FailingBackend())["dead"], 1)
+        row.refresh_from_db()
+        self.assertEqual((row.status, row.attempts), (EmailOutbox.DEAD, 3))
+        self.assertEqual(row.body, "Your code is 123456.")
+        self.assertEqual(deliver_batch()["claimed"], 0)
+
+        self.assertEqual(EmailOutbox.objects.requeue(), 1)
+        self.assertEqual(deliver_batch()["sent"], 1)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_requeue_only_dead(self):
+        sent, dead, pending = queue(), queue(), queue()
+        EmailOutbox.objects.filter(pk=sent.pk).update(status=EmailOutbox.SENT)
+        EmailOutbox.objects.filter(pk=dead.pk).update(status=EmailOutbox.DEAD, attempts=8)
+        self.assertEqual(EmailOutbox.objects.requeue(EmailOutbox.objects.all()), 1)
+        statuses = dict(EmailOutbox.objects.values_list("pk", "status"))
+        self.assertEqual(statuses, {sent.pk: EmailOutbox.SENT, dead.pk: EmailOutbox.PENDING, pending.pk: EmailOutbox.PENDING})
+
+    @override_settings(EMAIL_OUTBOX_RETENTION=86400)
+    def test_purge_expired(self):
+        old_sent, old_dead, old_pending, new_sent = queue(), queue(), queue(), queue()
+        EmailOutbox.objects.filter(pk__in=[old_sent.pk, new_sent.pk]).update(status=EmailOutbox.SENT)
+        EmailOutbox.objects.filter(pk=old_dead.pk).update(status=EmailOutbox.DEAD)
+        EmailOutbox.objects.filter(pk__in=[old_sent.pk, old_dead.pk, old_pending.pk]).update(
+            created_at=timezone.now() - timedelta(days=2),
+        )
+        self.assertEqual(purge_expired(force=True), 2)
+        self.assertEqual(set(EmailOutbox.objects.values_list("pk", flat=True)), {old_pending.pk, new_sent.pk})
+
+
+class DeliveryMetricsTests(TestCase):
+    def test_percentiles(self):
+        metrics = DeliveryMetrics()
+        self.assertEqual(metrics.snapshot()["send_ms_p50"], None)
+        metrics.record_batch({"sent": 1, "retried": 0, "dead": 0}, [40.0])
+        self.assertEqual((metrics.snapshot()["send_ms_p50"], metrics.snapshot()["send_ms_p95"]), (40.0, 40.0))
+        metrics.record_batch({"sent": 99, "retried": 2, "dead": 1}, [float(ms) for ms in range(1, 100)])
+        snapshot = metrics.snapshot()
+        self.assertEqual((snapshot["batches"], snapshot["sent"], snapshot["retried"], snapshot["dead"]), (2, 100, 2, 1))
+        # what numpy.percentile gives for the same samples
+        self.assertEqual((snapshot["send_ms_p50"], snapshot["send_ms_p95"]), (49.5, 94.0))
+
+
+# ---------- SMTP pool ----------
+class FakeSMTPBackend:
+    """One SMTP session of the pool: send_messages() raises the queued errors, one per call, then sends."""
+
+    def __init__(self, errors, sessions):
+        self.errors = errors
+        self.sent = []
+        self.closed = False
+        sessions.append(self)
+
+    def open(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def send_messages(self, messages):
+        if self.errors:
+            raise self.errors.pop(0)
+        self.sent.extend(messages)
+        return len(messages)
+
+
+class SMTPPoolTests(TestCase):
+    def pool(self, errors, **kwargs):
+        sessions = []
+        pool = SMTPPool(connection_factory=lambda: FakeSMTPBackend(errors, sessions), **kwargs)
+        self.addCleanup(pool.shutdown)
+        return pool, sessions
+
+    def message(self):
+        return EmailMultiAlternatives("Subject", "Body", "noreply@example.com", ["to@example.com"])
+
+    def test_dropped_session_is_retried_on_a_fresh_one(self):
+        pool, sessions = self.pool([smtplib.SMTPServerDisconnected("Connection unexpectedly closed")], size=1)
+        [result] = pool.send_each([self.message()])
+        self.assertIsNone(result.error)
+        self.assertEqual(len(sessions), 2)
+        self.assertTrue(sessions[0].closed)
+        self.assertEqual(len(sessions[1].sent), 1)
+        self.assertEqual(pool.stats, {"opened": 2, "sent": 1, "failed": 0})
+
+    def test_dropped_twice_fails(self):
+        errors = [smtplib.SMTPServerDisconnected("closed"), ConnectionResetError("reset")]
+        pool, sessions = self.pool(errors, size=1)
+        [result] = pool.send_each([self.message()])
+        self.assertIsInstance(result.error, ConnectionResetError)
+        self.assertEqual(pool.stats, {"opened": 2, "sent": 0, "failed": 1})
+
+    def test_refused_message_keeps_the_session(self):
+        refused = smtplib.SMTPRecipientsRefused({"to@example.com": (550, b"No such user")})
+        pool, sessions = self.pool([refused], size=1)
+        first, second = pool.send_each([self.message()]), pool.send_each([self.message()])
+        self.assertIsInstance(first[0].error, smtplib.SMTPRecipientsRefused)
+        self.assertIsNone(second[0].error)
+        self.assertEqual(len(sessions), 1)
+
+    def test_sessions_are_reused_up_to_max_messages(self):
+        pool, sessions = self.pool([], size=1, max_messages=2)
+        results = pool.send_each([self.message() for _ in range(5)])
+        self.assertTrue(all(result.error is None for result in results))
+        self.assertEqual([len(session.sent) for session in sessions], [2, 2, 1])
+
+
+# ---------- precompiled rendering ----------
+class RenderEmailTests(TestCase):
+    def setUp(self):
+        reset_email_templates()
+        self.addCleanup(reset_email_templates)
+
+    def assertRendersLikeDjango(self, template_name, context, keyed=()):
+        html, text = render_email(template_name, context, keyed=keyed)
+        expected = render_to_string(template_name, context)
+        self.assertEqual(html, expected)
+        self.assertEqual(text, html_to_text(expected))
+
+    def test_otp_verification(self):
+        for username in ("mgmg", "<b>Mg & \"Mg\"</b>", "မောင်မောင်"):
+            self.assertRendersLikeDjango(
+                "emails/otp_verification.html", {"username": username, "otp_code": "123456", "year": 2026},
+            )
+
+    def test_employer_email_verify(self):
+        self.assertRendersLikeDjango(
+            "emails/employer_email_verify.html",
+            {"email": "hr@example.com", "verify_url": "https://example.com/verify/abc/?a=1&b=2", "year": 2026},
+        )
+
+    def test_application_status_update_per_status(self):
+        for status_label in ("Hired", "Reviewed", "Shortlisted", "Rejected", "Pending"):
+            self.assertRendersLikeDjango(
+                "emails/application_status_update.html",
+                {
+                    "username": "Mg Mg", "job_title": "Python <Developer>", "status_label": status_label,
+                    "status_class": status_label.lower(), "application_link": "https://example.com/applications/1",
+                    "year": 2026,
+                },
+                keyed=("status_label",),
+            )
+
+    def test_safe_values_are_not_escaped(self):
+        context = {"username": mark_safe("<b>Mg Mg</b>"), "otp_code": "123456", "year": 2026}
+        html, _ = render_email("emails/otp_verification.html", context)
+        self.assertIn("<b>Mg Mg</b>", html)
+        self.assertEqual(html, render_to_string("emails/otp_verification.html", context))
+
+    def test_unkeyed_tag_variable_is_refused(self):
+        with self.assertRaises(ImproperlyConfigured):
+            render_email(
+                "emails/application_status_update.html",
+                {"username": "Mg Mg", "job_title": "Python Developer", "status_label": "Hired", "year": 2026},
+            )